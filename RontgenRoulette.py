@@ -1,27 +1,98 @@
 import sys
 import os
+import html
 import random
 import math
+import time
 from PySide2.QtWidgets import (
     QApplication, QMainWindow, QLabel, QVBoxLayout, QHBoxLayout, QPushButton,
     QGridLayout, QWidget, QComboBox, QSpinBox, QSizePolicy, QMessageBox,
-    QFileDialog, QAction, QDialog, QTextEdit
+    QFileDialog, QAction, QActionGroup, QDialog, QTextEdit, QOpenGLWidget, QStackedWidget,
+    QLineEdit, QCompleter, QProgressDialog
+)
+from PySide2.QtGui import (
+    QColor, QPainter, QPen, QBrush, QFont, QFontMetrics, QIcon, QImage, QStaticText, QOpenGLContext
+)
+from PySide2.QtCore import (
+    Qt, QTimer, QTime, QPointF, QRect, QCoreApplication, QObject, QElapsedTimer, QFileSystemWatcher, Signal,
+    QModelIndex, QStringListModel, QUrl
 )
-from PySide2.QtGui import QColor, QPainter, QPen, QBrush, QFont, QIcon
-from PySide2.QtCore import Qt, QTimer, QTime, Signal
 import pygame
 import csv
+from array import array
+from collections import OrderedDict
 from datetime import datetime
+from audio_scheduler import TickAudioScheduler, audio_scheduler_available
+from draw_engine import MODE_BULK, MODE_CONSECUTIVE, MODE_ELIMINATION, MODE_RANDOM, MODE_SEQUENTIAL, DrawEngine
+from draw_trace import TRACK_PLANNER, DrawTracer
+from draw_video import DrawRecording, export_video, find_ffmpeg
+from export_pipeline import ResultExporter, atomic_write_bytes
+from store import STORE_FILE, RouletteStore
+from eligibility import EligibilityEngine, mask_to_indices
+from grid_render import (
+    CELL_PHOTO_PADDING, CELL_STYLE_HIGHLIGHT, CELL_STYLE_WINNER, GL_CELL_STYLES, CellStateMixin, board_cell_rects, board_columns_for,
+    board_page_capacity, cell_font_size, grid_cell_rects, grid_columns, paint_cell_batch, prepare_static_texts,
+    winner_colors
+)
+from participants import ParticipantRegistry
+from photo_tiles import PhotoCellsMixin, photo_loader
+from plan_validator import validate_event
+from quality import (
+    FRAME_BUDGET_MS, QUALITY_FULL, QUALITY_MINIMAL, QUALITY_REDUCED, TRAVERSAL_SAMPLE_FRAMES, QualityController
+)
+from search_index import ParticipantIndex
+from stall_watchdog import PHASE_COMMIT, PHASE_IDLE, PHASE_REVEAL, PHASE_TRAVERSAL, PHASE_WHEEL, StallWatchdog
+from session import SNAPSHOT_FILE, SNAPSHOT_VERSION, read_snapshot, rng_state_from_json, rng_state_to_json
+from reward_files import FORMAT_HELP, RewardFileError, parse_reward_file, split_reward_file_name
+from wheel_face import WheelFace
+
+class FrameClock(QObject):
+    """所有抽獎面板與轉盤共用的影格時鐘，單一 QTimer 依序推進每個訂閱者。"""
+    FRAME_INTERVAL_MS = 16  # 約 60 FPS
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.elapsed = QElapsedTimer()  # 單調時鐘，不受系統時間調整影響
+        self.elapsed.start()
+        self.subscribers = []
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(self.FRAME_INTERVAL_MS)
+        self.timer.timeout.connect(self._tick)
+
+    def now(self):
+        """Milliseconds since the clock was created."""
+        return self.elapsed.elapsed()
+
+    def subscribe(self, callback):
+        """每幀以目前時間 (ms) 呼叫 callback，直到取消訂閱。"""
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+        if not self.subscribers:
+            self.timer.stop()
+
+    def _tick(self):
+        now = self.now()
+        # 同一輪事件迴圈內更新所有面板，Qt 會將重繪請求合併為一次
+        for callback in list(self.subscribers):
+            callback(now)
 
 class WheelWidget(QWidget):
     iteration_time_decided = Signal(float)  # Signal to emit the iteration time when animation finishes
+    WHEEL_SIZE = 90  # 左側轉盤的邊長 (px)
 
-    def __init__(self, parent=None):
+    def __init__(self, frame_clock, parent=None):
         super().__init__(parent)
         self.rotation_angle = 0.0 # 目前的旋轉角度，初始為 0.0
         self.is_animating = False # 表示動畫是否正在進行，初始為 False
-        self.timer = QTimer() # 使用 QTimer 控制動畫更新。
-        self.timer.timeout.connect(self.update_animation)
+        self.frame_clock = frame_clock # 由共用的 FrameClock 驅動動畫更新。
+        self.start_time = 0 # 動畫開始時的時鐘時間 (ms)
         self.animation_duration = 1000  # 動畫的總時長，單位為毫秒（預設為 1000 毫秒，1 秒）。
         self.elapsed_time = 0 # 動畫運行的累積時間。
         self.start_speed = random.uniform(2000, 4000)  # 起始速度，隨機生成一個範圍內的值（720 至 1080 度/秒）。
@@ -30,6 +101,8 @@ class WheelWidget(QWidget):
         self.current_frame = 0 # 分別表示當前幀數和總幀數。
         self.total_frames = 0
         self.current_text = ""  # Current displayed text
+        self.refresh_interval_ms = 0  # 轉動時重繪的最短間隔，畫面效果降低時加大
+        self.last_refresh = 0
 
         # Deceleration exponent 減速曲線的指數值（默認為 2.0，平方減速）。
         self.exponent = 2.0
@@ -43,9 +116,14 @@ class WheelWidget(QWidget):
         self.text_label.setAlignment(Qt.AlignCenter)
         self.text_label.setFont(QFont("Arial", 40))
         self.text_label.setStyleSheet("border: 5px solid black; padding: 10px;")
-        self.setMaximumSize(200, 100)  # 限制最大寬度和高度為 300x300
+        self.setMaximumSize(200 + self.WHEEL_SIZE, 100)  # 限制最大寬度和高度
 
-        layout = QVBoxLayout(self)
+        # 圓盤、刻度與時間標籤只在尺寸或上下限改變時繪製一次，每幀只旋轉貼上並畫指針
+        self.wheel_face = WheelFace(QFont("Arial", 7))
+        self.wheel_face.set_limits(self.lower_limit, self.upper_limit)
+
+        layout = QHBoxLayout(self)
+        layout.addSpacing(self.WHEEL_SIZE)  # 轉盤繪製在左側保留的區域
         layout.addWidget(self.text_label)
 
     def start_animation(self):
@@ -57,8 +135,8 @@ class WheelWidget(QWidget):
         self.rotation_angle = 0.0
 
         # Prepare the list of rotation angles
-        frame_interval = 1  # milliseconds (approx 60 FPS)
-        self.total_frames = self.animation_duration // frame_interval
+        self.frame_interval = 1  # milliseconds per animation step
+        self.total_frames = self.animation_duration // self.frame_interval
 
         # Calculate the intervals (angles per frame)
         progress_list = [(i / (self.total_frames - 1)) for i in range(self.total_frames)]
@@ -66,48 +144,876 @@ class WheelWidget(QWidget):
         for p in progress_list:
             # Use deceleration curve
             speed = self.start_speed * (1 - p ** self.exponent)
-            delta_angle = speed * frame_interval / 1000.0
+            delta_angle = speed * self.frame_interval / 1000.0
             self.rotation_angles.append(delta_angle)
 
-        self.timer.start(frame_interval)
+        # 累積角度，讓任一時間點都能直接換算出目前角度
+        self.cumulative_angles = []
+        total = 0.0
+        for delta_angle in self.rotation_angles:
+            total += delta_angle
+            self.cumulative_angles.append(total)
+
+        self.start_time = self.frame_clock.now()
+        self.last_refresh = self.start_time - self.refresh_interval_ms
+        self.frame_clock.subscribe(self.update_animation)
+
+    def final_iteration_time(self):
+        """轉盤的最終角度在開始時即已決定，回傳其對應的歷遍時間。"""
+        angle = self.cumulative_angles[-1] % 360
+        return self.lower_limit + (self.upper_limit - self.lower_limit) * angle / 360.0
 
-    def update_animation(self):
+    def update_animation(self, now):
         if not self.is_animating:
+            self.frame_clock.unsubscribe(self.update_animation)
             return
 
+        self.elapsed_time = now - self.start_time
+        self.current_frame = min(int(self.elapsed_time // self.frame_interval), self.total_frames)
+
         if self.current_frame >= self.total_frames:
-            self.timer.stop()
+            self.frame_clock.unsubscribe(self.update_animation)
             self.is_animating = False
-            self.rotation_angle %= 360
+            self.rotation_angle = self.cumulative_angles[-1] % 360
             # Map the final angle to iteration time
-            angle = self.rotation_angle % 360
-            proportion = angle / 360.0
-            iteration_time = self.lower_limit + (self.upper_limit - self.lower_limit) * proportion
-            self.iteration_time_decided.emit(iteration_time)
+            iteration_time = self.final_iteration_time()
             self.text_label.setText(f"{iteration_time:.1f}s")
+            self.iteration_time_decided.emit(iteration_time)
+            return
+        # 降低更新頻率時跳過部分影格，停止的時間與最終角度不變
+        if now - self.last_refresh < self.refresh_interval_ms:
             return
+        self.last_refresh = now
 
-        # Update displayed text during animation
-        angle = (self.rotation_angle + self.rotation_angles[self.current_frame]) % 360
-        proportion = angle / 360.0
+        # Update rotation and displayed text during animation
+        self.rotation_angle = self.cumulative_angles[self.current_frame]
+        proportion = (self.rotation_angle % 360) / 360.0
         current_time = self.lower_limit + (self.upper_limit - self.lower_limit) * proportion
         self.text_label.setText(f"{current_time:.1f}s")
-
-        # Update rotation
-        self.rotation_angle += self.rotation_angles[self.current_frame]
-        self.current_frame += 1
+        self.update(self.wheel_rect())
 
     def set_limits(self, lower, upper):
         self.lower_limit = lower
         self.upper_limit = upper
+        self.wheel_face.set_limits(lower, upper)
+        self.update(self.wheel_rect())
+
+    def wheel_rect(self):
+        size = min(self.WHEEL_SIZE, self.height())
+        return QRect(0, (self.height() - size) // 2, size, size)
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        rect = self.rect()
-        painter.setRenderHint(QPainter.Antialiasing)
+        rect = self.wheel_rect()
+        radius = rect.width() / 2 - 4
+        self.wheel_face.paint(painter, QPointF(rect.center()), radius, self.rotation_angle,
+                              self.devicePixelRatioF())
+
+class LabelPool:
+    """可重複使用的 QLabel 物件池。
+
+    切換獎項時網格不再刪除所有格子再重建，而是重新設定既有的 QLabel；
+    多出的格子還給物件池，名單變大時才建立新的 QLabel。
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.free = []
+        self.in_use = 0
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+
+    def acquire(self):
+        if self.free:
+            label = self.free.pop()
+            self.reused += 1
+        else:
+            label = self.factory()
+            self.created += 1
+        self.in_use += 1
+        return label
+
+    def release(self, label):
+        # 脫離原本的父元件，網格被刪除時池中的格子不會跟著被刪除
+        label.hide()
+        label.setParent(None)
+        self.free.append(label)
+        self.in_use -= 1
+        self.released += 1
+
+    def stats(self):
+        return (f"{self.name}: 使用中 {self.in_use}、閒置 {len(self.free)}、"
+                f"累計建立 {self.created}、重複使用 {self.reused}、歸還 {self.released}")
+
+
+def new_employee_cell():
+    label = QLabel()
+    label.setAlignment(Qt.AlignCenter)
+    label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+    return label
+
+
+def new_winner_cell():
+    label = QLabel()
+    label.setAlignment(Qt.AlignCenter)
+    return label
+
 
-        painter.setPen(QPen(Qt.black, 2))
-        painter.setBrush(QBrush(Qt.white))
+CELL_LABEL_CHROME = 14  # 儲存格樣式上下的 padding 與框線
+BOARD_CELL_UNREVEALED = "border: 3px dashed lightgray; padding: 2px;"  # 大量揭曉中尚未出現的格子
+GL_BOARD_CELL_UNREVEALED = (None, "lightgray", 3, "lightgray", True)
+EMPLOYEE_CELL_POOL = LabelPool("員工網格", new_employee_cell)
+WINNER_CELL_POOL = LabelPool("中獎者看板", new_winner_cell)
+
+
+class EmployeeGrid(CellStateMixin, PhotoCellsMixin, QWidget):
+    """員工名單網格；高亮只重設有變動的儲存格，避免每幀重設全部樣式。"""
+
+    def __init__(self, min_font_size=25, parent=None):
+        super().__init__(parent)
+        self.grid_layout = QGridLayout(self)
+        self.min_font_size = min_font_size
+        self.cells = []  # 由 EMPLOYEE_CELL_POOL 取得的 QLabel
+        self.names = []  # 目前顯示的名單，相同名單切換時只需修補狀態
+        self.cell_styles = []  # 每格目前的樣式，相同樣式不重複 setStyleSheet
+        self.cols = 0
+        self.winner_flags = []
+        self.ineligible = set()  # 因資格規則無法參加本獎項的位置
+        self.highlighted = set()
+        self.eliminated = set()  # 淘汰模式中已被淘汰的位置
+
+    def populate(self, employees, winner_positions, ineligible=(), photos=None):
+        """Populate the employee grid; winners are given by roster position so duplicate names stay distinct.
+
+        photos 為每格的照片路徑（無照片為 None），照片在背景縮圖完成後才顯示。
+        """
+        num_employees = len(employees)
+        cols = grid_columns(num_employees) if num_employees else 0
+        # 既有的格子重新設定後沿用，多出的格子還給物件池
+        for label in self.cells[num_employees:]:
+            self.grid_layout.removeWidget(label)
+            EMPLOYEE_CELL_POOL.release(label)
+        reused_cells = self.cells[:num_employees]
+        reused_styles = self.cell_styles[:num_employees]
+        if cols != self.cols:
+            # 欄數改變時位置全部不同，先移出版面再依新位置加入
+            for label in reused_cells:
+                self.grid_layout.removeWidget(label)
+        self.cells = []
+        self.names = list(employees)
+        self.cell_styles = []
+        self.winner_flags = []
+        self.ineligible = set(ineligible)
+        self.highlighted = set()
+        self.eliminated = set()
+
+        if num_employees == 0:
+            self.cols = 0
+            self.set_photos(None)
+            return
+        rows = (num_employees + cols - 1) // cols
+
+        # Dynamically set font size based on grid size
+        cell_width = self.width() // cols
+        cell_height = self.height() // rows
+        dynamic_font_size = cell_font_size(cell_width, cell_height, self.min_font_size, bool(photos))
+
+        winner_set = set(winner_positions)
+        for index, employee in enumerate(employees):
+            row = index // cols
+            col = index % cols
+
+            if index < len(reused_cells):
+                label = reused_cells[index]
+                current_style = reused_styles[index]
+                in_layout = cols == self.cols
+            else:
+                label = EMPLOYEE_CELL_POOL.acquire()
+                current_style = None
+                in_layout = False
+            label.setText(employee)
+            if label.font().pointSize() != dynamic_font_size:
+                font = label.font()
+                font.setPointSize(dynamic_font_size)
+                label.setFont(font)
+
+            self.cells.append(label)
+            self.winner_flags.append(index in winner_set)
+            style = self.base_style(index)
+            if style != current_style:
+                label.setStyleSheet(style)
+            self.cell_styles.append(style)
+            if not in_layout:
+                self.grid_layout.addWidget(label, row, col)
+                label.show()
+        self.cols = cols
+        self.set_photos(photos)
+
+    def set_cell_style(self, index, style):
+        if 0 <= index < len(self.cells) and self.cell_styles[index] != style:
+            self.cells[index].setStyleSheet(style)
+            self.cell_styles[index] = style
+
+    def show_cell_photo(self, index, thumbnail, side):
+        """照片在上、姓名在下；thumbnail 為 None 時顯示預留方塊，空字串表示照片無法載入。"""
+        if index >= len(self.cells):
+            return
+        name = self.names[index]
+        if thumbnail == "":
+            self.cells[index].setText(name)
+            return
+        source = QUrl.fromLocalFile(thumbnail or photo_loader().placeholder(side)).toString()
+        self.cells[index].setText(f'<img src="{html.escape(source)}"><br>{html.escape(name)}')
+
+    def photo_text_height(self, cell_width, cell_height):
+        font = QFont(self.font())
+        font.setPointSize(cell_font_size(cell_width, cell_height, self.min_font_size, True))
+        return QFontMetrics(font).height() + CELL_LABEL_CHROME
+
+class WinnerBoard(QWidget):
+    """中獎者看板，固定大小的格子依序排列。"""
+
+    def __init__(self, cell_width=220, cell_height=80, font_size=40, cols=8, parent=None):
+        super().__init__(parent)
+        self.grid_layout = QGridLayout(self)
+        self.cell_width = cell_width  # Fixed width for each grid
+        self.cell_height = cell_height  # Fixed height for each grid
+        self.font_size = font_size
+        self.cols = cols  # Fixed number of columns
+        self.cells = []  # 由 WINNER_CELL_POOL 取得的 QLabel
+        self.cell_styles = []
+        self.winners = []
+        self.colors = None
+        self.revealed = 0  # 已揭曉的格數，其餘格子以虛線框預留位置
+
+    def populate(self, winners, rainbow_format="", colorful=False):
+        """Populate the winner grid with the given winners."""
+        colors = winner_colors(len(winners), rainbow_format) if colorful else None
+        self.show_page(winners, colors)
+
+    def page_capacity(self, height=None):
+        return board_page_capacity(self.height() if height is None else height, self.cell_height, self.cols)
+
+    def show_page(self, winners, colors=None, revealed=None):
+        """顯示一頁中獎者；revealed 為已揭曉的格數（預設全部）。"""
+        # 欄數固定，既有的格子位置不變可直接沿用，多出的格子還給物件池
+        for label in self.cells[len(winners):]:
+            self.grid_layout.removeWidget(label)
+            WINNER_CELL_POOL.release(label)
+        del self.cells[len(winners):]
+        del self.cell_styles[len(winners):]
+        self.winners = list(winners)
+        self.colors = colors
+        self.revealed = len(winners) if revealed is None else min(revealed, len(winners))
+
+        for index in range(len(winners)):
+            row = index // self.cols
+            col = index % self.cols
+
+            if index >= len(self.cells):
+                # 池中的格子可能來自格子大小不同的看板（主畫面、抽獎面板、大量揭曉），
+                # 每次取得都重設大小與字型；樣式記為 None，由 _set_cell 一律重設
+                label = WINNER_CELL_POOL.acquire()
+                label.setFixedSize(self.cell_width, self.cell_height)
+                if label.font().pointSize() != self.font_size:
+                    font = label.font()
+                    font.setPointSize(self.font_size)
+                    label.setFont(font)
+                self.cells.append(label)
+                self.cell_styles.append(None)
+                self.grid_layout.addWidget(label, row, col)
+                label.show()
+            self._set_cell(index, index < self.revealed)
+
+    def reveal(self, count):
+        """揭曉到第 count 格，只設定新出現的格子。"""
+        count = min(count, len(self.winners))
+        for index in range(self.revealed, count):
+            self._set_cell(index, True)
+        self.revealed = max(self.revealed, count)
+
+    def _set_cell(self, index, shown):
+        label = self.cells[index]
+        if shown:
+            # Set background and border styles
+            background_color = self.colors[index] if self.colors else "yellow"
+            style = f"background-color: {background_color}; border: 3px solid black; padding: 2px;"
+            label.setText(self.winners[index])
+        else:
+            style = BOARD_CELL_UNREVEALED
+            label.setText("")
+        if self.cell_styles[index] != style:
+            label.setStyleSheet(style)
+            self.cell_styles[index] = style
+
+
+def opengl_available():
+    """是否能建立 OpenGL context（含 Mesa 等軟體繪製）。"""
+    context = QOpenGLContext()
+    return context.create()
+
+
+class GLEmployeeGrid(CellStateMixin, PhotoCellsMixin, QOpenGLWidget):
+    """以 QOpenGLWidget 繪製的員工名單網格，介面與 EmployeeGrid 相同。
+
+    不建立任何 QLabel，整個網格在 paintGL 中批次繪製；高亮變動時只更新
+    樣式陣列並排入一次重繪。
+    """
+
+    def __init__(self, min_font_size=25, parent=None):
+        super().__init__(parent)
+        self.min_font_size = min_font_size
+        self.names = []
+        self.cell_styles = []
+        self.winner_flags = []
+        self.ineligible = set()
+        self.highlighted = set()
+        self.eliminated = set()
+        self.texts = []
+        self.font_size = None  # 目前 QStaticText 排版使用的字體大小
+        self.cell_photos = {}  # 位置 -> 縮圖 QImage，尚未完成者為空的 QImage
+
+    def populate(self, employees, winner_positions, ineligible=(), photos=None):
+        winner_set = set(winner_positions)
+        self.names = list(employees)
+        self.winner_flags = [index in winner_set for index in range(len(employees))]
+        self.ineligible = set(ineligible)
+        self.highlighted = set()
+        self.eliminated = set()
+        self.cell_styles = [self.base_style(index) for index in range(len(employees))]
+        self.texts = [QStaticText(employee) for employee in employees]
+        self.font_size = None
+        self.cell_photos = {}
+        self.set_photos(photos)
+        self.update()
+
+    def set_cell_style(self, index, style):
+        if 0 <= index < len(self.cell_styles) and self.cell_styles[index] != style:
+            self.cell_styles[index] = style
+            self.update()
+
+    def show_cell_photo(self, index, thumbnail, side):
+        if index >= len(self.cell_styles):
+            return
+        if thumbnail == "":
+            self.cell_photos.pop(index, None)  # 照片無法載入，只顯示姓名
+        else:
+            self.cell_photos[index] = QImage(thumbnail) if thumbnail else QImage()
+        self.update()
+
+    def photo_text_height(self, cell_width, cell_height):
+        font = QFont(self.font())
+        font.setPointSize(cell_font_size(cell_width, cell_height, self.min_font_size, True))
+        return QFontMetrics(font).height() + CELL_PHOTO_PADDING
+
+    def cell_rects(self):
+        return grid_cell_rects(len(self.cell_styles), self.width(), self.height())
+
+    def paintGL(self):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().window())
+        if self.cell_styles:
+            rects, cell_width, cell_height = self.cell_rects()
+            font = self.font()
+            font.setPointSize(cell_font_size(cell_width, cell_height, self.min_font_size, bool(self.photos)))
+            if self.font_size != font.pointSize():
+                prepare_static_texts(self.texts, font)
+                self.font_size = font.pointSize()
+            paint_cell_batch(painter, rects, [GL_CELL_STYLES[style] for style in self.cell_styles],
+                             self.texts, font, self.cell_photos)
+        painter.end()
+
+
+class GLWinnerBoard(QOpenGLWidget):
+    """以 QOpenGLWidget 繪製的中獎者看板，介面與 WinnerBoard 相同。"""
+
+    def __init__(self, cell_width=220, cell_height=80, font_size=40, cols=8, parent=None):
+        super().__init__(parent)
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.font_size = font_size
+        self.cols = cols
+        self.styles = []
+        self.texts = []
+        self.winners = []
+        self.page_styles = []  # 揭曉後的樣式與文字
+        self.page_texts = []
+        self.revealed = 0
+        self.blank_text = QStaticText("")
+
+    def populate(self, winners, rainbow_format="", colorful=False):
+        colors = winner_colors(len(winners), rainbow_format) if colorful else None
+        self.show_page(winners, colors)
+
+    def page_capacity(self, height=None):
+        return board_page_capacity(self.height() if height is None else height, self.cell_height, self.cols)
+
+    def show_page(self, winners, colors=None, revealed=None):
+        self.winners = list(winners)
+        self.page_styles = [(colors[index] if colors else "yellow", "black", 3, "black", False)
+                            for index in range(len(winners))]
+        font = self.font()
+        font.setPointSize(self.font_size)
+        self.page_texts = [QStaticText(winner) for winner in winners]
+        prepare_static_texts(self.page_texts, font)
+        self.revealed = len(winners) if revealed is None else min(revealed, len(winners))
+        self.styles = self.page_styles[:self.revealed] + [GL_BOARD_CELL_UNREVEALED] * (len(winners) - self.revealed)
+        self.texts = self.page_texts[:self.revealed] + [self.blank_text] * (len(winners) - self.revealed)
+        self.update()
+
+    def reveal(self, count):
+        count = min(count, len(self.page_styles))
+        if count <= self.revealed:
+            return
+        self.styles[self.revealed:count] = self.page_styles[self.revealed:count]
+        self.texts[self.revealed:count] = self.page_texts[self.revealed:count]
+        self.revealed = count
+        self.update()
+
+    def paintGL(self):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().window())
+        if self.styles:
+            rects = board_cell_rects(len(self.styles), self.width(), self.cell_width, self.cell_height, self.cols)
+            font = self.font()
+            font.setPointSize(self.font_size)
+            paint_cell_batch(painter, rects, self.styles, self.texts, font)
+        painter.end()
+
+
+DRAW_MODES = [MODE_RANDOM, MODE_SEQUENTIAL, MODE_CONSECUTIVE, MODE_ELIMINATION, MODE_BULK]
+BULK_MAX_PICK = 1000       # 大量揭曉模式一次可抽出的人數上限（其他模式為 50）
+BOARD_MAX_CELLS = 96       # 看板超過此數量的中獎者時只顯示最後一頁
+STATUS_MAX_NAMES = 20      # 狀態列最多列出的中獎者姓名
+BULK_CELL_STAGGER_MS = 25  # 大量揭曉時同一頁的格子依序出現的間隔
+BULK_PAGE_HOLD_MS = 2000   # 一頁全部出現後停留的時間
+BULK_CELL_WIDTH = 160      # 大量揭曉使用較小的格子，一頁可顯示更多人
+BULK_CELL_HEIGHT = 44
+BULK_FONT_SIZE = 18
+BULK_MAX_ROWS = 10         # 名單很大時員工網格可能超出螢幕，每頁列數另設上限
+
+
+class BulkRevealView(QStackedWidget):
+    """大量揭曉的中獎者看板：數百位中獎者分頁依序出現。
+
+    兩個看板輪流作為顯示中的頁面與預先載入的下一頁：目前頁全部出現後的
+    停留期間在背景頁面排好下一頁的格子與文字，換頁只需翻頁。動畫由共用的
+    影格時鐘推進；點一下畫面可讓本頁立即全部出現或跳到下一頁。
+    最後一頁停留後發出 finished。
+    """
+
+    finished = Signal()
+
+    def __init__(self, board_factory, frame_clock, parent=None):
+        super().__init__(parent)
+        self.frame_clock = frame_clock
+        self.boards = [board_factory(BULK_CELL_WIDTH, BULK_CELL_HEIGHT, BULK_FONT_SIZE) for _ in range(2)]
+        for board in self.boards:
+            if board.layout() is not None:
+                board.layout().setAlignment(Qt.AlignTop | Qt.AlignHCenter)  # 與 OpenGL 看板相同，從上方排列
+            self.addWidget(board)
+        self.names = []
+        self.colors = None
+        self.page_size = 0
+        self.page = 0
+        self.page_count = 0
+        self.page_start_time = 0
+        self.prefetched = False  # 下一頁是否已載入背景頁面
+        self.running = False
+
+    def start(self, names, colors=None):
+        """names 為本次的中獎者，colors 為對應的顏色（單色時為 None）。"""
+        self.stop()
+        self.names = list(names)
+        self.colors = colors
+        cols = board_columns_for(self.width(), BULK_CELL_WIDTH)
+        for board in self.boards:
+            if board.cols != cols:
+                board.show_page([])  # 欄數改變時格子位置全部不同，先清空
+                board.cols = cols
+        self.page_size = min(self.boards[0].page_capacity(self.height()), cols * BULK_MAX_ROWS)
+        self.page_count = max(1, (len(self.names) + self.page_size - 1) // self.page_size)
+        self._load_page(0)
+        self._show_page(0)
+        self.running = True
+        self.frame_clock.subscribe(self.on_frame)
+
+    def stop(self):
+        if self.running:
+            self.frame_clock.unsubscribe(self.on_frame)
+            self.running = False
+
+    def _load_page(self, page):
+        start = page * self.page_size
+        end = start + self.page_size
+        colors = self.colors[start:end] if self.colors else None
+        self.boards[page % 2].show_page(self.names[start:end], colors, revealed=0)
+
+    def _show_page(self, page):
+        self.page = page
+        self.setCurrentWidget(self.boards[page % 2])
+        self.page_start_time = self.frame_clock.now()
+        self.prefetched = page + 1 >= self.page_count
+
+    def on_frame(self, now):
+        board = self.currentWidget()
+        elapsed = now - self.page_start_time
+        board.reveal(int(elapsed // BULK_CELL_STAGGER_MS) + 1)
+        if board.revealed < len(board.winners):
+            return
+        if not self.prefetched:
+            self._load_page(self.page + 1)
+            self.prefetched = True
+        if elapsed >= len(board.winners) * BULK_CELL_STAGGER_MS + BULK_PAGE_HOLD_MS:
+            self.next_page()
+
+    def next_page(self):
+        if self.page + 1 >= self.page_count:
+            self.stop()
+            self.finished.emit()
+            return
+        if not self.prefetched:
+            self._load_page(self.page + 1)
+        self._show_page(self.page + 1)
+
+    def mousePressEvent(self, event):
+        board = self.currentWidget()
+        if self.running and board.revealed < len(board.winners):
+            board.reveal(len(board.winners))
+            self.page_start_time = self.frame_clock.now() - len(board.winners) * BULK_CELL_STAGGER_MS
+        elif self.running:
+            self.next_page()
+        super().mousePressEvent(event)
+
+
+REWARD_VIEW_CACHE_SIZE = 4
+
+
+class RewardViewCache:
+    """最近使用過的獎項畫面（員工網格 + 中獎者看板）的 LRU 快取。
+
+    每個獎項的網格與看板各是 QStackedWidget 的一頁，切換到快取中的獎項只需翻頁，
+    再由呼叫端修補有變動的格子；超過容量時淘汰最久未使用的獎項，
+    其格子還給物件池供新的畫面使用。
+    """
+
+    def __init__(self, grid_stack, board_stack, capacity=REWARD_VIEW_CACHE_SIZE):
+        self.grid_stack = grid_stack
+        self.board_stack = board_stack
+        self.capacity = capacity
+        self.views = OrderedDict()  # 獎項 index -> (員工網格, 中獎者看板)，最後一個為最近使用
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def show(self, index, create):
+        """翻到該獎項的頁面並回傳 (網格, 看板)；不在快取中時以 create() 建立。"""
+        view = self.views.get(index)
+        if view is not None:
+            self.views.move_to_end(index)
+            self.hits += 1
+        else:
+            self.misses += 1
+            view = create()
+            self.views[index] = view
+            for stack, widget in zip((self.grid_stack, self.board_stack), view):
+                widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+                stack.addWidget(widget)
+                # 新頁面先設成目前的大小，網格依此計算字體大小
+                widget.resize(stack.size())
+            while len(self.views) > self.capacity:
+                self._evict(next(iter(self.views)))
+        grid, board = view
+        self.grid_stack.setCurrentWidget(grid)
+        self.board_stack.setCurrentWidget(board)
+        return view
+
+    def _evict(self, index):
+        for stack, widget in zip((self.grid_stack, self.board_stack), self.views.pop(index)):
+            stack.removeWidget(widget)
+            # 清空後格子回到物件池，不會隨著頁面一起被刪除
+            widget.populate([], ())
+            widget.deleteLater()
+        self.evictions += 1
+
+    def clear(self):
+        for index in list(self.views):
+            self._evict(index)
+
+    def stats(self):
+        return (f"獎項畫面快取: {len(self.views)}/{self.capacity}、命中 {self.hits}、"
+                f"建立 {self.misses}、淘汰 {self.evictions}")
+
+
+class DrawPanel(QWidget):
+    """並行抽獎面板：擁有自己的獎項、抽獎引擎與時程，與主畫面共用影格時鐘。"""
+
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.engine = DrawEngine()
+        self.reward_info = None
+        self.draw_start_time = 0
+        self.last_frame_elapsed = 0
+        self.consecutive_left = 0  # 連抽模式尚未開始的次數
+        self.bulk_reveal = None    # 大量揭曉的分頁看板，第一次使用時建立
+
+        layout = QVBoxLayout(self)
+        control_layout = QHBoxLayout()
+        self.reward_combo = QComboBox()
+        for index in app.reward_ids:
+            self.reward_combo.addItem(app.reward_info[index]['ShowrewardName'], userData=index)
+        self.reward_combo.currentIndexChanged.connect(self.update_reward)
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(DRAW_MODES)
+        self.mode_combo.currentIndexChanged.connect(self.update_mode)
+        self.pick_label = QLabel("單抽人數:")
+        self.pick_spinner = QSpinBox()
+        self.pick_spinner.setRange(1, 50)
+        self.pull_button = QPushButton("抽獎開始!")
+        self.pull_button.clicked.connect(self.start_draw)
+        self.close_button = QPushButton("移除")
+        self.close_button.clicked.connect(self.remove_panel)
+        control_layout.addWidget(self.reward_combo, stretch=1)
+        control_layout.addWidget(self.mode_combo)
+        control_layout.addWidget(self.pick_label)
+        control_layout.addWidget(self.pick_spinner)
+        control_layout.addWidget(self.pull_button)
+        control_layout.addWidget(self.close_button)
+        layout.addLayout(control_layout)
+
+        self.wheel_widget = WheelWidget(app.frame_clock)
+        self.wheel_widget.refresh_interval_ms = app.quality.settings()['wheel_interval_ms']
+        self.wheel_widget.iteration_time_decided.connect(self.wheel_animation_finished)
+        layout.addWidget(self.wheel_widget, alignment=Qt.AlignCenter)
+
+        self.winner_board = WinnerBoard(cell_width=120, cell_height=40, font_size=16, cols=4)
+        layout.addWidget(self.winner_board, stretch=1)
+
+        self.employee_grid = EmployeeGrid(min_font_size=10)
+        self.employee_grid.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.grid_stack = QStackedWidget()  # 員工網格與大量揭曉的分頁看板
+        self.grid_stack.addWidget(self.employee_grid)
+        layout.addWidget(self.grid_stack, stretch=3)
+
+        self.update_reward()
+
+    def is_drawing(self):
+        return self.engine.running or self.wheel_widget.is_animating
+
+    def update_reward(self):
+        """切換面板的獎項。"""
+        if not self.app.reward_ids:
+            return
+        self.reward_info = self.app.reward_info[self.reward_combo.currentData()]
+        self.refresh()
+
+    def refresh(self):
+        index = self.reward_info['index']
+        self.employee_grid.populate(self.app.roster_names(self.reward_info),
+                                    self.app.eligibility.winner_positions(index),
+                                    self.app.eligibility.ineligible_indices(index),
+                                    self.app.roster_photos(self.reward_info))
+        self.refresh_winner_board()
+
+    def refresh_winner_board(self):
+        self.app.fill_winner_board(self.winner_board, self.reward_info)
+
+    def update_mode(self):
+        """面板自己的抽取模式；大量揭曉可抽出 BULK_MAX_PICK 人，其他模式為 50 人。"""
+        mode = self.mode_combo.currentText()
+        self.pick_spinner.setRange(1, BULK_MAX_PICK if mode == MODE_BULK else 50)
+        if mode == MODE_CONSECUTIVE:
+            self.pick_label.setText("連抽人數:")
+        elif mode == MODE_BULK:
+            self.pick_label.setText("揭曉人數:")
+        else:
+            self.pick_label.setText("單抽人數:")
+
+    def draw_arguments(self, iteration_time):
+        """連抽模式每次抽出一人，共抽 pick_spinner 次。"""
+        mode = self.mode_combo.currentText()
+        pick_count = 1 if mode == MODE_CONSECUTIVE else self.pick_spinner.value()
+        return self.app.draw_arguments(self.reward_info, mode, pick_count, iteration_time)
+
+    def start_draw(self):
+        if self.reward_info is None:
+            return
+        if self.app.is_reward_drawing(self.reward_info, exclude=self):
+            QMessageBox.warning(self, '警告', "此獎項正在其他面板抽獎中。")
+            return
+        pick_count = self.pick_spinner.value()
+        pickNum = self.reward_info['pickNum']
+        potential_total_winners = len(self.reward_info['winners']) + pick_count
+        if potential_total_winners > pickNum:
+            reply = QMessageBox.question(self, '警告',
+                                         f"此次抽獎人數將使得總中獎人數 ({potential_total_winners}) 超過抽取上限 {pickNum}，是否繼續？",
+                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply == QMessageBox.No:
+                return
+        self.consecutive_left = pick_count - 1 if self.mode_combo.currentText() == MODE_CONSECUTIVE else 0
+        self.start_draw_unit()
+
+    def start_draw_unit(self):
+        self.stop_bulk_reveal()
+        self.pull_button.setEnabled(False)
+        self.reward_combo.setEnabled(False)
+        self.mode_combo.setEnabled(False)
+        # 清除上一輪的紅色高亮
+        self.employee_grid.mark_winners(
+            [i for i, flag in enumerate(self.employee_grid.winner_flags) if flag], CELL_STYLE_WINNER)
+        lower_limit, upper_limit = self.app.iteration_time_limits()
+        self.wheel_widget.set_limits(lower_limit, upper_limit)
+        self.wheel_widget.start_animation()
+        # 轉盤停止的時間在開始轉動時即已決定，趁轉動時在背景預先算好整個歷遍
+        self.engine.start(*self.draw_arguments(self.wheel_widget.final_iteration_time()))
+
+    def wheel_animation_finished(self, iteration_time):
+        args = self.draw_arguments(iteration_time)
+        if not self.engine.matches(*args):
+            self.engine.start(*args)  # 轉動期間資格已改變，重新規劃
+        if not self.engine.running:
+            self.end_draw()
+            return
+        self.employee_grid.clear_eliminated()
+        self.employee_grid.highlight_style = self.app.quality.settings()['highlight_style']
+        self.draw_start_time = self.app.frame_clock.now()
+        self.last_frame_elapsed = 0
+        self.app.frame_clock.subscribe(self.on_frame)
+
+    def on_frame(self, now):
+        elapsed = now - self.draw_start_time
+        # 畫面效果降低時合併短時間內到期的幀，結束時間不變
+        if (elapsed - self.last_frame_elapsed < self.app.quality.settings()['repaint_interval_ms']
+                and elapsed < self.engine.total_duration_ms):
+            return
+        try:
+            changed, finished = self.engine.advance(elapsed)
+        except RuntimeError:
+            self.app.frame_clock.unsubscribe(self.on_frame)
+            self.abort_draw()
+            return
+        if finished:
+            self.app.frame_clock.unsubscribe(self.on_frame)
+            self.finish_draw()
+        elif changed:
+            self.last_frame_elapsed = elapsed
+            if self.engine.mode == MODE_ELIMINATION:
+                self.employee_grid.knock_out(self.engine.knocked_out)
+            else:
+                self.employee_grid.set_highlight(self.engine.current_indices)
+
+    def finish_draw(self):
+        if self.engine.mode == MODE_ELIMINATION:
+            self.employee_grid.knock_out(self.engine.knocked_out)
+        self.employee_grid.set_highlight([])
+        self.employee_grid.highlight_style = CELL_STYLE_HIGHLIGHT
+        winner_indices = self.engine.winner_indices()
+        self.employee_grid.mark_winners(winner_indices)
+        winners = self.app.record_winners(self.reward_info, winner_indices)
+        QTimer.singleShot(0, self.refresh_winner_board)  # 看板在中獎者的高亮畫出後才重建
+        self.app.commit_winners(self.reward_info, winners, source=self)
+        if self.engine.mode == MODE_BULK:
+            self.start_bulk_reveal(winners)
+        if self.consecutive_left > 0:
+            self.consecutive_left -= 1
+            self.start_draw_unit()
+            return
+        self.end_draw()
+
+    def abort_draw(self):
+        """背景規劃失敗：清除高亮並恢復操作，不寫入中獎紀錄。"""
+        error = self.engine.plan.error
+        print(f"並行抽獎面板抽獎中止: {error}")
+        self.employee_grid.set_highlight([])
+        self.employee_grid.clear_eliminated()
+        self.employee_grid.highlight_style = CELL_STYLE_HIGHLIGHT
+        self.end_draw()
+        QMessageBox.critical(self, "抽獎錯誤", f"背景規劃失敗，本次抽獎沒有產生中獎者：\n{error}")
+
+    def end_draw(self):
+        self.consecutive_left = 0
+        self.pull_button.setEnabled(True)
+        self.reward_combo.setEnabled(True)
+        self.mode_combo.setEnabled(True)
+        self.app._apply_pending_reloads()
+
+    def start_bulk_reveal(self, winners):
+        if self.bulk_reveal is None:
+            self.bulk_reveal = BulkRevealView(WinnerBoard, self.app.frame_clock)
+            self.bulk_reveal.finished.connect(self.stop_bulk_reveal)
+            self.grid_stack.addWidget(self.bulk_reveal)
+            self.bulk_reveal.resize(self.grid_stack.size())
+        self.grid_stack.setCurrentWidget(self.bulk_reveal)
+        self.app.start_reveal(self.bulk_reveal, self.reward_info, winners)
+
+    def stop_bulk_reveal(self):
+        if self.bulk_reveal is None:
+            return
+        self.bulk_reveal.stop()
+        self.grid_stack.setCurrentWidget(self.employee_grid)
+
+    def remove_panel(self):
+        if self.is_drawing():
+            return
+        self.app.frame_clock.unsubscribe(self.on_frame)
+        self.stop_bulk_reveal()
+        self.app.multi_draw_window.remove_panel(self)
+
+class MultiDrawWindow(QWidget):
+    """並排顯示多個並行抽獎面板的視窗。"""
+
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        self.panels = []
+        self.setWindowTitle("Rontgen Roulette - 並行抽獎")
+        self.setWindowIcon(QIcon("resources/icon.png"))
+        self.resize(1600, 900)
+
+        layout = QVBoxLayout(self)
+        add_button = QPushButton("新增抽獎面板")
+        add_button.clicked.connect(self.add_panel)
+        layout.addWidget(add_button)
+        self.panel_layout = QHBoxLayout()
+        layout.addLayout(self.panel_layout, stretch=1)
+
+    def add_panel(self):
+        panel = DrawPanel(self.app)
+        self.panels.append(panel)
+        self.panel_layout.addWidget(panel)
+        return panel
+
+    def add_reward_item(self, index):
+        """熱重載新增獎項時，同步加入各面板的獎項選單。"""
+        for panel in self.panels:
+            panel.reward_combo.addItem(self.app.reward_info[index]['ShowrewardName'], userData=index)
+
+    def rename_reward_item(self, index):
+        """熱重載改變獎項名稱時，同步更新各面板的獎項選單。"""
+        name = self.app.reward_info[index]['ShowrewardName']
+        for panel in self.panels:
+            item = panel.reward_combo.findData(index)
+            if item >= 0:
+                panel.reward_combo.setItemText(item, name)
+
+    def remove_panel(self, panel):
+        self.panels.remove(panel)
+        panel.deleteLater()
+
+    def refresh_reward(self, reward_info, source=None):
+        """其他面板或主畫面寫入中獎者後，同步顯示同一獎項的面板。"""
+        for panel in self.panels:
+            if panel.is_drawing():
+                continue
+            if panel.reward_info is reward_info and panel is not source:
+                panel.refresh()
+            else:
+                # 跨獎項排除與部門配額可能改變其他獎項的資格
+                panel.employee_grid.set_ineligible(
+                    self.app.eligibility.ineligible_indices(panel.reward_info['index']))
 
 class RouletteApp(QMainWindow):
     def __init__(self):
@@ -120,8 +1026,34 @@ class RouletteApp(QMainWindow):
         self.reward_info = {}
         self.current_reward_info = None
         self.current_reward_id = None
+        self.frame_clock = FrameClock(self)  # 主畫面與並行面板共用的影格時鐘
+        # 依轉盤與歷遍開頭的影格間隔自動降低畫面效果（較舊的電腦）
+        self.quality = QualityController()
+        self.engine = DrawEngine()
+        self.draw_start_time = 0
+        self.last_frame_elapsed = 0  # 最近一次換幀時的歷遍經過時間
+        self.multi_draw_window = None
+        self.bulk_reveal = None  # 大量揭曉的分頁看板，第一次使用時建立
+        # 抽獎各階段的耗時追蹤，可輸出為 Chrome/Perfetto trace
+        self.tracer = DrawTracer()
+        self.draw_span = None
+        self.wheel_span = None
+        self.traversal_span = None
+        self.last_draw = None  # 最近一次抽獎的輕量參照，輸出影片時才組成 DrawRecording
+        self.board_refresh_pending = False  # 中獎看板已排入下一輪事件迴圈重建
+        # 事件迴圈停頓時取樣 GUI 執行緒的堆疊，記錄到 stalls.log 與階段追蹤
+        self.watchdog = StallWatchdog(self.tracer, parent=self)
+        # 結果檔案、快照與資料庫在背景執行緒寫入，不阻塞畫面
+        self.exporter = ResultExporter(self, tracer=self.tracer)
+        self.exporter.export_finished.connect(self.on_export_finished)
+        self.exporter.export_failed.connect(self.on_export_failed)
+        # 可選的 SQLite 後端：資料庫檔存在時啟用
+        self.store = None
+        if os.path.exists(STORE_FILE):
+            self._open_store()
         self.load_rewards()
         self.init_ui()
+        self._init_rewards_watcher()
         self.highlighting_winner = False  # 新增布林變數
         self.recursion = 0 # 連抽模式的遞迴次數
         
@@ -134,97 +1066,235 @@ class RouletteApp(QMainWindow):
         self.rolling_sound = pygame.mixer.Sound("resources/rolling_sound.wav")
         self.rolling_sound.set_volume(0.5)
         self.sound_channel = pygame.mixer.Channel(0)
-        
+        # 依歷遍時程預先混音的滾動音效；無法使用時退回每一幀重新播放
+        self.tick_audio = None
+        if audio_scheduler_available():
+            try:
+                self.tick_audio = TickAudioScheduler(self.rolling_sound, self.sound_channel)
+            except Exception as e:
+                print(f"滾動音效混音初始化失敗，改用逐幀播放: {e}")
+
+        # 若有上次的快照（例如程式當機），直接恢復抽獎狀態
+        self.snapshot_file = SNAPSHOT_FILE
+        self.restore_session_snapshot()
+
     def _generate_result_file_name(self):
         """生成不覆蓋舊檔的檔名，格式為 '得獎名單_YYYYMMDD_HHMMSS.csv'"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         return f"得獎名單_{timestamp}.csv"
 
     def _initialize_result_file(self):
-        """初始化結果檔案，在第一次抽獎時呼叫"""
+        """初始化結果檔名，在第一次抽獎時呼叫（標題行由輸出執行緒寫入）"""
         if not self.file_initialized:
             self.result_file = self._generate_result_file_name()
-            # 創建檔案並寫入標題行
-            with open(self.result_file, "w", newline="", encoding="utf-8-sig") as file:
-                writer = csv.writer(file, delimiter=",")
-                writer.writerow(["員工姓名", "完整獎項名稱", "獎項ID"])
             self.file_initialized = True
 
-    def _save_results_to_file(self, winners):
-        """將中獎結果寫入檔案"""
+    def _results_summary(self):
+        """依獎項ID分組的完整中獎名單，供輸出 JSON/XLSX 摘要。"""
+        registry = self.registry
+        summary = {}
+        for reward_info in self.reward_info.values():
+            if not reward_info['winners']:
+                continue
+            summary[reward_info['rewardID'] or reward_info['index']] = {
+                'fullName': reward_info['fullrewardName'],
+                'showName': reward_info['ShowrewardName'],
+                'winners': [{'name': registry.names[pid],
+                             'department': registry.departments[pid],
+                             'occurrence': registry.occurrences[pid] + 1}
+                            for pid in reward_info['winners']],
+            }
+        return summary
+
+    def _save_results_to_file(self, winners, reward_info=None):
+        """將中獎結果交給輸出執行緒寫入檔案，reward_info 預設為目前獎項"""
+        if reward_info is None:
+            reward_info = self.current_reward_info
         if not self.file_initialized:
             self._initialize_result_file()
-        # 將中獎者寫入檔案
-        with open(self.result_file, "a", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file, delimiter=",")
-            fullrewardName = self.current_reward_info['fullrewardName']
-            rewardID = self.current_reward_info['rewardID']
-            for winner in winners:
-                writer.writerow([winner, fullrewardName, rewardID])
+        fullrewardName = reward_info['fullrewardName']
+        rewardID = reward_info['rewardID']
+        registry = self.registry
+        # 部門與同名序號讓同名者在匯入時能對應回正確的人
+        with self.tracer.span("file write", rows=len(winners)):
+            rows = [[registry.names[pid], fullrewardName, rewardID,
+                     registry.departments[pid], registry.occurrences[pid] + 1]
+                    for pid in winners]
+            self.exporter.submit_commit(self.result_file, rows, self._results_summary())
+            if self.store is not None:
+                self.exporter.submit_store('add_winners', reward_info['index'], self._winner_records(winners))
+
+    def on_export_finished(self, outputs):
+        print(f"得獎名單已輸出: {outputs}")
+
+    def on_export_failed(self, message):
+        print(f"得獎名單輸出失敗: {message}")
+        self.statusBar().showMessage(f"得獎名單輸出失敗: {message}")
+
+    def closeEvent(self, event):
+        """關閉前等待背景輸出完成，並將本次活動的階段追蹤寫在得獎名單旁。"""
+        self.watchdog.stop()
+        self.exporter.close()
+        if self.store is not None:
+            self.store.close()
+        if self.result_file and len(self.tracer):
+            try:
+                atomic_write_bytes(os.path.splitext(self.result_file)[0] + ".trace.json", self.tracer.dumps())
+            except OSError as e:
+                print(f"階段追蹤輸出失敗: {e}")
+        super().closeEvent(event)
+
+    def validate_event_plan(self):
+        """檢查 rewards 資料夾與本次活動的得獎名單，列出所有問題。"""
+        result_files = [self.result_file] if self.result_file and os.path.exists(self.result_file) else []
+        report = validate_event(self.rewards_folder, result_files)
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Validate Event Plan")
+        layout = QVBoxLayout()
+        text_edit = QTextEdit()
+        text_edit.setReadOnly(True)
+        text_edit.setPlainText(report.format())
+        text_edit.setStyleSheet("font-size: 14pt;")
+        layout.addWidget(text_edit)
+        dialog.setLayout(layout)
+        dialog.resize(1000, 600)
+        dialog.exec_()
+
+    def export_draw_trace(self):
+        """將抽獎階段追蹤輸出為 Chrome/Perfetto trace JSON（可在 ui.perfetto.dev 或 chrome://tracing 開啟）。"""
+        default_name = f"draw_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        path, _ = QFileDialog.getSaveFileName(self, "Export Draw Trace", default_name, "Trace JSON (*.json)")
+        if not path:
+            return
+        try:
+            atomic_write_bytes(path, self.tracer.dumps())
+        except OSError as e:
+            QMessageBox.critical(self, "錯誤", f"無法寫入 {path}: {e}")
+            return
+        self.statusBar().showMessage(f"已輸出 {len(self.tracer)} 筆階段追蹤至 {path}")
+
+    def export_draw_video(self):
+        """將最近一次抽獎離屏輸出為影片（有 ffmpeg 時）或 PNG 序列，並另存抽獎紀錄供 draw_video.py 重新輸出。"""
+        if self.last_draw is None:
+            QMessageBox.information(self, "Export Draw Video", "尚未有可輸出的抽獎。")
+            return
+        recording = self.build_draw_recording(self.last_draw)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if find_ffmpeg() is not None:
+            path, _ = QFileDialog.getSaveFileName(self, "Export Draw Video", f"draw_{stamp}.mp4", "Video (*.mp4)")
+            if not path:
+                return
+            recording_path = os.path.splitext(path)[0] + ".draw.json"
+        else:
+            # 沒有 ffmpeg 時輸出 PNG 序列到所選資料夾下的新資料夾
+            folder = QFileDialog.getExistingDirectory(self, "Export Draw Video (PNG)")
+            if not folder:
+                return
+            path = os.path.join(folder, f"draw_{stamp}")
+            recording_path = path + ".draw.json"
+
+        progress = QProgressDialog("正在輸出抽獎影片...", "取消", 0, 100, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+
+        def update_progress(done, total):
+            progress.setMaximum(total)
+            progress.setValue(done)
+            return not progress.wasCanceled()
+
+        started = time.perf_counter()
+        try:
+            recording.save(recording_path)
+            count = export_video(recording, path, progress=update_progress)
+        except InterruptedError:
+            self.statusBar().showMessage("已取消輸出抽獎影片")
+            return
+        except (OSError, RuntimeError) as e:
+            QMessageBox.critical(self, "錯誤", f"無法輸出抽獎影片: {e}")
+            return
+        finally:
+            progress.close()
+        self.statusBar().showMessage(f"已輸出 {count} 個影格（影片長度 {recording.duration_ms / 1000:.1f} 秒，"
+                                     f"耗時 {time.perf_counter() - started:.1f} 秒）至 {path}")
+
+    def _open_store(self):
+        """開啟 SQLite 後端：GUI 執行緒只讀取，寫入交給輸出執行緒。"""
+        self.store = RouletteStore(STORE_FILE)
+        self.exporter.open_store(STORE_FILE)
+
+    def _winner_records(self, pids):
+        registry = self.registry
+        return [(registry.names[pid], registry.departments[pid], registry.occurrences[pid]) for pid in pids]
+
+    def _sync_store_winners(self):
+        """以目前所有獎項的中獎者更新資料庫（匯入、恢復或開始新活動後使用）。"""
+        if self.store is not None:
+            self.exporter.submit_store('replace_winners', {
+                index: self._winner_records(reward_info['winners'])
+                for index, reward_info in self.reward_info.items()})
+
+    def enable_store(self):
+        """建立 SQLite 資料庫並寫入目前所有獎項名單與中獎紀錄。"""
+        if self.store is not None:
+            return
+        try:
+            self._open_store()
+        except Exception as e:
+            QMessageBox.critical(self, "資料庫錯誤", f"無法建立資料庫 {STORE_FILE}: {e}")
+            return
+        registry = self.registry
+        for file, index in self.reward_files.items():
+            reward_info = self.reward_info[index]
+            roster = reward_info['roster']
+            reward = {key: reward_info[key] for key in ('fullrewardName', 'pickNum', 'RainbowFormat', 'rewardID',
+                                                         'maxPerDept', 'excludeWinnersOf')}
+            reward['employees'] = registry.names_of(roster)
+            reward['departments'] = [registry.departments[pid] for pid in roster]
+            reward['weights'] = list(reward_info['weights']) if reward_info['weights'] is not None else None
+            reward['photos'] = [registry.photos.get(pid, "") for pid in roster]
+            self.exporter.submit_store('save_reward', index, file, reward, self.reward_file_stats.get(file))
+        self._sync_store_winners()
+        self.store_action.setEnabled(False)
+        self.statusBar().showMessage(f"已啟用 SQLite 資料庫 {STORE_FILE}")
+
+    def show_pool_stats(self):
+        """顯示網格格子物件池的使用狀況。"""
+        stats = "\n".join([pool.stats() for pool in (EMPLOYEE_CELL_POOL, WINNER_CELL_POOL)]
+                          + [self.reward_views.stats()])
+        QMessageBox.information(self, "Widget Pool Stats", stats)
                 
     def load_rewards(self):
         """Load prize lists from txt files in rewards folder with updated format."""
         self.reward_info = {}
         self.reward_ids = []
+        self.reward_files = {}  # 檔名 -> 獎項 index
+        self.reward_file_stats = {}  # 檔名 -> (修改時間, 大小)，熱重載時只重新解析有變動的檔案
+        self.pending_reloads = {}  # 抽獎進行中延後套用的名單更新
+        self.registry = ParticipantRegistry()  # 所有獎項共用的參加者登錄表
         error_files = []  # 用於累積不符合條件的檔名
-        
+
         for file in os.listdir(self.rewards_folder):
             if file.endswith(".txt"):
-                components = os.path.splitext(file)[0].split('_')
-                if len(components) != 2:  # 檢查檔名是否符合格式
-                    error_files.append(file)
-                    continue
-                
-                index, show_name = components
-                file_path = os.path.join(self.rewards_folder, file)
-                
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        lines = f.read().splitlines()
-                except Exception as e:
-                    error_files.append(f"{file} (無法讀取: {str(e)})")
-                    continue
-
-                if len(lines) < 4:  # 檢查檔案內是否至少包含4行（基本資料+員工名單）
-                    error_files.append(file)
-                    continue
-
-                try:
-                    # 解析獎項基本資料
-                    full_name = lines[0].split(",", 1)[1].strip() if ',' in lines[0] else ""
-                    pick_num_str = lines[1].split(",", 1)[1].strip() if ',' in lines[1] else "0"
-                    rainbow_format = lines[2].split(",", 1)[1].strip() if ',' in lines[2] else ""
-                    reward_id = lines[3].split(",", 1)[1].strip() if ',' in lines[3] else ""
-
-                    # 檢查 PickNum 是否為有效整數
-                    try:
-                        pick_num = int(pick_num_str)
-                    except ValueError:
-                        error_files.append(f"{file} (PickNum 非有效整數)")
-                        continue
-                    
-                    # 獎項ID不得重複
-                    if reward_id in self.reward_info and reward_id != "":
-                        error_files.append(f"{file} (RewardID 重複)")
-                        continue
-
-                    # 解析員工名單
-                    employees = lines[4:]
-
-                    self.reward_ids.append(index)
-                    self.reward_info[index] = {
-                        'index': index,
-                        'fullrewardName': full_name,
-                        'ShowrewardName': show_name,
-                        'pickNum': pick_num,
-                        'RainbowFormat': rainbow_format,
-                        'rewardID': reward_id,
-                        'employees': employees,
-                        'winners': []
-                    }
-                except Exception as e:
-                    error_files.append(f"{file} (解析失敗: {str(e)})")
+                self.reward_file_stats[file] = self._reward_file_stat(file)
+                info = self._read_reward_file(file, error_files)
+                if info is None:
                     continue
+                self.reward_ids.append(info['index'])
+                self.reward_info[info['index']] = info
+                self.reward_files[file] = info['index']
+
+        if self.store is not None:
+            # 資料庫中的中獎紀錄跨多日活動保留
+            for index, winners in self.store.load_winners().items():
+                if index in self.reward_info:
+                    self._restore_winners(self.reward_info[index], winners)
+
+        # 將資格規則編譯為每個獎項的位元集合
+        self.eligibility = EligibilityEngine(self.reward_info, self.registry)
+        # 參加者搜尋索引；熱重載新增的參加者在搜尋時補索引
+        self.search_index = ParticipantIndex(self.registry)
+        self.search_index.update()
 
         # 如果有錯誤的檔案，顯示錯誤訊息
         if error_files:
@@ -232,14 +1302,191 @@ class RouletteApp(QMainWindow):
                 "以下獎項清單檔案格式錯誤，未被載入於程式中：\n\n"
                 + "\n".join(error_files)
                 + "\n\n-------------------------------"
-                + "\n`獎項.txt`檔名格式須符合 Index_ShowName.txt，"
-                + "檔案內容前四行格式如下：\n"
-                + "FullName,全名\nPickNum,數字\nRainbowFormat,參數\nRewardID,參數\n"
-                + "其餘行為員工名單。"
+                + "\n" + FORMAT_HELP
             )
             print(error_message)  # 可選擇印到 console 或用 QMessageBox 顯示
             QMessageBox.critical(None, "獎項清單載入失敗", error_message)
 
+    def _reward_file_stat(self, file):
+        try:
+            stat = os.stat(os.path.join(self.rewards_folder, file))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_reward_file(self, file, error_files):
+        """解析單一獎項檔案並登錄名單，格式錯誤時記錄到 error_files 並回傳 None。"""
+        components = split_reward_file_name(file)
+        if components is None:  # 檢查檔名是否符合格式
+            error_files.append(file)
+            return None
+
+        index, show_name = components
+        file_path = os.path.join(self.rewards_folder, file)
+        signature = self.reward_file_stats.get(file)
+
+        info = None
+        parsed = False
+        if self.store is not None and signature is not None and self.store.file_signature(index, file) == signature:
+            info = self.store.load_reward(index)  # 名單檔未變動，直接從資料庫載入
+        if info is None:
+            try:
+                info = parse_reward_file(file_path)
+            except RewardFileError as e:
+                error_files.append(f"{file} ({e})" if str(e) else file)
+                return None
+            except Exception as e:
+                error_files.append(f"{file} (解析失敗: {str(e)})")
+                return None
+            parsed = True
+
+        # 獎項ID不得重複
+        reward_id = info['rewardID']
+        if reward_id != "" and any(r['rewardID'] == reward_id and r['index'] != index
+                                   for r in self.reward_info.values()):
+            error_files.append(f"{file} (RewardID 重複)")
+            return None
+
+        if parsed and self.store is not None:
+            self.exporter.submit_store('save_reward', index, file, dict(info), signature)
+
+        info['index'] = index
+        info['ShowrewardName'] = show_name
+        # 名單只保存參加者 ID，姓名由登錄表統一管理
+        info['roster'] = self.registry.register_roster(info.pop('employees'), info.pop('departments'),
+                                                       info.pop('photos'))
+        info['winners'] = array('i')
+        if info['weights'] is not None:
+            info['weights'] = array('d', info['weights'])
+        return info
+
+    def _init_rewards_watcher(self):
+        """監看 rewards 資料夾，名單檔案變動時自動重新載入。"""
+        self.rewards_watcher = QFileSystemWatcher(self)
+        self.rewards_watcher.addPath(self.rewards_folder)
+        self._watch_reward_files()
+        self.rewards_watcher.directoryChanged.connect(self._on_rewards_changed)
+        self.rewards_watcher.fileChanged.connect(self._on_rewards_changed)
+        # 編輯器存檔常觸發多次事件，稍候再一併處理
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(300)
+        self.reload_timer.timeout.connect(self.reload_changed_rewards)
+
+    def _watch_reward_files(self):
+        watched = set(self.rewards_watcher.files())
+        paths = [os.path.join(self.rewards_folder, file) for file in self.reward_file_stats]
+        paths = [path for path in paths if path not in watched and os.path.exists(path)]
+        if paths:
+            self.rewards_watcher.addPaths(paths)
+
+    def _on_rewards_changed(self, path):
+        self.reload_timer.start()
+
+    def reload_changed_rewards(self):
+        """只重新解析有變動的獎項檔案，並保留既有的中獎紀錄。"""
+        current_files = {file for file in os.listdir(self.rewards_folder) if file.endswith(".txt")}
+        error_files = []
+        changed = []
+        for file in sorted(current_files):
+            stat = self._reward_file_stat(file)
+            if stat is None or self.reward_file_stats.get(file) == stat:
+                continue
+            self.reward_file_stats[file] = stat
+            info = self._read_reward_file(file, error_files)
+            if info is not None:
+                changed.append((file, info))
+
+        for file in set(self.reward_file_stats) - current_files:
+            del self.reward_file_stats[file]
+            if file in self.reward_files:
+                # 已載入的獎項保留在程式中，避免遺失中獎紀錄
+                print(f"獎項檔案 {file} 已被移除，保留目前載入的名單。")
+
+        deferred = []
+        for file, info in changed:
+            index = info['index']
+            self.reward_files[file] = index
+            if index not in self.reward_info:
+                self._add_reward(info)
+            elif self.is_reward_drawing(self.reward_info[index]):
+                # 只有正在抽獎的獎項延後套用名單與規則，名稱等顯示欄位立即更新；其他獎項照常立即套用
+                self._apply_reward_display(index, info)
+                self.pending_reloads[index] = info
+                deferred.append(info['ShowrewardName'])
+            else:
+                self._apply_reward_reload(index, info)
+
+        self._watch_reward_files()
+        if error_files:
+            print("以下獎項清單檔案格式錯誤，未重新載入：\n" + "\n".join(error_files))
+            self.statusBar().showMessage(f"獎項清單格式錯誤，未重新載入: {', '.join(error_files)}")
+        elif changed:
+            names = ", ".join(info['ShowrewardName'] for _, info in changed)
+            message = f"已重新載入獎項名單: {names}"
+            if deferred:
+                message += f"（{', '.join(deferred)} 抽獎中，名單於抽獎結束後套用）"
+            self.statusBar().showMessage(message)
+
+    def _add_reward(self, info):
+        index = info['index']
+        self.reward_ids.append(index)
+        self.reward_info[index] = info
+        self.eligibility.reload_reward(index)
+        self.reward_combo.addItem(info['ShowrewardName'], userData=info['rewardID'])
+        if self.multi_draw_window is not None:
+            self.multi_draw_window.add_reward_item(index)
+
+    def _apply_reward_display(self, index, info):
+        """更新不影響抽獎的顯示欄位（名稱、上限、顏色），名稱改變時同步各畫面的獎項選單。"""
+        reward = self.reward_info[index]
+        old_name = reward['ShowrewardName']
+        for key in ('ShowrewardName', 'fullrewardName', 'pickNum', 'RainbowFormat'):
+            reward[key] = info[key]
+        if reward['ShowrewardName'] == old_name:
+            return
+        self.reward_combo.setItemText(self.reward_ids.index(index), reward['ShowrewardName'])
+        if reward is self.current_reward_info:
+            self.prize_label.setText(self.prize_label.text().replace(
+                f"本次獎項：{old_name}", f"本次獎項：{reward['ShowrewardName']}", 1))
+        if self.multi_draw_window is not None:
+            self.multi_draw_window.rename_reward_item(index)
+
+    def _apply_reward_reload(self, index, info):
+        """將重新解析的名單合併進既有的獎項，中獎者即使已從檔案移除也會保留。"""
+        self._apply_reward_display(index, info)
+        reward = self.reward_info[index]
+        roster = info['roster']
+        in_roster = set(roster)
+        missing_winners = [pid for pid in reward['winners'] if pid not in in_roster]
+        roster.extend(missing_winners)
+        if info['weights'] is not None:
+            info['weights'].extend([0.0] * len(missing_winners))
+
+        rules_changed = (reward['rewardID'] != info['rewardID']
+                         or reward['excludeWinnersOf'] != info['excludeWinnersOf'])
+        for key in ('rewardID', 'maxPerDept', 'excludeWinnersOf', 'roster', 'weights'):
+            reward[key] = info[key]
+
+        if rules_changed:
+            self.eligibility.rebuild()
+        else:
+            self.eligibility.reload_reward(index)
+
+        self.reward_combo.setItemData(self.reward_ids.index(index), reward['rewardID'])
+        if reward is self.current_reward_info:
+            self.populate_employee_grid()
+            self.update_winner_label()
+        elif rules_changed:
+            self.grid_widget.set_ineligible(self.eligibility.ineligible_indices(self.current_reward_info['index']))
+        if self.multi_draw_window is not None:
+            self.multi_draw_window.refresh_reward(reward)
+
+    def _apply_pending_reloads(self):
+        for index in list(self.pending_reloads):
+            if not self.is_reward_drawing(self.reward_info[index]):
+                self._apply_reward_reload(index, self.pending_reloads.pop(index))
+
     def init_ui(self):
         """Initialize UI components."""
         self.setWindowIcon(QIcon("resources/icon.png"))
@@ -282,7 +1529,7 @@ class RouletteApp(QMainWindow):
         self.mode_combo = QComboBox()
         set_font(self.mode_combo, font_size)
         # 新增 "AI部門" 選項
-        self.mode_combo.addItems(["隨機歷遍", "循序歷遍", "連抽模式"])
+        self.mode_combo.addItems(DRAW_MODES)
         self.mode_combo.currentIndexChanged.connect(self.update_mode)
         reward_layout.addWidget(self.mode_label)
         reward_layout.addWidget(self.mode_combo)
@@ -337,6 +1584,26 @@ class RouletteApp(QMainWindow):
         reward_layout.addWidget(self.final_interval_label)
         reward_layout.addWidget(self.final_interval_spinner)
 
+        # Participant search（所有獎項的參加者）
+        self.search_label = QLabel("搜尋:")
+        set_font(self.search_label, font_size)
+        self.search_edit = QLineEdit()
+        set_font(self.search_edit, font_size)
+        self.search_edit.setPlaceholderText("姓名")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_results = []  # 目前列出的參加者 ID
+        self.search_model = QStringListModel(self)
+        # 不使用 setCompleter：結果由索引決定，補完清單不再另行過濾，也不改寫輸入的文字
+        self.search_completer = QCompleter(self.search_model, self)
+        self.search_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.search_completer.setWidget(self.search_edit)
+        self.search_completer.highlighted[QModelIndex].connect(self.on_search_highlighted)
+        self.search_completer.activated[QModelIndex].connect(self.on_search_activated)
+        self.search_edit.textEdited.connect(self.on_search_edited)
+        self.search_edit.returnPressed.connect(self.on_search_return)
+        reward_layout.addWidget(self.search_label)
+        reward_layout.addWidget(self.search_edit)
+
         main_layout.addLayout(reward_layout)
 
         # Create a menu bar
@@ -347,7 +1614,64 @@ class RouletteApp(QMainWindow):
         import_action = QAction('Import Winning List', self)
         import_action.triggered.connect(self.import_winning_list)
         dev_menu.addAction(import_action)
+
+        # Add new session action
+        new_session_action = QAction('Start New Session', self)
+        new_session_action.triggered.connect(self.start_new_session)
+        dev_menu.addAction(new_session_action)
         
+        # Add parallel draw panels action
+        panels_action = QAction('Parallel Draw Panels', self)
+        panels_action.triggered.connect(self.show_multi_draw_window)
+        dev_menu.addAction(panels_action)
+
+        # Add grid renderer selection
+        renderer_menu = dev_menu.addMenu('Grid Renderer')
+        renderer_group = QActionGroup(self)
+        self.raster_renderer_action = QAction('Raster (QLabel)', self, checkable=True, checked=True)
+        self.raster_renderer_action.triggered.connect(lambda: self.set_grid_renderer(False))
+        self.gl_renderer_action = QAction('OpenGL', self, checkable=True)
+        self.gl_renderer_action.triggered.connect(lambda: self.set_grid_renderer(True))
+        for action in (self.raster_renderer_action, self.gl_renderer_action):
+            renderer_group.addAction(action)
+            renderer_menu.addAction(action)
+
+        # Add render quality selection
+        quality_menu = dev_menu.addMenu('Render Quality')
+        quality_group = QActionGroup(self)
+        for level, text in ((None, 'Adaptive'), (QUALITY_FULL, 'Full'), (QUALITY_REDUCED, 'Reduced'),
+                            (QUALITY_MINIMAL, 'Minimal')):
+            action = QAction(text, self, checkable=True, checked=level is None)
+            action.triggered.connect(lambda checked=False, level=level: self.set_render_quality(level))
+            quality_group.addAction(action)
+            quality_menu.addAction(action)
+
+        # Add SQLite store action
+        self.store_action = QAction('Enable SQLite Store', self)
+        self.store_action.triggered.connect(self.enable_store)
+        self.store_action.setEnabled(self.store is None)
+        dev_menu.addAction(self.store_action)
+
+        # Add event plan validation action
+        validate_action = QAction('Validate Event Plan', self)
+        validate_action.triggered.connect(self.validate_event_plan)
+        dev_menu.addAction(validate_action)
+
+        # Add draw trace export action
+        trace_action = QAction('Export Draw Trace...', self)
+        trace_action.triggered.connect(self.export_draw_trace)
+        dev_menu.addAction(trace_action)
+
+        # Add offscreen draw video export action
+        video_action = QAction('Export Draw Video...', self)
+        video_action.triggered.connect(self.export_draw_video)
+        dev_menu.addAction(video_action)
+
+        # Add widget pool statistics action
+        pool_stats_action = QAction('Widget Pool Stats', self)
+        pool_stats_action.triggered.connect(self.show_pool_stats)
+        dev_menu.addAction(pool_stats_action)
+
         # Add Import action
         about_me = QAction('About Rontgen Roulette', self)
         about_me.triggered.connect(self.about_me)
@@ -363,19 +1687,17 @@ class RouletteApp(QMainWindow):
         horizontal_layout.addWidget(self.prize_label, stretch=2)
         
         # 添加 WheelWidget
-        self.wheel_widget = WheelWidget()
+        self.wheel_widget = WheelWidget(self.frame_clock)
         self.wheel_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         horizontal_layout.addWidget(self.wheel_widget, stretch=1)
 
         # 將水平佈局添加到主佈局
         main_layout.addLayout(horizontal_layout, stretch=1)
 
-        # Winner grid layout
-        self.winner_grid_layout = QGridLayout()
-        self.winner_grid_widget = QWidget()
-        self.winner_grid_widget.setLayout(self.winner_grid_layout)
-        self.winner_grid_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        main_layout.addWidget(self.winner_grid_widget, stretch=2)
+        # Winner grid（各獎項的看板為 QStackedWidget 的一頁）
+        self.winner_board_stack = QStackedWidget()
+        self.winner_board_stack.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        main_layout.addWidget(self.winner_board_stack, stretch=2)
                 
         # PULL button
         self.pull_button = QPushButton("抽獎開始!")
@@ -384,12 +1706,12 @@ class RouletteApp(QMainWindow):
         self.pull_button.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
         main_layout.addWidget(self.pull_button)
 
-        # Employee grid
-        self.grid_layout = QGridLayout()
-        self.grid_widget = QWidget()
-        self.grid_widget.setLayout(self.grid_layout)
-        self.grid_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        main_layout.addWidget(self.grid_widget, stretch=4)
+        # Employee grid（各獎項的網格為 QStackedWidget 的一頁）
+        self.grid_stack = QStackedWidget()
+        self.grid_stack.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        main_layout.addWidget(self.grid_stack, stretch=4)
+        self.use_gl_grid = False
+        self.reward_views = RewardViewCache(self.grid_stack, self.winner_board_stack)
 
         # Set main layout
         central_widget = QWidget()
@@ -412,7 +1734,6 @@ class RouletteApp(QMainWindow):
         ShowrewardName = current_reward_info['ShowrewardName']
         fullrewardName = current_reward_info['fullrewardName']
         pickNum = current_reward_info['pickNum']
-        employees = current_reward_info['employees']
 
         # Update prize_label to display ShowrewardName
         if self.mode_combo.currentText() == "連抽模式":
@@ -423,13 +1744,10 @@ class RouletteApp(QMainWindow):
         # 清空 winner_indices，避免舊獎項索引干擾新獎項
         self.winner_indices = []
 
-        # Initialize winner records for this reward if not already
-        if 'winners' not in current_reward_info:
-            current_reward_info['winners'] = []
-        self.populate_employee_grid()
-        self.update_winner_label()
+        self.show_reward_view()
 
     def update_mode(self):
+        self.pick_spinner.setRange(1, BULK_MAX_PICK if self.mode_combo.currentText() == MODE_BULK else 50)
         if self.mode_combo.currentText() == "連抽模式":
             self.pick_label.setText("連抽人數:")
             self.duration_lower_spinner.setValue(1)
@@ -438,6 +1756,15 @@ class RouletteApp(QMainWindow):
             self.final_interval_spinner.setValue(20)
             ShowrewardName = self.current_reward_info['ShowrewardName']
             self.prize_label.setText(f"本次獎項：{ShowrewardName}\n紅色:五獎*2 | 橙色:四獎*2 | 黃色:三獎*2 | 綠色:二獎*2 | 藍色:一獎*1")
+        elif self.mode_combo.currentText() == MODE_BULK:
+            # 一次抽出數百人：短暫歷遍後分頁揭曉
+            self.pick_label.setText("揭曉人數:")
+            self.duration_lower_spinner.setValue(1)
+            self.duration_upper_spinner.setValue(2)
+            self.start_interval_spinner.setValue(30)
+            self.final_interval_spinner.setValue(120)
+            ShowrewardName = self.current_reward_info['ShowrewardName']
+            self.prize_label.setText(f"本次獎項：{ShowrewardName}")
         else:
             self.pick_label.setText("單抽人數:")
             self.duration_lower_spinner.setValue(3)
@@ -452,149 +1779,198 @@ class RouletteApp(QMainWindow):
 
     def populate_winner_grid(self):
         """Populate the winner grid with the current reward's winners."""
-        # Clear existing grid
-        for i in reversed(range(self.winner_grid_layout.count())):
-            widget = self.winner_grid_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-
-        # Get the winners for the current reward
-        winners = self.current_reward_info['winners']
-        num_winners = len(winners)
-
-        # If no winners, do nothing
-        if num_winners == 0:
-            return
-
-        # Define fixed grid size
-        grid_width = 220  # Fixed width for each grid
-        grid_height = 80  # Fixed height for each grid
-
-        cols = 8  # Fixed number of columns
-        rows = (num_winners + cols - 1) // cols  # Calculate number of rows
-
-        # Get the current mode
-        mode = self.color_combo.currentText()
-        rainbow_format = self.current_reward_info['RainbowFormat']
-        # Define rainbow colors list
-        rainbow_colors = [
-            "#FF0000",  # Red
-            "#FFA500",  # Orange
-            "#FFFF00",  # Yellow
-            "#008000",  # Green
-            "#2F67D7",  # Blue
-            "#8E3AC6",  # Indigo
-            "#EE82EE",  # Violet
-        ]
-
-        # Function to parse rainbow_format
-        def parse_rainbow_format(rainbow_format):
-            counts = []
-            for c in rainbow_format:
-                if '1' <= c <= '9':
-                    counts.append(int(c))
-                elif 'A' <= c <= 'Z':
-                    counts.append(ord(c) - ord('A') + 10)
-            return counts
-
-        if mode == "彩色":
-            if rainbow_format != "":
-                counts_list = parse_rainbow_format(rainbow_format)
-                color_index = 0
-                if counts_list:
-                    count_remaining = counts_list.pop(0)
-                else:
-                    count_remaining = 2  # Default to 2 if counts_list is empty
-                default_remaining = 2
-            else:
-                pass  # Will use default rule in the loop
-
-        for index, winner in enumerate(winners):
-            row = index // cols
-            col = index % cols
+        self.fill_winner_board(self.winner_grid_widget, self.current_reward_info)
 
-            # Create QLabel for winner name
-            label = QLabel(winner)
-            label.setAlignment(Qt.AlignCenter)
-            label.setFixedSize(grid_width, grid_height)
-
-            # Set font size for the winner name
-            font = label.font()
-            font.setPointSize(40)  # Adjust font size
-            label.setFont(font)
+    def fill_winner_board(self, board, reward_info):
+        """在看板上顯示獎項的中獎者（主畫面與並行面板共用）。"""
+        names = self.winner_names(reward_info)
+        if len(names) <= BOARD_MAX_CELLS:
+            board.populate(names, reward_info['RainbowFormat'], self.color_combo.currentText() == "彩色")
+            return
+        # 大量揭曉後中獎者多達數百人，看板只顯示最後一頁，完整名單見得獎名單檔案
+        page_size = board.page_capacity()
+        start = (len(names) - 1) // page_size * page_size
+        colors = self.winner_colors_of(reward_info, len(names))
+        board.show_page(names[start:], colors[start:] if colors else None)
+
+    def winner_colors_of(self, reward_info, count):
+        """看板上前 count 位中獎者的顏色，單色顯示時為 None。"""
+        if self.color_combo.currentText() != "彩色":
+            return None
+        return winner_colors(count, reward_info['RainbowFormat'])
+
+    def start_bulk_reveal(self, reward_info, winners):
+        """在員工網格的位置以分頁動畫揭曉本次的中獎者，顏色與看板上的順序一致。"""
+        if self.bulk_reveal is None:
+            self.bulk_reveal = BulkRevealView(GLWinnerBoard if self.use_gl_grid else WinnerBoard, self.frame_clock)
+            self.bulk_reveal.finished.connect(self.stop_bulk_reveal)
+            self.grid_stack.addWidget(self.bulk_reveal)
+            self.bulk_reveal.resize(self.grid_stack.size())
+        self.grid_stack.setCurrentWidget(self.bulk_reveal)
+        self.start_reveal(self.bulk_reveal, reward_info, winners)
+
+    def start_reveal(self, view, reward_info, winners):
+        """以 view 分頁揭曉本次的中獎者（主畫面與並行面板共用）。"""
+        total = len(reward_info['winners'])
+        colors = self.winner_colors_of(reward_info, total)
+        view.start(self.registry.names_of(winners), colors[total - len(winners):] if colors else None)
+
+    def stop_bulk_reveal(self):
+        """結束揭曉動畫並翻回員工網格。"""
+        if self.bulk_reveal is None:
+            return
+        self.bulk_reveal.stop()
+        if self.watchdog.phase == PHASE_REVEAL:
+            self.watchdog.phase = PHASE_IDLE
+        if self.grid_stack.currentWidget() is self.bulk_reveal:
+            self.grid_stack.setCurrentWidget(self.grid_widget)
+
+    def on_search_edited(self, text):
+        """每次按鍵更新搜尋結果，並高亮目前獎項名單中的符合者。"""
+        self.search_index.update()
+        self.search_results = self.search_index.search(text)
+        self.search_model.setStringList([self.search_result_text(pid) for pid in self.search_results])
+        if self.search_results:
+            self.search_completer.complete()
+        else:
+            self.search_completer.popup().hide()
+        index = self.current_reward_info['index']
+        positions = [self.eligibility.position_of(index, pid) for pid in self.search_results]
+        self.highlight_search_positions([pos for pos in positions if pos is not None])
+
+    def search_result_text(self, pid):
+        registry = self.registry
+        text = registry.display_name(pid)
+        department = registry.departments[pid]
+        if department and not registry.occurrences[pid]:
+            text += f"（{department}）"
+        rosters = sum(1 for index in self.reward_ids if self.eligibility.position_of(index, pid) is not None)
+        text += f"｜{rosters} 個獎項名單"
+        won = self.won_reward_names(pid)
+        if won:
+            text += f"｜中獎: {', '.join(won)}"
+        return text
+
+    def won_reward_names(self, pid):
+        won = self.eligibility.won_rewards_of(pid)
+        return [self.reward_info[index]['ShowrewardName'] for index in self.reward_ids if index in won]
+
+    def highlight_search_positions(self, positions):
+        # 抽獎進行中由歷遍控制高亮，不受搜尋影響
+        if self.pull_button.isEnabled():
+            self.grid_widget.set_highlight(positions)
+
+    def on_search_highlighted(self, model_index):
+        self.jump_to_participant(self.search_results[model_index.row()], switch_reward=False)
+
+    def on_search_activated(self, model_index):
+        self.jump_to_participant(self.search_results[model_index.row()])
+
+    def on_search_return(self):
+        if self.search_results:
+            self.jump_to_participant(self.search_results[0])
+
+    def jump_to_participant(self, pid, switch_reward=True):
+        """高亮參加者的格子並在狀態列顯示其名單與中獎紀錄；不在目前獎項時切換到第一個包含該參加者的獎項。"""
+        rosters = [i for i, index in enumerate(self.reward_ids)
+                   if self.eligibility.position_of(index, pid) is not None]
+        index = self.current_reward_info['index']
+        if (switch_reward and rosters and self.eligibility.position_of(index, pid) is None
+                and self.reward_combo.isEnabled()):
+            self.reward_combo.setCurrentIndex(rosters[0])
+            index = self.current_reward_info['index']
+        pos = self.eligibility.position_of(index, pid)
+        self.highlight_search_positions([pos] if pos is not None else [])
+        names = ", ".join(self.reward_info[self.reward_ids[i]]['ShowrewardName'] for i in rosters) or "無"
+        won = ", ".join(self.won_reward_names(pid)) or "無"
+        self.statusBar().showMessage(f"{self.registry.display_name(pid)}｜名單: {names}｜中獎: {won}")
+
+    def show_reward_view(self):
+        """翻到目前獎項的網格與看板；最近使用過的獎項不重建，只修補有變動的格子。"""
+        self.stop_bulk_reveal()
+
+        def create():
+            if self.use_gl_grid:
+                return GLEmployeeGrid(), GLWinnerBoard()
+            return EmployeeGrid(), WinnerBoard()
+
+        self.grid_widget, self.winner_grid_widget = self.reward_views.show(self.current_reward_info['index'], create)
+        self.populate_employee_grid()
+        self.update_winner_label()
 
-            # Set background and border styles
-            if mode == "彩色":
-                if rainbow_format != "":
-                    # Use rainbow_format to determine color change
-                    background_color = rainbow_colors[color_index % len(rainbow_colors)]
-                    label.setStyleSheet(f"background-color: {background_color}; border: 3px solid black; padding: 2px;")
-                    # Decrement count_remaining
-                    count_remaining -= 1
-                    if count_remaining == 0:
-                        color_index += 1
-                        if counts_list:
-                            count_remaining = counts_list.pop(0)
-                        else:
-                            # counts_list is exhausted, use default rule
-                            count_remaining = default_remaining
-                else:
-                    # Use default rule, change color every two people
-                    color_index = (index // 2) % len(rainbow_colors)
-                    background_color = rainbow_colors[color_index]
-                    label.setStyleSheet(f"background-color: {background_color}; border: 3px solid black; padding: 2px;")
-            else:
-                label.setStyleSheet("background-color: yellow; border: 3px solid black; padding: 2px;")
+    def set_grid_renderer(self, use_gl):
+        """切換員工網格與中獎者看板的繪製方式，無法使用 OpenGL 時維持 QLabel 繪製。"""
+        if use_gl == self.use_gl_grid:
+            return
+        if not self.pull_button.isEnabled():
+            QMessageBox.warning(self, '警告', "抽獎進行中無法切換繪製方式。")
+        elif use_gl and not opengl_available():
+            QMessageBox.warning(self, '警告', "無法建立 OpenGL context，維持 QLabel 繪製。\n"
+                                + "沒有 GPU 的電腦可加上 --software-gl 參數啟動以使用軟體 OpenGL。")
+        else:
+            self._replace_grid_widgets(use_gl)
+            if use_gl:
+                # context 在顯示後才建立，失敗時退回 QLabel 繪製
+                QTimer.singleShot(0, self._check_gl_renderer)
+        self.gl_renderer_action.setChecked(self.use_gl_grid)
+        self.raster_renderer_action.setChecked(not self.use_gl_grid)
+
+    def _replace_grid_widgets(self, use_gl):
+        # 快取中的畫面都以舊的繪製方式建立，全部淘汰後重建目前獎項
+        self.use_gl_grid = use_gl
+        self.reward_views.clear()
+        if self.bulk_reveal is not None:
+            self.bulk_reveal.stop()
+            self.grid_stack.removeWidget(self.bulk_reveal)
+            for board in self.bulk_reveal.boards:
+                board.show_page([])  # 格子還給物件池
+            self.bulk_reveal.deleteLater()
+            self.bulk_reveal = None
+        self.show_reward_view()
+
+    def _check_gl_renderer(self):
+        if isinstance(self.grid_widget, GLEmployeeGrid) and not self.grid_widget.isValid():
+            self._replace_grid_widgets(False)
+            self.gl_renderer_action.setChecked(False)
+            self.raster_renderer_action.setChecked(True)
+            self.statusBar().showMessage("OpenGL 初始化失敗，已退回 QLabel 繪製")
 
-            self.winner_grid_layout.addWidget(label, row, col)
-               
     def populate_employee_grid(self):
         """Populate the employee grid based on the current reward."""
-        # Clear existing grid
-        for i in reversed(range(self.grid_layout.count())):
-            widget = self.grid_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-
-        employees = self.current_reward_info['employees']
-        num_employees = len(employees)
-        if num_employees < 16 :
-            oneCols = 5
-        elif num_employees < 22 :
-            oneCols = 7 
+        index = self.current_reward_info['index']
+        names = self.roster_names(self.current_reward_info)
+        photos = self.roster_photos(self.current_reward_info)
+        if names == self.grid_widget.names and (photos or ()) == self.grid_widget.photos:
+            # 快取的畫面名單未變，只修補中獎與資格有變動的格子
+            self.grid_widget.update_state(self.eligibility.winner_positions(index),
+                                          self.eligibility.ineligible_indices(index))
         else:
-            oneCols = 10
-        
-        
-        cols = min(oneCols, num_employees)  # Up to 10 columns
-        rows = (num_employees + cols - 1) // cols
-
-        for index, employee in enumerate(employees):
-            row = index // cols
-            col = index % cols
-
-            # Create QLabel for employee name
-            label = QLabel(employee)
-            label.setAlignment(Qt.AlignCenter)
-            label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-
-            # Dynamically set font size based on grid size
-            font = label.font()
-            # Calculate font size as a proportion of grid height (adjust multiplier as needed)
-            cell_width = self.grid_widget.width() // cols
-            cell_height = self.grid_widget.height() // rows
-            dynamic_font_size = max(int(min(cell_width, cell_height) * 0.2), 25)  # Adjust 0.2 for scaling
-
-            font.setPointSize(dynamic_font_size)
-            label.setFont(font)
-
-            # Set background and border styles
-            if employee in self.current_reward_info['winners']:
-                label.setStyleSheet("background-color: yellow; border: 2px solid black; padding: 5px;")
-            else:
-                label.setStyleSheet("border: 1px solid black; padding: 5px;")
-
-            self.grid_layout.addWidget(label, row, col)
+            self.grid_widget.populate(names, self.eligibility.winner_positions(index),
+                                      self.eligibility.ineligible_indices(index), photos)
+
+    def roster_names(self, reward_info):
+        """獎項名單的姓名（依名單順序）。"""
+        return self.registry.names_of(reward_info['roster'])
+
+    def roster_photos(self, reward_info):
+        """獎項名單每人的照片完整路徑（無照片為 None）；沒有任何照片時回傳 None。"""
+        photos = self.registry.photos_of(reward_info['roster'])
+        if photos is None or not any(photos):
+            return None
+        folder = self.rewards_folder
+        return [os.path.join(folder, photo) if photo else None for photo in photos]
+
+    def winner_names(self, reward_info):
+        """獎項中獎者的姓名（依中獎順序）。"""
+        return self.registry.names_of(reward_info['winners'])
+
+    def record_winners(self, reward_info, positions):
+        """依名單位置記錄中獎者並更新資格位元集合，回傳中獎者 ID。"""
+        roster = reward_info['roster']
+        winners = [roster[pos] for pos in positions]
+        reward_info['winners'].extend(winners)
+        self.eligibility.commit(reward_info['index'], positions)
+        return winners
 
     def start_lottery(self):
         self.pick_count_temp = self.pick_spinner.value()
@@ -611,6 +1987,7 @@ class RouletteApp(QMainWindow):
         # 如果有高亮的中獎者，先將其轉為黃色
         if self.highlighting_winner:
             self.highlight_winners_to_yellow()
+        self.stop_bulk_reveal()
 
         # 取得單抽人數和已中獎人數
         pick_count = self.pick_spinner.value()
@@ -618,6 +1995,10 @@ class RouletteApp(QMainWindow):
         total_winners = len(self.current_reward_info['winners'])
         potential_total_winners = total_winners + pick_count
 
+        if self.is_reward_drawing(self.current_reward_info):
+            QMessageBox.warning(self, '警告', "此獎項正在並行抽獎面板中抽獎。")
+            return
+
         # Check if next draw will exceed pickNum
         if potential_total_winners > pickNum:
             # Show dialog to confirm
@@ -628,282 +2009,314 @@ class RouletteApp(QMainWindow):
                 return
 
 
-        # 禁用 PULL 按鈕
+        # 禁用 PULL 按鈕與獎項切換
         self.pull_button.setEnabled(False)
+        self.reward_combo.setEnabled(False)
         # 開始新的抽獎
+        self.watchdog.phase = PHASE_WHEEL
+        self.draw_span = self.tracer.begin("draw", reward=self.current_reward_info['ShowrewardName'],
+                                           pick=pick_count)
+        self.wheel_span = self.tracer.begin("wheel spin")
+        lower_limit, upper_limit = self.iteration_time_limits()
+        self.wheel_widget.set_limits(lower_limit, upper_limit)
+        self.wheel_widget.start_animation()
+        # 轉盤轉動期間量測影格間隔，停止時判斷是否需要降低畫面效果
+        self.quality.begin()
+        self.frame_clock.subscribe(self.on_quality_tick)
+        # 轉盤停止的時間在開始轉動時即已決定，趁轉動時在背景預先算好整個歷遍
+        with self.tracer.span("schedule start"):
+            self.engine.start(*self.draw_arguments(self.current_reward_info, self.mode_combo.currentText(),
+                                                   pick_count, self.wheel_widget.final_iteration_time()))
+
+    def draw_arguments(self, reward_info, mode, pick_count, iteration_time):
+        """DrawEngine.start 的參數；候選名單由資格位元集合直接求得（排除已中獎、跨獎項排除與部門配額已滿者）。"""
+        index = reward_info['index']
+        groups, group_quota = self.eligibility.department_quota(index)
+        return (mode, pick_count, self.eligibility.candidate_indices(index),
+                iteration_time, self.start_interval_spinner.value(), self.final_interval_spinner.value(),
+                groups, group_quota, reward_info['weights'])
+
+    def iteration_time_limits(self):
+        """歷遍範圍(秒)，上下限顛倒時自動交換。"""
         lower_limit = self.duration_lower_spinner.value()
         upper_limit = self.duration_upper_spinner.value()
         if lower_limit > upper_limit:
             lower_limit, upper_limit = upper_limit, lower_limit
-        self.wheel_widget.set_limits(lower_limit, upper_limit)
-        self.wheel_widget.start_animation()
-        
+        return lower_limit, upper_limit
+
+    def is_reward_drawing(self, reward_info, exclude=None):
+        """該獎項是否正在主畫面或任一並行面板中抽獎。"""
+        if exclude is not self and reward_info is self.current_reward_info and not self.pull_button.isEnabled():
+            return True
+        if self.multi_draw_window is not None:
+            for panel in self.multi_draw_window.panels:
+                if panel is not exclude and panel.reward_info is reward_info and panel.is_drawing():
+                    return True
+        return False
+
+    def show_multi_draw_window(self):
+        """開啟並行抽獎面板視窗。"""
+        if self.multi_draw_window is None:
+            self.multi_draw_window = MultiDrawWindow(self)
+            self.multi_draw_window.add_panel()
+        self.multi_draw_window.show()
+        self.multi_draw_window.raise_()
+
     def highlight_winners_to_yellow(self):
         """將當次的紅色高亮切換為黃色高亮。"""
-        for idx in self.winner_indices:
-            widget_item = self.grid_layout.itemAt(idx)
-            if widget_item:  # 確保 widget_item 存在
-                widget = widget_item.widget()
-                if widget:  # 確保 widget 存在
-                    widget.setStyleSheet("background-color: yellow; border: 2px solid black; padding: 5px;")
+        self.grid_widget.mark_winners(self.winner_indices, CELL_STYLE_WINNER)
         self.highlighting_winner = False  # 標記為高亮結束
      
     def wheel_animation_finished(self, iteration_time):
         """Slot called when the wheel animation finishes."""
         self.total_duration = iteration_time
+        self.tracer.end(self.wheel_span, iteration_time=iteration_time)
+        self.wheel_span = None
         self.statusBar().showMessage(f"本次歷遍時間: {iteration_time:.1f} 秒")
+        self.check_quality("wheel")
 
         self.start_lottery_with_iteration_time(iteration_time)
 
     def start_lottery_with_iteration_time(self, iteration_time):
         """Start the lottery with the given iteration time."""
-        employees = self.current_reward_info['employees']
-        pick_count = self.pick_spinner.value()
-        mode = self.mode_combo.currentText()
-        total_duration = iteration_time  # Use the iteration time from the wheel
-
-        # Get starting and final intervals in milliseconds
-        start_interval_ms = self.start_interval_spinner.value()
-        final_interval_ms = self.final_interval_spinner.value()
-
-        # Validate pick_count
-        # available_employees = [e for e in employees if e not in self.current_reward_info['winners']]
-        # remaining_slots = self.current_reward_info['pickNum'] - len(self.current_reward_info['winners'])
-        # pick_count = min(pick_count, len(available_employees), remaining_slots)
-        # self.pick_spinner.setValue(pick_count)
-
-        # if pick_count <= 0:
-        #     QMessageBox.information(self, '訊息', '沒有可用的員工進行抽獎。')
-        #     self.pull_button.setEnabled(True)
-        #     return
-
-        # Initialize variables for the lottery
-        self.frame_count = 0
-        self.total_frames = 0
-        self.current_indices = []
         self.winner_indices = []  # 清空舊的中獎索引
-        self.available_indices = [i for i, e in enumerate(employees) if e not in self.current_reward_info['winners']]
-
-        # Calculate intervals
-        self.intervals = self.calculate_intervals(total_duration, start_interval_ms, final_interval_ms)
-
-        # For sequential iteration mode, start from a random position
-        if mode == "循序歷遍":
-            if len(self.available_indices) == 0:
-                return
-            self.seq_index = random.randint(0, len(self.available_indices) - 1)
-
-        # Start the timer
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_lights)
-        self.timer.start(self.intervals[0])  # Start with the first interval
-
-    def calculate_intervals(self, total_duration, start_interval_ms, final_interval_ms):
-        """Calculate intervals for the timer to create a slowing down effect."""
-        exponent = 2  # Adjust the exponent to control the deceleration curve
-
-        # Estimate the number of frames based on average interval
-        average_interval_ms = (start_interval_ms + final_interval_ms) / 2.0
-        N = max(2, int((total_duration * 1000.0) / average_interval_ms))
-
-        # Generate progress list for the deceleration curve
-        progress_list = [(i / (N - 1)) for i in range(N)]
-        intervals = [start_interval_ms + (final_interval_ms - start_interval_ms) * (p ** exponent) for p in progress_list]
-
-        # Calculate total intervals time
-        total_intervals_time = sum(intervals)
-
-        # Compute scaling factor to match the total_duration
-        scale = (total_duration * 1000.0) / total_intervals_time
-
-        # Scale intervals to match the total duration
-        intervals = [interval * scale for interval in intervals]
-
-        self.total_frames = N
-
-        return intervals
-    
-    def update_lights(self):
-        """Update the highlighted employees during the lottery."""
-        # Initialize elapsed time if not already
-        if not hasattr(self, 'elapsed_time'):
-            self.elapsed_time = 0
-
-        # Update elapsed time
-        self.elapsed_time += self.timer.interval()
-
-        if self.elapsed_time >= self.total_duration * 1000.0:
-            self.timer.stop()
-            del self.elapsed_time  # Reset for next time
-
-            # 清除高亮（保留中獎者）
-            for i in range(self.grid_layout.count()):
-                widget = self.grid_layout.itemAt(i).widget()
-                employee_name = widget.text()
-                if employee_name not in self.current_reward_info['winners']:
-                    widget.setStyleSheet("border: 1px solid black; padding: 5px;")
-
-            # 確定中獎者
-
-            available_indices = [
-                i for i in range(len(self.current_reward_info['employees']))
-                if self.current_reward_info['employees'][i] not in self.current_reward_info['winners']
-            ]
-            if not available_indices:
-                return
-            pick_count = min(self.pick_spinner.value(), len(available_indices))
-            # remaining_slots = self.current_reward_info['pickNum'] - len(self.current_reward_info['winners'])
-            # pick_count = min(pick_count, remaining_slots)
-            self.winner_indices = self.current_indices[:pick_count]
-
-            # 高亮中獎者為紅色
-            for idx in self.winner_indices:
-                widget = self.grid_layout.itemAt(idx).widget()
-                widget.setStyleSheet("background-color: red; border: 2px solid black; padding: 5px;")
-
-            # 更新中獎紀錄（延遲轉換為黃色）
-            employees = self.current_reward_info['employees']
-            winners = [employees[idx] for idx in self.winner_indices]
-            self.current_reward_info['winners'].extend(winners)
-            self.update_winner_label()
-            
-            # 儲存中獎結果到檔案
-            print(f">>> New Winner : {winners}, {self.current_reward_info['fullrewardName']}")
-            self._save_results_to_file(winners)
-            self.statusBar().showMessage(f"<<{self.current_reward_info['ShowrewardName']}>> 中獎者 : {winners} || 得獎名單寫入至[{self.result_file}]")
-
-            # 更新其他視圖與邏輯
-            self.update_winner_label()
-            
+        # 歷遍已在轉盤轉動時預先規劃，只有條件改變時才重新規劃
+        args = self.draw_arguments(self.current_reward_info, self.mode_combo.currentText(),
+                                   self.pick_spinner.value(), iteration_time)
+        if not self.engine.matches(*args):
+            with self.tracer.span("schedule restart"):
+                self.engine.start(*args)
+        if not self.engine.running:
+            self.statusBar().showMessage("沒有符合資格的參加者可以抽獎")
             self.pull_button.setEnabled(True)
-            self.highlighting_winner = True
-            
-            # 啟用 PULL 按鈕
-            self.pull_button.setEnabled(True)
-            self.highlighting_winner = True  # 標記高亮中獎者
-            if self.recursion > 0 :
-                self.recursion -= 1
-                self.start_lottery_unit()
-            else:
-                self.play_music("resources/winner_sound.mp3")
-                self.pick_spinner.setValue(self.pick_count_temp)
-                
+            self.reward_combo.setEnabled(True)
+            self._apply_pending_reloads()
+            self.tracer.end(self.draw_span, winners=0)
+            self.draw_span = None
+            self.watchdog.phase = PHASE_IDLE
+            self.frame_clock.unsubscribe(self.on_quality_tick)
             return
 
-        # 清除先前的高亮（保留當次紅色高亮）
-        for i in range(self.grid_layout.count()):
-            widget = self.grid_layout.itemAt(i).widget()
-            employee_name = widget.text()
-            if employee_name not in self.current_reward_info['winners']:
-                widget.setStyleSheet("border: 1px solid black; padding: 5px;")
-
-        # 更新當前高亮的員工
-        available_indices = [
-            i for i in range(len(self.current_reward_info['employees']))
-            if self.current_reward_info['employees'][i] not in self.current_reward_info['winners']
-        ]
-        if not available_indices:
-            self.timer.stop()
+        # 由共用的影格時鐘依經過時間推進
+        self.watchdog.phase = PHASE_TRAVERSAL
+        self.traversal_span = self.tracer.begin("traversal", frames=len(self.engine.deadlines))
+        self.grid_widget.clear_eliminated()
+        settings = self.quality.settings()
+        self.grid_widget.highlight_style = settings['highlight_style']
+        self.draw_start_time = self.frame_clock.now()
+        self.last_frame_elapsed = 0
+        if self.tick_audio is not None and settings['tick_sound']:
+            self.tick_audio.start(self.engine.deadlines)
+        self.frame_clock.subscribe(self.update_lights)
+        # 歷遍開頭再量測一段，例如網格很大時換幀的成本比轉盤高
+        self.quality.begin(TRAVERSAL_SAMPLE_FRAMES)
+
+    def update_lights(self, now):
+        """Update the highlighted employees during the lottery."""
+        elapsed = now - self.draw_start_time
+        if self.tick_audio is not None:
+            self.tick_audio.pump(elapsed)
+        # 畫面效果降低時合併短時間內到期的幀（只重繪一次），結束時間不變
+        if (elapsed - self.last_frame_elapsed < self.quality.settings()['repaint_interval_ms']
+                and elapsed < self.engine.total_duration_ms):
             return
-
-        pick_count = min(self.pick_spinner.value(), len(available_indices))
-        # remaining_slots = self.current_reward_info['pickNum'] - len(self.current_reward_info['winners'])
-        # pick_count = min(pick_count, remaining_slots)
-        # if pick_count <= 0:
-        #     self.timer.stop()
-        #     return
-
-        if self.mode_combo.currentText() == "隨機歷遍" or self.mode_combo.currentText() == "連抽模式":
-            # 计算未被抽中的人数
-            non_pick_count = len(available_indices) - pick_count
-
-            if pick_count < non_pick_count:
-                # 避免连续高亮相同的人
-                if hasattr(self, 'last_selected_indices'):
-                    candidates = [i for i in available_indices if i not in self.last_selected_indices]
-                else:
-                    candidates = available_indices
-
-                if not candidates:
-                    candidates = available_indices
-
-                self.current_indices = random.sample(candidates, pick_count)
-
-                # 记录当前被选中的索引
-                self.last_selected_indices = self.current_indices
-                # 更新上次未被选中的索引
-                self.last_excluded_indices = [i for i in available_indices if i not in self.current_indices]
-            elif pick_count > non_pick_count:
-                # 避免连续不高亮相同的人
-                exclude_count = non_pick_count
-
-                if hasattr(self, 'last_excluded_indices'):
-                    exclusion_candidates = [i for i in available_indices if i not in self.last_excluded_indices]
+        try:
+            changed, finished = self.engine.advance(elapsed)
+        except RuntimeError:
+            self.frame_clock.unsubscribe(self.update_lights)
+            self.abort_lottery()
+            return
+        if finished:
+            self.frame_clock.unsubscribe(self.update_lights)
+            self.finish_lottery()
+        elif changed:
+            self.last_frame_elapsed = elapsed
+            frame = self.engine.frame_count - 1
+            with self.tracer.span("frame", frame=frame, lag_ms=round(elapsed - self.engine.deadlines[frame], 2)):
+                if self.engine.mode == MODE_ELIMINATION:
+                    # 淘汰模式只更新本幀被淘汰的格子
+                    self.grid_widget.knock_out(self.engine.knocked_out)
                 else:
-                    exclusion_candidates = available_indices
-
-                if not exclusion_candidates:
-                    exclusion_candidates = available_indices
-
-                excluded_indices = random.sample(exclusion_candidates, exclude_count)
-
-                self.current_indices = [i for i in available_indices if i not in excluded_indices]
-
-                # 记录当前被选中和未被选中的索引
-                self.last_selected_indices = self.current_indices
-                self.last_excluded_indices = excluded_indices
-            else:
-                # 当抽取人数与未抽取人数相同时，允许重复抽取
-                self.current_indices = random.sample(available_indices, pick_count)
-
-                # 记录当前被选中和未被选中的索引
-                self.last_selected_indices = self.current_indices
-                self.last_excluded_indices = [i for i in available_indices if i not in self.current_indices]
-
-            # 高亮当前员工
-            for idx in self.current_indices:
-                widget = self.grid_layout.itemAt(idx).widget()
-                widget.setStyleSheet("background-color: red; border: 2px solid black; padding: 5px;")
-
-            # 播放滚动音效
-            self.play_sound_effect(self.rolling_sound)
-
-            # 更新帧计数和计时器间隔
-            self.frame_count += 1
-            if self.frame_count < len(self.intervals):
-                self.timer.setInterval(int(self.intervals[self.frame_count]))
-            else:
-                self.timer.setInterval(int(self.intervals[-1]))
-
+                    # 高亮當前員工（只重設有變動的格子）
+                    self.grid_widget.set_highlight(self.engine.current_indices)
+                if self.tick_audio is None and self.quality.settings()['tick_sound']:
+                    # 播放滾動音效
+                    self.play_sound_effect(self.rolling_sound)
+
+    def finish_lottery(self):
+        """Commit the winners when the traversal ends."""
+        self.watchdog.phase = PHASE_COMMIT
+        self.tracer.end(self.traversal_span, stalled_ticks=self.engine.stalled_ticks)
+        if self.engine.stalled_ticks:
+            print(f"歷遍中有 {self.engine.stalled_ticks} 個影格等待背景規劃，沿用前一幀畫面")
+        self.traversal_span = None
+        if self.tick_audio is not None:
+            self.tick_audio.finish()
+        self.frame_clock.unsubscribe(self.on_quality_tick)
+        if self.quality.measuring:
+            self.check_quality("traversal")  # 歷遍比量測的影格數短
+        plan = self.engine.plan
+        if plan is not None and plan.finished_ns is not None:
+            # 規劃在背景執行緒進行，依其自行記錄的起訖時間補記
+            self.tracer.complete("schedule computation", plan.started_ns, plan.finished_ns, TRACK_PLANNER,
+                                 {'frames': len(plan)})
+        # 清除高亮（保留中獎者）；淘汰模式先淘汰最後一幀的其餘參加者
+        if self.engine.mode == MODE_ELIMINATION:
+            self.grid_widget.knock_out(self.engine.knocked_out)
+        self.grid_widget.set_highlight([])
+        self.grid_widget.highlight_style = CELL_STYLE_HIGHLIGHT
+
+        # 確定中獎者（工作執行緒的提交事件），高亮為紅色
+        self.winner_indices = self.engine.winner_indices()
+        self.grid_widget.mark_winners(self.winner_indices)
+
+        self.last_draw = self.capture_draw_references(self.current_reward_info)
+
+        # 更新中獎紀錄（延遲轉換為黃色）；看板在中獎者的高亮畫出後才重建
+        with self.tracer.span("record winners"):
+            winners = self.record_winners(self.current_reward_info, self.winner_indices)
+        self.schedule_winner_board_refresh()
+
+        # 儲存中獎結果到檔案
+        with self.tracer.span("winner commit", winners=len(winners)):
+            self.commit_winners(self.current_reward_info, winners)
+        if self.engine.mode == MODE_BULK:
+            self.start_bulk_reveal(self.current_reward_info, winners)
+
+        # 啟用 PULL 按鈕
+        self.pull_button.setEnabled(True)
+        self.reward_combo.setEnabled(True)
+        self._apply_pending_reloads()
+        self.highlighting_winner = True  # 標記高亮中獎者
+        self.tracer.end(self.draw_span, winners=len(winners))
+        self.draw_span = None
+        self.watchdog.phase = PHASE_REVEAL if self.engine.mode == MODE_BULK else PHASE_IDLE
+        if self.recursion > 0 :
+            self.recursion -= 1
+            self.start_lottery_unit()
         else:
-            # 循序歷遍模式
-            indices = []
-            for i in range(pick_count):
-                idx = (self.seq_index + i) % len(available_indices)
-                indices.append(available_indices[idx])
-            self.seq_index = (self.seq_index + pick_count) % len(available_indices)
-            self.current_indices = indices
-
-        # 高亮當前員工
-        for idx in self.current_indices:
-            widget = self.grid_layout.itemAt(idx).widget()
-            widget.setStyleSheet("background-color: red; border: 2px solid black; padding: 5px;")
-
-        # 播放滾動音效
-        self.play_sound_effect(self.rolling_sound)
-
-        # 更新幀計數和計時器間隔
-        self.frame_count += 1
-        if self.frame_count < len(self.intervals):
-            next_interval = self.intervals[self.frame_count]
-            self.timer.setInterval(max(int(next_interval), 1))  # 确保至少为1毫秒
+            with self.tracer.span("sound start"):
+                self.play_music("resources/winner_sound.mp3")
+            self.pick_spinner.setValue(self.pick_count_temp)
+
+    def abort_lottery(self):
+        """背景規劃失敗：停止歷遍、回報錯誤並恢復操作，不寫入中獎紀錄，連抽也一併停止。"""
+        error = self.engine.plan.error
+        message = f"抽獎中止：背景規劃失敗 ({error})"
+        print(message)
+        self.statusBar().showMessage(message)
+        self.tracer.end(self.traversal_span, stalled_ticks=self.engine.stalled_ticks, error=str(error))
+        self.traversal_span = None
+        if self.tick_audio is not None:
+            self.tick_audio.stop()
+        self.frame_clock.unsubscribe(self.on_quality_tick)
+        self.grid_widget.set_highlight([])
+        self.grid_widget.clear_eliminated()
+        self.grid_widget.highlight_style = CELL_STYLE_HIGHLIGHT
+        self.recursion = 0
+        self.pick_spinner.setValue(self.pick_count_temp)
+        self.pull_button.setEnabled(True)
+        self.reward_combo.setEnabled(True)
+        self._apply_pending_reloads()
+        self.tracer.end(self.draw_span, winners=0)
+        self.draw_span = None
+        self.watchdog.phase = PHASE_IDLE
+        QMessageBox.critical(self, "抽獎錯誤", f"背景規劃失敗，本次抽獎沒有產生中獎者：\n{error}")
+
+    def on_quality_tick(self, now):
+        if self.quality.record(now):
+            self.frame_clock.unsubscribe(self.on_quality_tick)
+            self.check_quality("traversal")
+
+    def check_quality(self, phase):
+        """量測區間結束：影格間隔超出預算時降低一級畫面效果並立即套用。"""
+        if not self.quality.evaluate():
+            return
+        frames, ratio, worst = self.quality.last_result
+        message = (f"畫面效果已降為「{self.quality.name()}」：{phase} 的 {frames} 個影格中 {ratio:.0%} "
+                   f"超過 {FRAME_BUDGET_MS} ms（最長 {worst:.0f} ms）")
+        print(message)
+        self.statusBar().showMessage(message)
+        self.tracer.instant("quality degraded", level=self.quality.level, phase=phase, ratio=round(ratio, 2))
+        self.apply_quality()
+
+    def apply_quality(self):
+        """套用目前等級的畫面效果；抽獎進行中也立即生效，歷遍的時程不變。"""
+        settings = self.quality.settings()
+        wheels = [self.wheel_widget]
+        if self.multi_draw_window is not None:
+            wheels.extend(panel.wheel_widget for panel in self.multi_draw_window.panels)
+        for wheel in wheels:
+            wheel.refresh_interval_ms = settings['wheel_interval_ms']
+        if self.engine.running:
+            self.grid_widget.highlight_style = settings['highlight_style']
+            if not settings['tick_sound'] and self.tick_audio is not None:
+                self.tick_audio.finish()  # 已排入聲道的緩衝區照常播完
+
+    def set_render_quality(self, level):
+        """Dev 選單：level 為 None 時自動調整（從完整效果重新開始），否則固定為該等級。"""
+        self.quality.set_level(QUALITY_FULL if level is None else level, adaptive=level is None)
+        self.apply_quality()
+        self.statusBar().showMessage(f"畫面效果：{'自動' if level is None else self.quality.name()}")
+
+    def capture_draw_references(self, reward_info):
+        """在寫入中獎者前保存本次抽獎的參照（不複製名單與各幀），影片輸出時才組成 DrawRecording。
+
+        名單、中獎者陣列、時程與轉盤角度在下一次抽獎或重新載入時都換成新的物件，
+        保存參照即可；中獎者陣列之後會追加，因此另記抽獎前的人數。
+        """
+        winner_mask, ineligible_mask = self.eligibility.state_masks(reward_info['index'])
+        return (reward_info['ShowrewardName'], reward_info['roster'], winner_mask, ineligible_mask,
+                reward_info['winners'], len(reward_info['winners']), self.engine.mode, self.engine.deadlines,
+                self.engine.plan, self.winner_indices, reward_info['RainbowFormat'],
+                self.color_combo.currentText() == "彩色", self.wheel_widget.cumulative_angles,
+                self.wheel_widget.lower_limit, self.wheel_widget.upper_limit, self.total_duration)
+
+    def build_draw_recording(self, draw):
+        """由 capture_draw_references 的參照組成完整的 DrawRecording（歷遍早已結束，各幀都已產生）。"""
+        (reward_name, roster, winner_mask, ineligible_mask, winners, winners_before, mode, deadlines, plan,
+         winner_indices, rainbow_format, colorful, wheel_angles, lower_limit, upper_limit, iteration_time) = draw
+        names = self.registry.names_of(roster)
+        return DrawRecording(
+            reward_name, names, mask_to_indices(winner_mask), mask_to_indices(ineligible_mask),
+            self.registry.names_of(winners[:winners_before]), mode, deadlines,
+            [plan.frame(i) for i in range(len(plan))], winner_indices, [names[i] for i in winner_indices],
+            rainbow_format, colorful, wheel_angles, lower_limit, upper_limit, iteration_time)
+
+    def commit_winners(self, reward_info, winners, source=None):
+        """寫入中獎結果並同步顯示同一獎項的其他畫面。"""
+        winner_names = [self.registry.display_name(pid) for pid in winners]
+        print(f">>> New Winner : {winner_names}, {reward_info['fullrewardName']}")
+        # 大量揭曉一次寫入所有中獎者（結果檔案與資料庫各一次）
+        self._save_results_to_file(winners, reward_info)
+        if len(winner_names) > STATUS_MAX_NAMES:
+            winner_names = winner_names[:STATUS_MAX_NAMES] + [f"等 {len(winners)} 人"]
+        self.statusBar().showMessage(f"<<{reward_info['ShowrewardName']}>> 中獎者 : {winner_names} || 得獎名單寫入至[{self.result_file}]")
+        if reward_info is self.current_reward_info and self.pull_button.isEnabled():
+            self.populate_employee_grid()
+            self.update_winner_label()
         else:
-            self.timer.setInterval(int(self.intervals[-1]))
+            # 跨獎項排除與部門配額可能改變目前顯示獎項的資格
+            self.grid_widget.set_ineligible(self.eligibility.ineligible_indices(self.current_reward_info['index']))
+        if self.multi_draw_window is not None:
+            self.multi_draw_window.refresh_reward(reward_info, source)
+        self.save_session_snapshot()
 
     def update_winner_label(self):
         """Update the winner grid with the current reward's winners."""
         self.populate_winner_grid()
 
+    def schedule_winner_board_refresh(self):
+        """中獎看板排到下一輪事件迴圈重建，提交當下只寫入中獎紀錄；連抽的多次提交只重建一次。"""
+        if not self.board_refresh_pending:
+            self.board_refresh_pending = True
+            QTimer.singleShot(0, self._refresh_winner_board)
+
+    def _refresh_winner_board(self):
+        self.board_refresh_pending = False
+        with self.tracer.span("winner board refresh"):
+            self.update_winner_label()
+
     def play_sound_effect(self, sound):
         """Play rolling sound effect."""
         try:
@@ -923,6 +2336,122 @@ class RouletteApp(QMainWindow):
         except Exception as e:
             print(f"音樂撥放失敗: {e}")
 
+    def _reward_key(self, reward_info):
+        """快照中識別獎項的鍵：優先使用獎項ID，沒有ID時使用檔名的 Index。"""
+        return f"id:{reward_info['rewardID']}" if reward_info['rewardID'] else f"index:{reward_info['index']}"
+
+    def _snapshot_data(self):
+        registry = self.registry
+        rewards = {}
+        for reward_info in self.reward_info.values():
+            if reward_info['winners']:
+                rewards[self._reward_key(reward_info)] = [
+                    [registry.names[pid], registry.departments[pid], registry.occurrences[pid]]
+                    for pid in reward_info['winners']]
+        return {
+            'version': SNAPSHOT_VERSION,
+            'saved_at': datetime.now().isoformat(timespec="seconds"),
+            'result_file': self.result_file,
+            'current_reward': self.current_reward_info['index'] if self.current_reward_info else None,
+            'settings': {
+                'mode': self.mode_combo.currentText(),
+                'color': self.color_combo.currentText(),
+                'pick': self.pick_spinner.value(),
+                'duration_lower': self.duration_lower_spinner.value(),
+                'duration_upper': self.duration_upper_spinner.value(),
+                'start_interval': self.start_interval_spinner.value(),
+                'final_interval': self.final_interval_spinner.value(),
+            },
+            'rng_state': rng_state_to_json(random.getstate()),
+            'winners': rewards,
+        }
+
+    def save_session_snapshot(self):
+        """每次寫入中獎結果後由輸出執行緒原子寫入完整狀態快照。"""
+        self.exporter.submit_snapshot(self.snapshot_file, self._snapshot_data())
+
+    def _restore_winners(self, reward_info, winners):
+        """以 [(姓名, 部門, 同名序號)] 設定獎項的中獎者。"""
+        roster = reward_info['roster']
+        in_roster = set(roster)
+        restored = array('i')
+        for name, department, occurrence in winners:
+            # 已從名單檔移除的中獎者仍保留，補回名單末端
+            pid = self.registry.register(name, department, occurrence)
+            if pid not in in_roster:
+                roster.append(pid)
+                in_roster.add(pid)
+                if reward_info['weights'] is not None:
+                    reward_info['weights'].append(0.0)
+            restored.append(pid)
+        reward_info['winners'] = restored
+
+    def restore_session_snapshot(self):
+        """從快照恢復所有獎項的中獎者、目前獎項、設定與亂數狀態，不需任何對話框。"""
+        data = read_snapshot(self.snapshot_file)
+        if data is None:
+            return False
+        try:
+            rewards_by_key = {self._reward_key(r): r for r in self.reward_info.values()}
+            for key, winners in data['winners'].items():
+                reward_info = rewards_by_key.get(key)
+                if reward_info is None:
+                    print(f"快照中的獎項 {key} 不在目前的獎項清單中。")
+                    continue
+                self._restore_winners(reward_info, winners)
+            self.eligibility.rebuild()
+            self._sync_store_winners()
+
+            settings = data['settings']
+            self.mode_combo.setCurrentText(settings['mode'])  # 會套用模式預設值，之後再覆寫
+            self.color_combo.setCurrentText(settings['color'])
+            self.pick_spinner.setValue(settings['pick'])
+            self.duration_lower_spinner.setValue(settings['duration_lower'])
+            self.duration_upper_spinner.setValue(settings['duration_upper'])
+            self.start_interval_spinner.setValue(settings['start_interval'])
+            self.final_interval_spinner.setValue(settings['final_interval'])
+
+            if data['result_file'] and os.path.exists(data['result_file']):
+                # 繼續寫入同一份得獎名單
+                self.result_file = data['result_file']
+                self.file_initialized = True
+            random.setstate(rng_state_from_json(data['rng_state']))
+
+            current_index = self.reward_combo.currentIndex()
+            if data['current_reward'] in self.reward_ids:
+                current_index = self.reward_ids.index(data['current_reward'])
+            if current_index != self.reward_combo.currentIndex():
+                self.reward_combo.setCurrentIndex(current_index)  # 會觸發 update_reward
+            else:
+                self.update_reward()
+        except Exception as e:
+            print(f"快照恢復失敗: {e}")
+            return False
+        self.statusBar().showMessage(f"已從快照恢復抽獎狀態 ({data['saved_at']})")
+        return True
+
+    def start_new_session(self):
+        """清除所有中獎紀錄與快照，開始新的抽獎活動。"""
+        if not self.pull_button.isEnabled():
+            return
+        reply = QMessageBox.question(self, '開始新的抽獎',
+                                     "將清除目前所有獎項的中獎紀錄（已寫入的得獎名單檔案不受影響），是否繼續？",
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.No:
+            return
+        for reward_info in self.reward_info.values():
+            reward_info['winners'] = array('i')
+        self.eligibility.rebuild()
+        self.result_file = None
+        self.file_initialized = False
+        self.exporter.submit_remove_snapshot(self.snapshot_file)
+        self._sync_store_winners()
+        self.update_reward()
+        if self.multi_draw_window is not None:
+            for panel in self.multi_draw_window.panels:
+                if not panel.is_drawing():
+                    panel.refresh()
+
     def import_winning_list(self):
         """Import winning list csv and restore the draw state."""
         options = QFileDialog.Options()
@@ -937,21 +2466,47 @@ class RouletteApp(QMainWindow):
                         if len(row) < 3:
                             continue
                         winner_name, fullrewardName, rewardID = row[:3]
+                        department = row[3] if len(row) > 3 else None
+                        occurrence = int(row[4]) - 1 if len(row) > 4 and row[4].isdigit() else 0
                         # 在 self.reward_info 中查找匹配的 rewardID
                         reward_found = False
                         for reward_info in self.reward_info.values():
                             if reward_info['rewardID'] == rewardID:
-                                if winner_name not in reward_info['winners']:
-                                    reward_info['winners'].append(winner_name)
+                                pid = self._find_import_winner(reward_info, winner_name, department, occurrence)
+                                if pid is None:
+                                    print(f"Winner {winner_name} not found in reward {rewardID}.")
+                                elif pid not in reward_info['winners']:
+                                    reward_info['winners'].append(pid)
                                 reward_found = True
                                 break
                         if not reward_found:
                             print(f"Reward ID {rewardID} not found in current rewards.")
+                self.eligibility.rebuild()
+                self.save_session_snapshot()
+                self._sync_store_winners()
                 QMessageBox.information(self, "導入成功", "中獎名單已匯入，抽獎狀態已恢復")
                 self.update_reward()
             except Exception as e:
                 QMessageBox.critical(self, "導入錯誤", f"導入時發生錯誤: {e}")
 
+    def _find_import_winner(self, reward_info, name, department, occurrence):
+        """將匯入的中獎紀錄對應到名單中的參加者 ID。
+
+        新格式帶有部門與同名序號可直接查表；舊格式只有姓名時，
+        取名單中第一位同名且尚未中獎的人。
+        """
+        roster = reward_info['roster']
+        if department is not None:
+            pid = self.registry.lookup(name, department, occurrence)
+            if pid is not None and pid in roster:
+                return pid
+        winners = set(reward_info['winners'])
+        names = self.registry.names
+        for pid in roster:
+            if names[pid] == name and pid not in winners:
+                return pid
+        return None
+
     def about_me(self):
         """Show dialog about Rontgen Roulette."""
         message = """
@@ -1043,6 +2598,10 @@ if __name__ == "__main__":
     print("||| Welcome to use Rontgen Roulette v5! |||")
     print("|||   Power by Rontgen, DongZhuWorks.   |||")
     print("|||||||||||||||||||||||||||||||||||||||||||")
+    if "--software-gl" in sys.argv:
+        # 沒有 GPU 的場地電腦改用軟體 OpenGL (Windows 為 opengl32sw，Linux 為 Mesa llvmpipe)
+        QCoreApplication.setAttribute(Qt.AA_UseSoftwareOpenGL)
+        os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
     # 檢查資源完整性
     missing_resources = check_resources()
     if missing_resources:
@@ -1053,10 +2612,7 @@ if __name__ == "__main__":
             "資源缺失",
             f"以下資源檔案或資料夾缺失，請檢查後再執行程式：\n\n" + "\n".join(missing_resources) 
             + "\n\n(rewards資料夾內需有`獎項.txt`)"
-            + "\n`獎項.txt`檔名格式須符合 Index_ShowName.txt，"
-            + "檔案內容前四行格式如下：\n"
-            + "FullName,全名\nPickNum,數字\nRainbowFormat,參數\nRewardID,參數\n"
-            + "其餘行為員工名單。"
+            + "\n" + FORMAT_HELP
         )
         sys.exit(1)  # 終止程式
 
@@ -1064,4 +2620,6 @@ if __name__ == "__main__":
     set_global_font(app)  # 設定全域字體
     lottery_app = RouletteApp()
     lottery_app.show()
+    if "--gl-grid" in sys.argv:
+        lottery_app.set_grid_renderer(True)
     sys.exit(app.exec_())
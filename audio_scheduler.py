@@ -0,0 +1,145 @@
+from collections import deque
+
+import pygame
+
+try:
+    import audioop  # 以 C 實作的取樣運算；Python 3.13 起已移除
+except ImportError:
+    audioop = None
+
+CHUNK_MS = 40        # 每次排入聲道的音訊長度
+RING_SIZE = 4        # 保留最近混好的緩衝區數量（播放中與已排入聲道者必須保留參照）
+GRAIN_MS = 120       # 每次高亮使用的音效長度
+FADE_STEPS = 8       # 音效結尾淡出的段數，避免截斷處產生爆音
+SILENCE_LEVEL = 64   # 低於此振幅視為音效開頭的靜音
+PITCH_LEVELS = (1.3, 1.2, 1.1, 1.0)  # 由快到慢的音高倍率
+MIN_GAIN = 0.6       # 歷遍開始（最快）時的音量比例，逐漸增加到 1
+
+
+def audio_scheduler_available():
+    return audioop is not None and pygame.mixer.get_init() is not None
+
+
+class TickAudioScheduler:
+    """依預先規劃的幀時程混音滾動音效，以 Channel.queue 串流播放。
+
+    歷遍開始時取得每一幀出現的時間，音效在混音緩衝區中對齊這些時間點，
+    每段 CHUNK_MS 的緩衝區混好後排入聲道，不需每一幀 stop/play；
+    間隔比音效短時多個音效會疊加而不是互相截斷。音高與音量隨減速曲線
+    由高到低、由小到大。pump() 由影格時鐘呼叫，聲道播完卻沒有新的緩衝區
+    （例如 GUI 卡住）時直接跳到目前時間，音效不會落後畫面。
+    """
+
+    def __init__(self, sound, channel):
+        self.channel = channel
+        self.rate, size, self.channels = pygame.mixer.get_init()
+        self.width = abs(size) // 8
+        self.frame_bytes = self.width * self.channels
+        self.chunk_frames = self.rate * CHUNK_MS // 1000
+        self.ring = deque(maxlen=RING_SIZE)  # 最近混好的 Sound，舊的緩衝區在播放完後才被覆蓋
+        self.grains = self._build_grains(sound)
+        self.ticks = []        # (開始的取樣位置, 音效, 音量)，依時間排序
+        self.next_tick = 0     # 可能仍與之後的緩衝區重疊的第一個音效
+        self.position = 0      # 下一段緩衝區的開始取樣位置（相對於歷遍開始）
+        self.end_frame = 0
+        self.running = False
+
+    def _build_grains(self, sound):
+        """去掉開頭的靜音並截取 GRAIN_MS，結尾淡出，再產生各種音高的版本。"""
+        raw = sound.get_raw()
+        step = max(self.rate // 1000, 1) * self.frame_bytes  # 以 1 ms 為單位尋找起音
+        start = 0
+        while start < len(raw) and audioop.max(raw[start:start + step], self.width) < SILENCE_LEVEL:
+            start += step
+        if start >= len(raw):
+            start = 0
+        grain = raw[start:start + self.rate * GRAIN_MS // 1000 * self.frame_bytes]
+        grain = audioop.mul(grain, self.width, sound.get_volume())
+        fade_bytes = len(grain) // 2 // FADE_STEPS // self.frame_bytes * self.frame_bytes
+        if fade_bytes:
+            head = len(grain) - fade_bytes * FADE_STEPS
+            pieces = [grain[:head]]
+            for i in range(FADE_STEPS):
+                piece = grain[head + i * fade_bytes:head + (i + 1) * fade_bytes]
+                pieces.append(audioop.mul(piece, self.width, 1.0 - (i + 1) / FADE_STEPS))
+            grain = b"".join(pieces)
+        grains = []
+        for ratio in PITCH_LEVELS:
+            if ratio == 1.0:
+                grains.append(grain)
+            else:
+                # 以較低的取樣率重新取樣後用原取樣率播放，音高提高 ratio 倍
+                converted, _ = audioop.ratecv(grain, self.width, self.channels, self.rate,
+                                              int(self.rate / ratio), None)
+                grains.append(converted[:len(converted) // self.frame_bytes * self.frame_bytes])
+        return grains
+
+    def start(self, deadlines_ms):
+        """開始新的歷遍；deadlines_ms 為每一幀出現的累積時間，與畫面使用相同的時程。"""
+        self.stop()
+        count = len(deadlines_ms)
+        self.ticks = []
+        for i, deadline in enumerate(deadlines_ms):
+            progress = i / (count - 1) if count > 1 else 1.0
+            grain = self.grains[min(int(progress * len(self.grains)), len(self.grains) - 1)]
+            gain = MIN_GAIN + (1.0 - MIN_GAIN) * progress
+            self.ticks.append((int(deadline * self.rate / 1000), grain, gain))
+        self.next_tick = 0
+        self.position = 0
+        self.end_frame = max((frame + len(grain) // self.frame_bytes for frame, grain, _ in self.ticks), default=0)
+        self.running = True
+
+    def pump(self, elapsed_ms):
+        """保持聲道有播放中與排入中的緩衝區；由影格時鐘每次呼叫。"""
+        if not self.running:
+            return
+        if not self.channel.get_busy():
+            # 聲道已播完：第一次呼叫或曾經中斷，從目前時間重新對齊
+            self.position = max(self.position, int(elapsed_ms * self.rate / 1000))
+            if not self._play_next(self.channel.play):
+                return
+        if self.channel.get_queue() is None:
+            self._play_next(self.channel.queue)
+
+    def finish(self):
+        """歷遍結束：不再排入新的緩衝區，已排入的部分（最後一個音效）照常播完。"""
+        self.running = False
+
+    def stop(self):
+        self.running = False
+        self.channel.stop()
+        self.ring.clear()
+
+    def _play_next(self, play):
+        if self.position >= self.end_frame:
+            self.running = False
+            return False
+        play(self._mix_chunk())
+        return True
+
+    def _mix_chunk(self):
+        """將與 [position, position + chunk) 重疊的音效混入新的緩衝區並放入環狀佇列。"""
+        buffer = bytearray(self.chunk_frames * self.frame_bytes)
+        chunk_start = self.position
+        chunk_end = chunk_start + self.chunk_frames
+        frame_bytes = self.frame_bytes
+        while self.next_tick < len(self.ticks):
+            frame, grain, _ = self.ticks[self.next_tick]
+            if frame + len(grain) // frame_bytes > chunk_start:
+                break
+            self.next_tick += 1
+        for frame, grain, gain in self.ticks[self.next_tick:]:
+            if frame >= chunk_end:
+                break
+            grain_start = max(chunk_start - frame, 0)
+            grain_end = min(chunk_end - frame, len(grain) // frame_bytes)
+            if grain_start >= grain_end:
+                continue
+            segment = audioop.mul(grain[grain_start * frame_bytes:grain_end * frame_bytes], self.width, gain)
+            offset = (frame + grain_start - chunk_start) * frame_bytes
+            buffer[offset:offset + len(segment)] = audioop.add(buffer[offset:offset + len(segment)],
+                                                               segment, self.width)
+        self.position = chunk_end
+        sound = pygame.mixer.Sound(buffer=bytes(buffer))
+        self.ring.append(sound)
+        return sound
@@ -0,0 +1,511 @@
+import random
+import threading
+import time
+from array import array
+from sampler import FenwickSampler
+
+# 抽取模式名稱（與 mode_combo 的選項一致）
+MODE_RANDOM = "隨機歷遍"
+MODE_SEQUENTIAL = "循序歷遍"
+MODE_CONSECUTIVE = "連抽模式"
+MODE_ELIMINATION = "淘汰模式"
+MODE_BULK = "大量揭曉"
+
+BULK_FRAME_HIGHLIGHTS = 30  # 大量揭曉的歷遍中每一幀高亮的人數（最後一幀才是全部中獎者）
+FRAME_QUEUE_SIZE = 64       # 工作執行緒最多領先 GUI 取用位置的幀數（約數秒的歷遍）
+
+
+def calculate_intervals(total_duration, start_interval_ms, final_interval_ms, exponent=2):
+    """Calculate intervals for the timer to create a slowing down effect."""
+    # Estimate the number of frames based on average interval
+    average_interval_ms = (start_interval_ms + final_interval_ms) / 2.0
+    N = max(2, int((total_duration * 1000.0) / average_interval_ms))
+
+    # Generate progress list for the deceleration curve
+    progress_list = [(i / (N - 1)) for i in range(N)]
+    intervals = [start_interval_ms + (final_interval_ms - start_interval_ms) * (p ** exponent) for p in progress_list]
+
+    # Scale intervals to match the total duration
+    scale = (total_duration * 1000.0) / sum(intervals)
+    return [interval * scale for interval in intervals]
+
+
+class FramePlan:
+    """預先算好的一次歷遍：每一幀的高亮名單位置，最後一幀即為中獎者。
+
+    淘汰模式中每一幀則是該幀被淘汰的名單位置，全部淘汰後剩下的即為中獎者。
+
+    所有幀依序存放在扁平的 array('i')，offsets[i]:offsets[i + 1] 為第 i 幀。
+    由 DrawWorker 逐幀產生，是工作執行緒與 GUI 執行緒之間的有界佇列：
+    產生的幀最多領先 GUI 取用的位置 capacity 幀，GUI 以 ready() 查詢
+    已完成的幀數，不會等待工作執行緒。最後一幀之後工作執行緒以 commit()
+    放入提交事件（中獎者的名單位置），GUI 取得後才寫入中獎紀錄。
+    """
+
+    def __init__(self, frame_total, capacity=FRAME_QUEUE_SIZE):
+        self.frame_total = frame_total
+        self.capacity = capacity
+        self.values = array('i')
+        self.offsets = array('i', [0])
+        self.consumed = 0        # GUI 已取用到的幀數，工作執行緒據此決定是否繼續產生
+        self.done = False
+        self.cancelled = False
+        self.error = None
+        self.winners = None      # 提交事件：工作執行緒選出的中獎者，None 表示尚未提交
+        self.started_ns = None   # 規劃開始與結束的 perf_counter_ns，供階段追蹤使用
+        self.finished_ns = None
+        self.condition = threading.Condition()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def add_frame(self, indices):
+        """加入一幀；領先 GUI 太多時等待，回傳 False 表示已取消。"""
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.offsets) - 1 - self.consumed < self.capacity or self.cancelled)
+            if self.cancelled:
+                return False
+            self.values.extend(indices)
+            self.offsets.append(len(self.values))
+            self.condition.notify_all()
+            return True
+
+    def commit(self, winners):
+        """在最後一幀之後放入提交事件。"""
+        with self.condition:
+            self.winners = list(winners)
+            self.condition.notify_all()
+
+    def committed(self):
+        """提交事件是否已放入（GUI 執行緒使用，不等待）。"""
+        with self.condition:
+            return self.winners is not None
+
+    def finish(self, error=None):
+        with self.condition:
+            self.finished_ns = time.perf_counter_ns()
+            self.error = error
+            self.done = True
+            self.condition.notify_all()
+
+    def cancel(self):
+        """通知工作執行緒停止，不等待其結束。"""
+        with self.condition:
+            self.cancelled = True
+            self.condition.notify_all()
+
+    def ready(self):
+        """已產生的幀數（GUI 執行緒使用，不等待）。"""
+        with self.condition:
+            return len(self.offsets) - 1
+
+    def release(self, count):
+        """GUI 已取用前 count 幀，讓工作執行緒繼續產生後面的幀。"""
+        with self.condition:
+            if count > self.consumed:
+                self.consumed = count
+                self.condition.notify_all()
+
+    def frame(self, i):
+        """Return the highlighted indices of frame `i`; never waits, `i` must be below ready()."""
+        with self.condition:
+            if i >= len(self.offsets) - 1:
+                raise IndexError(f"frame {i} is not planned yet ({len(self.offsets) - 1} ready)")
+            return self.values[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+
+class DrawWorker:
+    """在背景執行緒依序產生一次歷遍的每一幀放入 FramePlan。
+
+    亂數、加權抽樣器與「避免連續高亮」等選取狀態只屬於這個執行緒，
+    GUI 執行緒只讀取 FramePlan 中已完成的幀；取消時不需等待執行緒結束，
+    舊的工作執行緒也不會改動新一次抽獎的狀態。
+    """
+
+    def __init__(self, plan, mode, pick_count, available_indices, groups, group_quota, sampler, rng):
+        self.plan = plan
+        self.mode = mode
+        self.pick_count = pick_count
+        self.available_indices = available_indices
+        self.groups = groups
+        self.group_quota = group_quota
+        self.sampler = sampler
+        self.rng = rng
+        self.selection = []
+        self.last_selected_indices = []
+        self.last_excluded_indices = []
+        self.last_selected_slots = []
+        self.slot_of = None       # 名單位置 -> 加權抽樣器中的位置，部門配額補位時才建立
+        self.group_slots = None   # 部門 -> 加權抽樣器中的位置
+        # For sequential iteration mode, start from a random position
+        self.seq_index = rng.randint(0, len(available_indices) - 1) if available_indices else 0
+        self.thread = threading.Thread(target=self.run, name="DrawPlanner", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        """依序產生每一幀，最後放入中獎者的提交事件。"""
+        plan = self.plan
+        plan.started_ns = time.perf_counter_ns()
+        try:
+            if self.mode == MODE_ELIMINATION:
+                self._plan_eliminations(plan)
+            elif self.mode == MODE_BULK:
+                self._plan_bulk(plan)
+            else:
+                for i in range(plan.frame_total):
+                    # 最後一幀不套用「避免連續高亮」的限制，確保中獎機率不偏
+                    self._select_next(final=i == plan.frame_total - 1)
+                    if not plan.add_frame(self.selection):
+                        break
+            if not plan.cancelled:
+                plan.commit(self.selection[:self.pick_count])
+        except Exception as e:
+            plan.finish(e)
+            return
+        plan.finish()
+
+    def _plan_eliminations(self, plan):
+        """先以隨機歷遍最後一幀相同的方式選出中獎者，其餘的人打亂後分配到各幀淘汰。"""
+        self._select_next(final=True)
+        winners = set(self.selection)
+        order = [idx for idx in self.available_indices if idx not in winners]
+        self.rng.shuffle(order)
+        eliminate_total = len(order)
+        eliminated = 0
+        for i in range(plan.frame_total):
+            # 剩餘人數依 (1 - 進度)^2 遞減：開始時大量淘汰，接近結束時每幀只淘汰少數幾人
+            remaining = round(eliminate_total * (1 - (i + 1) / plan.frame_total) ** 2)
+            if not plan.add_frame(order[eliminated:eliminate_total - remaining]):
+                return
+            eliminated = eliminate_total - remaining
+
+    def _plan_bulk(self, plan):
+        """一次選出全部中獎者作為最後一幀；之前的幀只隨機高亮少數人，數百人的名單也不需每幀重設大量格子。"""
+        self._select_next(final=True)
+        winners = self.selection
+        available = self.available_indices
+        count = min(BULK_FRAME_HIGHLIGHTS, len(available))
+        for i in range(plan.frame_total - 1):
+            if not plan.add_frame(self.rng.sample(available, count)):
+                return
+        plan.add_frame(winners)
+
+    def _select_next(self, final=False):
+        if self.mode == MODE_SEQUENTIAL:
+            self._select_sequential()
+        elif self.sampler is not None:
+            self._select_weighted(final)
+        elif final:
+            self.selection = self.rng.sample(self.available_indices, self.pick_count)
+        else:
+            self._select_random()
+        if self.groups is not None:
+            self.selection = self._apply_quota(self.selection)
+
+    def _apply_quota(self, indices):
+        """依部門剩餘名額調整本幀的選取，超額的名額從其他候選補上。"""
+        used = {}
+        kept = []
+        for idx in indices:
+            group = self.groups[idx]
+            if group:
+                if used.get(group, 0) >= self.group_quota.get(group, 0):
+                    continue
+                used[group] = used.get(group, 0) + 1
+            kept.append(idx)
+        if len(kept) == len(indices):
+            return indices
+
+        if self.sampler is not None:
+            return kept + self._refill_weighted(kept, used, len(indices) - len(kept))
+
+        kept_set = set(kept)
+        for idx in self.rng.sample(self.available_indices, len(self.available_indices)):
+            if len(kept) >= len(indices):
+                break
+            if idx in kept_set:
+                continue
+            group = self.groups[idx]
+            if group:
+                if used.get(group, 0) >= self.group_quota.get(group, 0):
+                    continue
+                used[group] = used.get(group, 0) + 1
+            kept.append(idx)
+            kept_set.add(idx)
+        return kept
+
+    def _refill_weighted(self, kept, used, needed):
+        """加權模式下依籤數補上名額：暫時移除已選取的人與名額已滿部門的所有人，逐一抽取。"""
+        if self.group_slots is None:
+            self.slot_of = {idx: slot for slot, idx in enumerate(self.available_indices)}
+            self.group_slots = {}
+            for slot, idx in enumerate(self.available_indices):
+                group = self.groups[idx]
+                if group:
+                    self.group_slots.setdefault(group, []).append(slot)
+        sampler = self.sampler
+        removed = []
+
+        def drop(slot):
+            weight = sampler.remove(slot)
+            if weight:
+                removed.append((slot, weight))
+
+        for idx in kept:
+            drop(self.slot_of[idx])
+        for group, slots in self.group_slots.items():
+            if used.get(group, 0) >= self.group_quota.get(group, 0):
+                for slot in slots:
+                    drop(slot)
+        added = []
+        while len(added) < needed and sampler.positive > 0:
+            slot = sampler.pick()
+            drop(slot)
+            idx = self.available_indices[slot]
+            added.append(idx)
+            group = self.groups[idx]
+            if group:
+                used[group] = used.get(group, 0) + 1
+                if used[group] >= self.group_quota.get(group, 0):
+                    for other in self.group_slots[group]:
+                        drop(other)
+        for slot, weight in removed:
+            sampler.update(slot, weight)
+        return added
+
+    def _select_weighted(self, final=False):
+        """以加權抽樣器選取，並暫時排除上一幀高亮的人避免連續重複。"""
+        available = self.available_indices
+        exclude = self.last_selected_slots if not final and len(available) - self.pick_count >= self.pick_count else ()
+        slots = self.sampler.sample(self.pick_count, exclude)
+        self.last_selected_slots = slots
+        self.selection = [available[slot] for slot in slots]
+        self.last_selected_indices = self.selection
+
+    def _select_sequential(self):
+        available = self.available_indices
+        indices = []
+        for i in range(self.pick_count):
+            idx = (self.seq_index + i) % len(available)
+            indices.append(available[idx])
+        self.seq_index = (self.seq_index + self.pick_count) % len(available)
+        self.selection = indices
+
+    def _select_random(self):
+        available = self.available_indices
+        pick_count = self.pick_count
+        # 计算未被抽中的人数
+        non_pick_count = len(available) - pick_count
+
+        if pick_count < non_pick_count:
+            # 避免连续高亮相同的人
+            last_selected = set(self.last_selected_indices)
+            candidates = [i for i in available if i not in last_selected]
+            if len(candidates) < pick_count:
+                candidates = available
+            self.selection = self.rng.sample(candidates, pick_count)
+            selected = set(self.selection)
+            self.last_selected_indices = self.selection
+            self.last_excluded_indices = [i for i in available if i not in selected]
+        elif pick_count > non_pick_count:
+            # 避免连续不高亮相同的人
+            last_excluded = set(self.last_excluded_indices)
+            exclusion_candidates = [i for i in available if i not in last_excluded]
+            if len(exclusion_candidates) < non_pick_count:
+                exclusion_candidates = available
+            excluded = self.rng.sample(exclusion_candidates, non_pick_count)
+            excluded_set = set(excluded)
+            self.selection = [i for i in available if i not in excluded_set]
+            self.last_selected_indices = self.selection
+            self.last_excluded_indices = excluded
+        else:
+            # 当抽取人数与未抽取人数相同时，允许重复抽取
+            self.selection = self.rng.sample(available, pick_count)
+            selected = set(self.selection)
+            self.last_selected_indices = self.selection
+            self.last_excluded_indices = [i for i in available if i not in selected]
+
+
+class DrawEngine:
+    """單一獎項一次抽獎的歷遍狀態機，不依賴 Qt，由共用的影格時鐘依經過時間推進。
+
+    start() 後所有亂數與選取都由 DrawWorker 在背景執行緒算成 FramePlan（可在
+    轉盤轉動時進行），advance() 只取出已完成且到期的那一幀，從不等待工作執行緒：
+    工作執行緒落後時沿用目前的畫面，GUI 卡頓時直接跳到最新一幀。
+    """
+
+    def __init__(self):
+        self.mode = MODE_RANDOM
+        self.pick_count = 0
+        self.total_duration_ms = 0.0
+        self.intervals = []
+        self.deadlines = []  # 每一幀應出現的累積時間 (ms)
+        self.frame_count = 0
+        self.available_indices = []
+        self.current_indices = []  # 目前顯示的一幀（GUI 執行緒使用）
+        self.pool = array('i')   # 淘汰模式中尚未被淘汰的名單位置（GUI 執行緒使用）
+        self.pool_positions = {}  # 名單位置 -> 在 pool 中的索引，用於 O(1) 移除
+        self.knocked_out = []    # 淘汰模式中最近一次 advance() 淘汰的名單位置
+        self.groups = None       # 每個名單位置的部門，用於部門配額
+        self.group_quota = None  # 部門 -> 本次可再中獎的名額
+        self.plan = None
+        self.worker = None
+        self.inputs = None
+        self.running = False
+        self.stalled_ticks = 0   # 到期的幀尚未由工作執行緒產生、沿用目前畫面的次數
+
+    def start(self, mode, pick_count, available_indices, total_duration,
+              start_interval_ms, final_interval_ms, groups=None, group_quota=None, weights=None):
+        """Prepare a new traversal over `available_indices` and start planning it in the background.
+
+        groups/group_quota 為可選的部門配額：每一幀（含最終中獎者）同一部門
+        的高亮人數不會超過其剩餘名額。weights 為每個名單位置的籤數，
+        提供時隨機歷遍以加權抽樣器選取，高亮頻率與中獎機率皆與籤數成正比。
+        """
+        self.cancel()
+        self.inputs = self._inputs(mode, pick_count, available_indices, total_duration,
+                                   start_interval_ms, final_interval_ms, groups, group_quota, weights)
+        self.mode = mode
+        self.available_indices = list(available_indices)
+        self.groups = groups
+        self.group_quota = group_quota
+        # 背景執行緒使用獨立的亂數產生器，種子取自全域亂數，不與 GUI 執行緒交錯使用
+        rng = random.Random(random.getrandbits(64))
+        sampler = None
+        if weights is not None:
+            self.available_indices = [i for i in self.available_indices if weights[i] > 0]
+            sampler = FenwickSampler([weights[i] for i in self.available_indices], rng)
+        self.pick_count = min(pick_count, self._max_pick_count())
+        self.total_duration_ms = total_duration * 1000.0
+        self.intervals = calculate_intervals(total_duration, start_interval_ms, final_interval_ms)
+        self.deadlines = []
+        elapsed = 0.0
+        for interval in self.intervals:
+            elapsed += interval
+            self.deadlines.append(elapsed)
+        self.frame_count = 0
+        self.current_indices = []
+        self.pool = array('i', self.available_indices)
+        self.pool_positions = {idx: pos for pos, idx in enumerate(self.available_indices)}
+        self.knocked_out = []
+        self.stalled_ticks = 0
+        self.running = self.pick_count > 0
+        self.plan = None
+        self.worker = None
+        if self.running:
+            self.plan = FramePlan(len(self.deadlines))
+            self.worker = DrawWorker(self.plan, mode, self.pick_count, self.available_indices,
+                                     groups, group_quota, sampler, rng)
+            self.worker.start()
+        return self.running
+
+    def matches(self, mode, pick_count, available_indices, total_duration,
+                start_interval_ms, final_interval_ms, groups=None, group_quota=None, weights=None):
+        """預先規劃時的條件是否仍與現在相同（轉盤轉動期間其他面板可能已改變資格）。"""
+        return self.inputs == self._inputs(mode, pick_count, available_indices, total_duration,
+                                           start_interval_ms, final_interval_ms, groups, group_quota, weights)
+
+    @staticmethod
+    def _inputs(mode, pick_count, available_indices, total_duration,
+                start_interval_ms, final_interval_ms, groups, group_quota, weights):
+        """規劃所依據的全部條件；名單、部門與權重複製一份，之後重新載入或修改也不影響比對。"""
+        return (mode, pick_count, list(available_indices), total_duration, start_interval_ms, final_interval_ms,
+                None if groups is None else list(groups), group_quota,
+                None if weights is None else list(weights))
+
+    def cancel(self):
+        """停止目前的規劃；舊的工作執行緒只寫入自己的 FramePlan，不需等待其結束。"""
+        if self.plan is not None:
+            self.plan.cancel()
+        self.worker = None
+        self.running = False
+
+    def _eliminate(self, start, stop):
+        """套用第 start 到 stop - 1 幀的淘汰，每個人以與最後一個交換的方式 O(1) 移出 pool。"""
+        knocked_out = []
+        for i in range(start, stop):
+            knocked_out.extend(self.plan.frame(i))
+        pool = self.pool
+        positions = self.pool_positions
+        for idx in knocked_out:
+            pos = positions.pop(idx)
+            last = pool.pop()
+            if pos < len(pool):
+                pool[pos] = last
+                positions[last] = pos
+        self.knocked_out = knocked_out
+
+    def advance(self, elapsed_ms):
+        """推進到 elapsed_ms，回傳 (是否換幀, 是否結束)。
+
+        時鐘落後時會跳過過期的幀，直接取出最新一幀，避免補跑造成卡頓；
+        工作執行緒落後時只取出已完成的幀，結束時間到了也等最後一幀完成才結束。
+        工作執行緒失敗時停止抽獎並丟出 RuntimeError，不會產生中獎者。
+        """
+        if not self.running:
+            return False, True
+
+        frame_total = len(self.deadlines)
+        if elapsed_ms >= self.total_duration_ms:
+            due = frame_total
+        else:
+            due = self.frame_count
+            while due < frame_total and self.deadlines[due] <= elapsed_ms:
+                due += 1
+        self.plan.release(due)
+        ready = self.plan.ready()
+        if ready == frame_total and not self.plan.committed():
+            ready -= 1  # 最後一幀已產生但提交事件尚未放入，視同最後一幀未完成
+        if ready < due:
+            if self.plan.done:
+                # 工作執行緒已失敗結束，不會再產生幀；停止本次抽獎，由呼叫端回報 plan.error
+                self.running = False
+                raise RuntimeError(f"frame plan failed: {self.plan.error}") from self.plan.error
+            self.stalled_ticks += 1
+            due = ready
+
+        if due == frame_total and elapsed_ms >= self.total_duration_ms:
+            self.running = False
+            if self.mode == MODE_ELIMINATION:
+                # 套用尚未顯示的淘汰，留下的即為中獎者
+                self._eliminate(self.frame_count, frame_total)
+                self.frame_count = frame_total
+                self.current_indices = self.pool.tolist()
+                return False, True
+            # 時鐘可能跳過了最後一幀，中獎者一律取預先算好的最後一幀
+            self.current_indices = self.plan.frame(frame_total - 1)
+            return False, True
+
+        if due <= self.frame_count:
+            return False, False
+
+        if self.mode == MODE_ELIMINATION:
+            # 跳過的幀也必須套用其淘汰
+            self._eliminate(self.frame_count, due)
+            self.frame_count = due
+            return True, False
+        self.frame_count = due
+        self.current_indices = self.plan.frame(due - 1)
+        return True, False
+
+    def winner_indices(self):
+        """中獎者取自工作執行緒的提交事件（advance() 回報結束時必已放入）。"""
+        return list(self.plan.winners)
+
+    def _max_pick_count(self):
+        """在部門配額限制下最多能抽出的人數。"""
+        if self.groups is None:
+            return len(self.available_indices)
+        total = 0
+        group_sizes = {}
+        for idx in self.available_indices:
+            group = self.groups[idx]
+            if group:
+                group_sizes[group] = group_sizes.get(group, 0) + 1
+            else:
+                total += 1
+        for group, size in group_sizes.items():
+            total += min(size, self.group_quota.get(group, 0))
+        return total
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# 每個軌道對應 trace viewer 中的一列
+TRACK_MAIN = "主畫面"
+TRACK_PLANNER = "DrawPlanner"
+TRACK_EXPORTER = "ResultExporter"
+TRACK_WATCHDOG = "StallWatchdog"
+
+MAX_TRACE_EVENTS = 1_000_000  # 約可容納整晚活動的所有幀，超過後只計數不記錄
+
+
+class DrawTracer:
+    """記錄抽獎各階段耗時，輸出為 Chrome/Perfetto 可開啟的 trace JSON。
+
+    時間戳記使用 time.perf_counter_ns()（單調時鐘），每筆事件只是一個 tuple
+    追加到串列，GUI 執行緒與背景執行緒皆可呼叫；轉換成 JSON 只在輸出時進行。
+    """
+
+    def __init__(self, max_events=MAX_TRACE_EVENTS):
+        self.origin_ns = time.perf_counter_ns()
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.max_events = max_events
+        self.events = []  # (ph, 名稱, 軌道, 開始 ns, 持續 ns, args)
+        self.dropped = 0
+        self.lock = threading.Lock()  # 只保護 dropped 計數與輸出時的複製
+
+    def __len__(self):
+        return len(self.events)
+
+    def clear(self):
+        """捨棄已記錄的事件（例如長時間壓力測試的取樣之間）。"""
+        with self.lock:
+            self.events = []
+            self.dropped = 0
+
+    def _append(self, event):
+        if len(self.events) < self.max_events:
+            self.events.append(event)
+        else:
+            with self.lock:
+                self.dropped += 1
+
+    def begin(self, name, track=TRACK_MAIN, **args):
+        """開始一個跨越多個回呼的階段，回傳的 span 交給 end() 結束。"""
+        return name, track, time.perf_counter_ns(), args
+
+    def end(self, span, **args):
+        if span is None:
+            return
+        name, track, start_ns, span_args = span
+        if args:
+            span_args = dict(span_args, **args)
+        self.complete(name, start_ns, time.perf_counter_ns(), track, span_args)
+
+    def complete(self, name, start_ns, end_ns, track=TRACK_MAIN, args=None):
+        """記錄已知起訖時間的階段，例如背景執行緒自行量測的時間。"""
+        self._append(('X', name, track, start_ns, end_ns - start_ns, args))
+
+    @contextmanager
+    def span(self, name, track=TRACK_MAIN, **args):
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._append(('X', name, track, start_ns, time.perf_counter_ns() - start_ns, args))
+
+    def instant(self, name, track=TRACK_MAIN, **args):
+        self._append(('i', name, track, time.perf_counter_ns(), 0, args))
+
+    def to_chrome_trace(self):
+        """轉換為 Chrome trace event format（ts/dur 單位為微秒）。"""
+        with self.lock:
+            events = list(self.events)
+            dropped = self.dropped
+        pid = os.getpid()
+        tids = {}
+        trace_events = [{'ph': 'M', 'name': 'process_name', 'pid': pid, 'tid': 0,
+                         'args': {'name': "Rontgen Roulette"}}]
+        for ph, name, track, start_ns, duration_ns, args in events:
+            tid = tids.get(track)
+            if tid is None:
+                tid = tids[track] = len(tids) + 1
+                trace_events.append({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid,
+                                     'args': {'name': track}})
+            event = {'ph': ph, 'name': name, 'cat': 'draw', 'pid': pid, 'tid': tid,
+                     'ts': (start_ns - self.origin_ns) / 1000.0}
+            if ph == 'X':
+                event['dur'] = duration_ns / 1000.0
+            else:
+                event['s'] = 't'
+            if args:
+                event['args'] = args
+            trace_events.append(event)
+        return {
+            'traceEvents': trace_events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'startedAt': self.started_at, 'droppedEvents': dropped},
+        }
+
+    def dumps(self):
+        return json.dumps(self.to_chrome_trace(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,378 @@
+import json
+import math
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import zlib
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide2.QtCore import QPointF, QRectF, Qt
+from PySide2.QtGui import QColor, QFont, QGuiApplication, QImage, QPainter, QPen, QStaticText
+
+from draw_engine import MODE_ELIMINATION
+from grid_render import (
+    GL_CELL_STYLES, GRID_MARGIN, GRID_SPACING, CellStateMixin, board_cell_rects, board_page_capacity,
+    grid_cell_rects, paint_cell_batch, prepare_static_texts, winner_colors
+)
+from wheel_face import WheelFace
+
+VIDEO_FPS = 30
+VIDEO_SIZE = (1280, 720)
+HOLD_MS = 3000          # 歷遍結束後停留在中獎畫面的時間
+MAX_PENDING_FRAMES = 8  # 每個編碼執行緒最多排隊的畫面數，避免畫面累積在記憶體
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".webm")
+RECORDING_VERSION = 1
+BOARD_MIN_CELL_HEIGHT = 24  # 看板格子的最小高度，中獎者多到放不下時改為只顯示最後一頁
+
+
+class DrawRecording:
+    """一次抽獎的完整紀錄：抽獎前的網格與看板、轉盤角度、預先規劃的每一幀與中獎者。
+
+    只需這些資料即可在離屏重新繪製整個抽獎過程，也能存成 JSON 之後再輸出影片。
+    """
+
+    def __init__(self, reward_name, names, winner_positions, ineligible, board_before, mode, deadlines,
+                 frames, winners, winner_names, rainbow_format="", colorful=False, wheel_angles=(),
+                 lower_limit=0.0, upper_limit=0.0, iteration_time=0.0):
+        self.reward_name = reward_name
+        self.names = list(names)
+        self.winner_positions = list(winner_positions)  # 抽獎前已中獎的名單位置
+        self.ineligible = list(ineligible)
+        self.board_before = list(board_before)          # 抽獎前看板上的中獎者
+        self.mode = mode
+        self.deadlines = list(deadlines)
+        self.frames = [list(frame) for frame in frames]
+        self.winners = list(winners)                    # 本次中獎者的名單位置
+        self.winner_names = list(winner_names)
+        self.rainbow_format = rainbow_format
+        self.colorful = colorful
+        self.wheel_angles = list(wheel_angles)          # 轉盤每毫秒的累積角度
+        self.lower_limit = lower_limit
+        self.upper_limit = upper_limit
+        self.iteration_time = iteration_time
+
+    @property
+    def duration_ms(self):
+        return len(self.wheel_angles) + (self.deadlines[-1] if self.deadlines else 0) + HOLD_MS
+
+    def to_json(self):
+        data = dict(vars(self))
+        data['version'] = RECORDING_VERSION
+        return data
+
+    @classmethod
+    def from_json(cls, data):
+        if data.get('version') != RECORDING_VERSION:
+            raise ValueError(f"unsupported draw recording version: {data.get('version')}")
+        data = dict(data)
+        del data['version']
+        return cls(**data)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_json(json.load(f))
+
+
+class _GridState(CellStateMixin):
+    """離屏繪製用的網格狀態，與畫面上的網格共用高亮、淘汰與中獎的樣式規則。"""
+
+    def __init__(self, count, winner_positions, ineligible):
+        winner_set = set(winner_positions)
+        self.winner_flags = [index in winner_set for index in range(count)]
+        self.ineligible = set(ineligible)
+        self.highlighted = set()
+        self.eliminated = set()
+        self.cell_styles = [self.base_style(index) for index in range(count)]
+        self.dirty = True
+
+    def set_cell_style(self, index, style):
+        if 0 <= index < len(self.cell_styles) and self.cell_styles[index] != style:
+            self.cell_styles[index] = style
+            self.dirty = True
+
+
+class DrawVideoRenderer:
+    """依固定影格率在 QImage 上重繪一次抽獎：上方為轉盤與歷遍時間，中間為中獎者看板，下方為員工網格。
+
+    每個影格依時間換算轉盤角度與抽獎引擎的幀，與畫面使用相同的時程；
+    畫面沒有變化的影格直接沿用上一張 QImage，只有變化時才重繪。
+    """
+
+    def __init__(self, recording, width=VIDEO_SIZE[0], height=VIDEO_SIZE[1], fps=VIDEO_FPS):
+        self.recording = recording
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_total = max(1, math.ceil(recording.duration_ms * fps / 1000))
+
+        self.header_height = int(height * 0.14)
+        self.board_top = self.header_height
+        self.board_height = int(height * 0.26)
+        self.grid_top = self.board_top + self.board_height
+
+        self.wheel_face = WheelFace(QFont("Arial", 7))
+        self.wheel_face.set_limits(recording.lower_limit, recording.upper_limit)
+        self.time_font = QFont("Arial", max(int(self.header_height * 0.3), 8))
+        self.title_font = QFont("Arial", max(int(self.header_height * 0.22), 8))
+
+        names = recording.names
+        self.grid_rects, cell_width, cell_height = grid_cell_rects(len(names), width, height - self.grid_top)
+        for rect in self.grid_rects:
+            rect.translate(0, self.grid_top)
+        self.grid_font = QFont()
+        self.grid_font.setPointSize(max(int(min(cell_width, cell_height) * 0.2), 6))
+        self.grid_texts = [QStaticText(name) for name in names]
+        prepare_static_texts(self.grid_texts, self.grid_font)
+
+        self.board_before = self._board(recording.board_before)
+        self.board_after = self._board(recording.board_before + recording.winner_names)
+
+    def _board(self, winners):
+        """中獎者看板的 (格子位置, 樣式, 文字, 字型)，格子大小依人數縮放以放進看板區域。
+
+        格子縮到 BOARD_MIN_CELL_HEIGHT 仍放不下時（大量揭曉），與畫面上的看板相同只顯示最後一頁。
+        """
+        cols = 8
+        colors = winner_colors(len(winners), self.recording.rainbow_format) if self.recording.colorful else None
+        rows = max(1, math.ceil(len(winners) / cols))
+        cell_width = min(220.0, (self.width - 2 * GRID_MARGIN - (cols - 1) * GRID_SPACING) / cols)
+        cell_height = min(80.0, (self.board_height - 2 * GRID_MARGIN - (rows - 1) * GRID_SPACING) / rows)
+        if cell_height < BOARD_MIN_CELL_HEIGHT:
+            cell_height = BOARD_MIN_CELL_HEIGHT
+            page_size = board_page_capacity(self.board_height, cell_height, cols)
+            start = (len(winners) - 1) // page_size * page_size
+            winners = winners[start:]
+            colors = colors[start:] if colors else None
+        rects = board_cell_rects(len(winners), self.width, cell_width, cell_height, cols)
+        for rect in rects:
+            rect.translate(0, self.board_top)
+        styles = [(colors[index] if colors else "yellow", "black", 3, "black", False)
+                  for index in range(len(winners))]
+        font = QFont()
+        font.setPointSize(max(int(cell_height * 0.35), 6))
+        texts = [QStaticText(winner) for winner in winners]
+        prepare_static_texts(texts, font)
+        return rects, styles, texts, font
+
+    def frames(self):
+        """依序產生每個影格的 (QImage, 是否與上一格不同)。"""
+        recording = self.recording
+        wheel_ms = len(recording.wheel_angles)
+        deadlines = recording.deadlines
+        elimination = recording.mode == MODE_ELIMINATION
+        grid = _GridState(len(recording.names), recording.winner_positions, recording.ineligible)
+        shown = 0       # 已套用的抽獎引擎幀數
+        finished = False
+        image = None
+        last_key = None
+        for i in range(self.frame_total):
+            t = i * 1000.0 / self.fps
+            if t < wheel_ms:
+                angle = recording.wheel_angles[int(t)]
+                proportion = (angle % 360) / 360.0
+                seconds = recording.lower_limit + (recording.upper_limit - recording.lower_limit) * proportion
+            else:
+                angle = recording.wheel_angles[-1] % 360 if recording.wheel_angles else 0.0
+                seconds = recording.iteration_time
+                elapsed = t - wheel_ms
+                if not finished and (not deadlines or elapsed >= deadlines[-1]):
+                    # 與抽獎引擎相同：最後一幀一律套用，留下的即為中獎者
+                    if elimination:
+                        for frame in recording.frames[shown:]:
+                            grid.knock_out(frame)
+                    shown = len(deadlines)
+                    grid.set_highlight([])
+                    grid.mark_winners(recording.winners)
+                    finished = True
+                elif not finished:
+                    due = bisect_right(deadlines, elapsed)
+                    if due > shown:
+                        if elimination:
+                            for frame in recording.frames[shown:due]:
+                                grid.knock_out(frame)
+                        else:
+                            grid.set_highlight(recording.frames[due - 1])
+                        shown = due
+            key = (round(angle, 1), f"{seconds:.1f}", finished)
+            if image is None or grid.dirty or key != last_key:
+                image = self.render(angle, seconds, grid.cell_styles, finished)
+                grid.dirty = False
+                last_key = key
+                yield image, True
+            else:
+                yield image, False
+
+    def render(self, angle, seconds, cell_styles, finished):
+        image = QImage(self.width, self.height, QImage.Format_RGB32)
+        image.fill(QColor("white"))
+        painter = QPainter(image)
+
+        # 轉盤與歷遍時間
+        size = self.header_height - 10
+        radius = size / 2 - 4
+        center = QPointF(5 + size / 2, 5 + size / 2)
+        self.wheel_face.paint(painter, center, radius, angle)
+        time_rect = QRectF(size + 15, 5, size * 2.2, size)
+        painter.setPen(QPen(Qt.black, 5))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRect(time_rect)
+        painter.setFont(self.time_font)
+        painter.drawText(time_rect, Qt.AlignCenter, f"{seconds:.1f}s")
+        painter.setFont(self.title_font)
+        painter.drawText(QRectF(time_rect.right() + 20, 5, self.width - time_rect.right() - 30, size),
+                         Qt.AlignVCenter | Qt.AlignRight, f"本次獎項：{self.recording.reward_name}")
+
+        rects, styles, texts, font = self.board_after if finished else self.board_before
+        if rects:
+            paint_cell_batch(painter, rects, styles, texts, font)
+        if self.grid_rects:
+            paint_cell_batch(painter, self.grid_rects, [GL_CELL_STYLES[style] for style in cell_styles],
+                             self.grid_texts, self.grid_font)
+        painter.end()
+        return image
+
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def encode_png(width, height, stride, pixels):
+    """將 RGB888 的像素壓縮為 PNG；zlib 壓縮時會釋放 GIL，多個編碼執行緒可以真正平行。"""
+    row_bytes = width * 3
+    raw = b"".join(b"\x00" + pixels[y * stride:y * stride + row_bytes] for y in range(height))
+    return (b"\x89PNG\r\n\x1a\n"
+            + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + _png_chunk(b"IDAT", zlib.compress(raw, 6))
+            + _png_chunk(b"IEND", b""))
+
+
+class PngSequenceWriter:
+    """輸出 frame_00000.png 起的 PNG 序列；不同的畫面交給執行緒池平行編碼。
+
+    連續相同的影格只編碼一次，再將同一份 PNG 寫成多個檔案。
+    """
+
+    def __init__(self, folder, workers=None):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        workers = workers or os.cpu_count() or 1
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="VideoEncoder")
+        self.max_pending = workers * MAX_PENDING_FRAMES
+        self.pending = []
+        self.frame = None  # 目前畫面的 (寬, 高, 每列位元組數, RGB888 像素)
+        self.paths = []
+        self.count = 0
+
+    def write(self, image, changed):
+        if changed and self.frame is not None:
+            self._submit()
+        if changed or self.frame is None:
+            rgb = image.convertToFormat(QImage.Format_RGB888)
+            self.frame = (rgb.width(), rgb.height(), rgb.bytesPerLine(), bytes(rgb.constBits()))
+        self.paths.append(os.path.join(self.folder, f"frame_{self.count:05d}.png"))
+        self.count += 1
+
+    def _submit(self):
+        self.pending.append(self.pool.submit(self._encode_and_write, self.frame, self.paths))
+        self.paths = []
+        # 限制排隊中的畫面數量，編碼跟不上時由繪製端等待
+        while len(self.pending) > self.max_pending:
+            self.pending.pop(0).result()
+
+    @staticmethod
+    def _encode_and_write(frame, paths):
+        data = encode_png(*frame)
+        for path in paths:
+            with open(path, "wb") as f:
+                f.write(data)
+
+    def close(self):
+        if self.paths:
+            self._submit()
+        try:
+            for future in self.pending:
+                future.result()
+        finally:
+            self.pool.shutdown()
+
+    def abort(self):
+        for future in self.pending:
+            future.cancel()
+        self.pool.shutdown()
+
+
+class FfmpegWriter:
+    """將原始 BGRA 影格以管線送給本機的 ffmpeg 編碼（ffmpeg 自行以多執行緒編碼 H.264）。"""
+
+    def __init__(self, path, width, height, fps, ffmpeg):
+        self.path = path
+        self.count = 0
+        self.data = None
+        command = [ffmpeg, "-y", "-loglevel", "error",
+                   "-f", "rawvideo", "-pix_fmt", "bgra", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+                   "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", path]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, image, changed):
+        if changed or self.data is None:
+            self.data = bytes(image.constBits())
+        self.process.stdin.write(self.data)
+        self.count += 1
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg 結束代碼 {self.process.returncode}")
+
+    def abort(self):
+        self.process.kill()
+        self.process.wait()
+
+
+def find_ffmpeg():
+    return shutil.which("ffmpeg")
+
+
+def export_video(recording, output, fps=VIDEO_FPS, size=VIDEO_SIZE, workers=None, ffmpeg=None, progress=None):
+    """離屏輸出一次抽獎：output 為影片檔 (.mp4 等，需要 ffmpeg) 或 PNG 序列的資料夾。
+
+    progress(已完成影格數, 總影格數) 回傳 False 時中止輸出。回傳輸出的影格數。
+    """
+    renderer = DrawVideoRenderer(recording, size[0], size[1], fps)
+    if output.lower().endswith(VIDEO_EXTENSIONS):
+        ffmpeg = ffmpeg or find_ffmpeg()
+        if ffmpeg is None:
+            raise RuntimeError("找不到 ffmpeg，無法輸出影片檔；請改為輸出 PNG 序列")
+        writer = FfmpegWriter(output, size[0], size[1], fps, ffmpeg)
+    else:
+        writer = PngSequenceWriter(output, workers)
+    try:
+        for image, changed in renderer.frames():
+            writer.write(image, changed)
+            if progress is not None and progress(writer.count, renderer.frame_total) is False:
+                raise InterruptedError("已取消輸出")
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return writer.count
+
+
+if __name__ == "__main__":
+    # 由抽獎紀錄輸出影片：python draw_video.py 紀錄.draw.json 輸出.mp4|輸出資料夾 [fps]
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QGuiApplication(sys.argv)
+    if len(sys.argv) < 3:
+        print("usage: python draw_video.py RECORDING.draw.json OUTPUT.mp4|OUTPUT_FOLDER [FPS]")
+        sys.exit(2)
+    count = export_video(DrawRecording.load(sys.argv[1]), sys.argv[2],
+                         fps=int(sys.argv[3]) if len(sys.argv) > 3 else VIDEO_FPS)
+    print(f"已輸出 {count} 個影格至 {sys.argv[2]}")
@@ -0,0 +1,163 @@
+def mask_to_indices(mask):
+    """Return the positions of the set bits of `mask` in ascending order."""
+    bits = bin(mask)[:1:-1]  # 反轉後第 i 個字元即第 i 位
+    indices = []
+    i = bits.find('1')
+    while i != -1:
+        indices.append(i)
+        i = bits.find('1', i + 1)
+    return indices
+
+
+def indices_to_mask(indices):
+    mask = 0
+    for i in indices:
+        mask |= 1 << i
+    return mask
+
+
+class RewardMasks:
+    """單一獎項在名單位置上的位元集合 (Python int，第 i 位代表名單第 i 人)。"""
+
+    def __init__(self, reward):
+        self.reward = reward
+        self.roster_mask = (1 << len(reward['roster'])) - 1
+        self.winner_mask = 0    # 已在本獎項中獎
+        self.excluded_mask = 0  # 因其他獎項中獎而失去資格
+        self.quota_mask = 0     # 所屬部門已達 MaxPerDept 上限
+        self.positions = {}     # 參加者 ID -> 名單位置
+        self.dept_masks = {}    # 部門 -> 名單位置的位元集合
+        self.dept_winners = {}  # 部門 -> 本獎項中獎人數
+
+    def eligible_mask(self):
+        return self.roster_mask & ~(self.winner_mask | self.excluded_mask | self.quota_mask)
+
+
+class EligibilityEngine:
+    """將跨獎項排除與部門配額規則編譯為每個獎項的位元集合。
+
+    位元集合以名單位置為索引，參加者則以登錄表的全域 ID 串連各獎項；
+    每次抽獎的候選名單即為名單、已中獎、被排除與配額已滿四個位元集合
+    的位元運算結果。
+    """
+
+    def __init__(self, reward_info, registry):
+        self.reward_info = reward_info
+        self.registry = registry
+        self.rebuild()
+
+    def rebuild(self):
+        """依目前的名單與中獎紀錄重新編譯所有位元集合。"""
+        self.won_rewards = {}  # 參加者 ID -> 已中獎的獎項 index 集合
+        self.masks = {}
+        for index, reward in self.reward_info.items():
+            self.masks[index] = self._build_roster_masks(reward)
+
+        # 以現有中獎紀錄重建狀態
+        for index, reward in self.reward_info.items():
+            positions = self.masks[index].positions
+            self._apply_commit(index, [positions[pid] for pid in reward['winners'] if pid in positions])
+
+    def _build_roster_masks(self, reward):
+        masks = RewardMasks(reward)
+        departments = self.registry.departments
+        for pos, pid in enumerate(reward['roster']):
+            masks.positions[pid] = pos
+            department = departments[pid]
+            if department:
+                masks.dept_masks[department] = masks.dept_masks.get(department, 0) | (1 << pos)
+        return masks
+
+    def reload_reward(self, index):
+        """名單變動後只重建該獎項的位元集合（獎項ID與排除規則不變時使用）。
+
+        其他獎項的排除狀態取決於本獎項的中獎者，而中獎者保持不變，
+        因此不需重算其他獎項。
+        """
+        reward = self.reward_info[index]
+        masks = self._build_roster_masks(reward)
+        self.masks[index] = masks
+        max_per_dept = reward.get('maxPerDept', 0)
+        departments = self.registry.departments
+        for pid in reward['winners']:
+            pos = masks.positions.get(pid)
+            if pos is None:
+                continue
+            masks.winner_mask |= 1 << pos
+            department = departments[pid]
+            if department:
+                masks.dept_winners[department] = masks.dept_winners.get(department, 0) + 1
+        for department, count in masks.dept_winners.items():
+            if max_per_dept > 0 and count >= max_per_dept:
+                masks.quota_mask |= masks.dept_masks[department]
+        for pid, pos in masks.positions.items():
+            for won_index in self.won_rewards.get(pid, ()):
+                if self._excludes(index, won_index):
+                    masks.excluded_mask |= 1 << pos
+                    break
+
+    def _excludes(self, index, winner_reward_index):
+        """獎項 index 是否排除獎項 winner_reward_index 的中獎者。"""
+        if index == winner_reward_index:
+            return False
+        rules = self.reward_info[index].get('excludeWinnersOf') or []
+        return "*" in rules or self.reward_info[winner_reward_index]['rewardID'] in rules
+
+    def _apply_commit(self, index, positions):
+        masks = self.masks[index]
+        reward = self.reward_info[index]
+        max_per_dept = reward.get('maxPerDept', 0)
+        for pos in positions:
+            masks.winner_mask |= 1 << pos
+            pid = reward['roster'][pos]
+            self.won_rewards.setdefault(pid, set()).add(index)
+            department = self.registry.departments[pid]
+            if department:
+                masks.dept_winners[department] = masks.dept_winners.get(department, 0) + 1
+                if max_per_dept > 0 and masks.dept_winners[department] >= max_per_dept:
+                    masks.quota_mask |= masks.dept_masks[department]
+            # 只更新受影響的獎項：該中獎者在其他獎項名單中的位置
+            for other_index, other_masks in self.masks.items():
+                other_pos = other_masks.positions.get(pid)
+                if other_pos is not None and self._excludes(other_index, index):
+                    other_masks.excluded_mask |= 1 << other_pos
+
+    def commit(self, index, positions):
+        """Record that the given roster positions of reward `index` have won."""
+        self._apply_commit(index, positions)
+
+    def position_of(self, index, pid):
+        """參加者在獎項名單中的位置，不在名單中時回傳 None。"""
+        return self.masks[index].positions.get(pid)
+
+    def winner_positions(self, index):
+        return mask_to_indices(self.masks[index].winner_mask)
+
+    def candidate_indices(self, index):
+        """目前仍具資格的名單位置。"""
+        return mask_to_indices(self.masks[index].eligible_mask())
+
+    def ineligible_indices(self, index):
+        """因跨獎項排除或部門配額而失去資格（但尚未在本獎項中獎）的位置。"""
+        masks = self.masks[index]
+        return mask_to_indices((masks.excluded_mask | masks.quota_mask) & ~masks.winner_mask)
+
+    def state_masks(self, index):
+        """(已中獎, 失去資格) 的位元集合；int 不可變，保存參照即可在之後還原當時的狀態。"""
+        masks = self.masks[index]
+        return masks.winner_mask, (masks.excluded_mask | masks.quota_mask) & ~masks.winner_mask
+
+    def department_quota(self, index):
+        """回傳 (每個位置的部門, 各部門剩餘名額)；獎項無配額時回傳 (None, None)。"""
+        reward = self.reward_info[index]
+        max_per_dept = reward.get('maxPerDept', 0)
+        if max_per_dept <= 0:
+            return None, None
+        masks = self.masks[index]
+        remaining = {dept: max(max_per_dept - masks.dept_winners.get(dept, 0), 0)
+                     for dept in masks.dept_masks}
+        departments = self.registry.departments
+        return [departments[pid] for pid in reward['roster']], remaining
+
+    def won_rewards_of(self, pid):
+        return self.won_rewards.get(pid, set())
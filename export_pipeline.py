@@ -0,0 +1,230 @@
+import csv
+import json
+import os
+import queue
+import tempfile
+import threading
+import zipfile
+from contextlib import nullcontext
+from xml.sax.saxutils import escape
+
+from PySide2.QtCore import QObject, Signal
+
+from draw_trace import TRACK_EXPORTER
+from session import write_snapshot
+from store import RouletteStore
+
+CSV_HEADER = ["員工姓名", "完整獎項名稱", "獎項ID", "部門", "同名序號"]
+
+
+def atomic_write_bytes(path, data):
+    """寫入暫存檔後改名取代，避免輸出檔寫到一半。"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".export_", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _column_name(col):
+    name = ""
+    col += 1
+    while col:
+        col, remainder = divmod(col - 1, 26)
+        name = chr(ord('A') + remainder) + name
+    return name
+
+
+def _sheet_xml(rows):
+    lines = ['<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+             '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>']
+    for r, row in enumerate(rows, start=1):
+        cells = []
+        for c, value in enumerate(row):
+            ref = f"{_column_name(c)}{r}"
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>')
+        lines.append(f'<row r="{r}">{"".join(cells)}</row>')
+    lines.append('</sheetData></worksheet>')
+    return "".join(lines)
+
+
+def _sheet_name(name, used):
+    """Excel 工作表名稱最多 31 字且不可含 []:*?/\\，重複時加上序號。"""
+    cleaned = "".join("_" if ch in '[]:*?/\\' else ch for ch in name).strip() or "Sheet"
+    cleaned = cleaned[:31]
+    candidate = cleaned
+    n = 2
+    while candidate in used:
+        suffix = f"({n})"
+        candidate = cleaned[:31 - len(suffix)] + suffix
+        n += 1
+    used.add(candidate)
+    return candidate
+
+
+def build_xlsx(sheets):
+    """產生最小的 XLSX 檔案內容；sheets 為 [(工作表名稱, 列資料)]，不需額外套件。"""
+    used = set()
+    names = [_sheet_name(name, used) for name, _ in sheets]
+    content_types = ['<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+                     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">',
+                     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>',
+                     '<Default Extension="xml" ContentType="application/xml"/>',
+                     '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>']
+    workbook_sheets = []
+    workbook_rels = []
+    for i, name in enumerate(names, start=1):
+        content_types.append(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+        workbook_sheets.append(f'<sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>')
+        workbook_rels.append(f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{i}.xml"/>')
+    content_types.append('</Types>')
+
+    buffer = tempfile.SpooledTemporaryFile()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", "".join(content_types))
+        archive.writestr("_rels/.rels",
+                         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                         '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+                         '</Relationships>')
+        archive.writestr("xl/workbook.xml",
+                         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                         '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                         'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                         f'<sheets>{"".join(workbook_sheets)}</sheets></workbook>')
+        archive.writestr("xl/_rels/workbook.xml.rels",
+                         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                         f'{"".join(workbook_rels)}</Relationships>')
+        for i, (_, rows) in enumerate(sheets, start=1):
+            archive.writestr(f"xl/worksheets/sheet{i}.xml", _sheet_xml(rows))
+    buffer.seek(0)
+    return buffer.read()
+
+
+class ResultExporter(QObject):
+    """背景輸出中獎結果的工作執行緒。
+
+    GUI 執行緒只把事件放進佇列：commit 事件立即追加到 CSV，佇列清空後
+    再依獎項ID分組輸出 JSON 與 XLSX 摘要；snapshot 事件只寫入最新一份；
+    啟用 SQLite 後端時，資料庫寫入也在此執行緒以獨立連線依序執行。
+    完成或失敗時以 Signal 通知（跨執行緒的 Signal 會排入 GUI 事件迴圈）。
+    """
+    export_finished = Signal(str)
+    export_failed = Signal(str)
+
+    def __init__(self, parent=None, tracer=None):
+        super().__init__(parent)
+        self.queue = queue.Queue()
+        self.store = None  # 只在工作執行緒中使用的 RouletteStore
+        self.tracer = tracer  # DrawTracer，記錄實際寫檔的耗時
+        self.thread = threading.Thread(target=self._run, name="ResultExporter", daemon=True)
+        self.thread.start()
+
+    def submit_commit(self, result_file, rows, summary):
+        """rows 追加到 result_file；summary 為依獎項ID分組的完整中獎名單。"""
+        self.queue.put(('commit', result_file, rows, summary))
+
+    def submit_snapshot(self, path, data):
+        self.queue.put(('snapshot', path, data))
+
+    def submit_remove_snapshot(self, path):
+        """依序刪除快照，確保佇列中較早的快照不會在刪除後又被寫回。"""
+        self.queue.put(('remove_snapshot', path))
+
+    def open_store(self, path):
+        self.queue.put(('open_store', path))
+
+    def submit_store(self, method, *args):
+        """在工作執行緒呼叫 RouletteStore 的寫入方法，例如 submit_store('add_winners', index, winners)。"""
+        self.queue.put(('store', method, args))
+
+    def close(self, timeout=5.0):
+        """送出結束事件並等待佇列中的輸出完成。"""
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def _run(self):
+        pending_summary = None
+        pending_snapshot = None
+        while True:
+            event = self.queue.get()
+            if event is None:
+                break
+            try:
+                if event[0] == 'commit':
+                    _, result_file, rows, summary = event
+                    with self._span("csv append", rows=len(rows)):
+                        self._append_csv(result_file, rows)
+                    pending_summary = (result_file, summary)
+                elif event[0] == 'snapshot':
+                    pending_snapshot = event[1:]
+                elif event[0] == 'remove_snapshot':
+                    pending_snapshot = None
+                    if os.path.exists(event[1]):
+                        os.remove(event[1])
+                elif event[0] == 'open_store':
+                    if self.store is None:
+                        self.store = RouletteStore(event[1])
+                elif event[0] == 'store':
+                    if self.store is not None:
+                        with self._span(f"store {event[1]}"):
+                            getattr(self.store, event[1])(*event[2])
+                # 佇列中還有事件時先處理，摘要與快照只輸出最新的一份
+                if self.queue.empty():
+                    if pending_snapshot is not None:
+                        with self._span("snapshot write"):
+                            write_snapshot(*pending_snapshot)
+                        pending_snapshot = None
+                    if pending_summary is not None:
+                        with self._span("summary write"):
+                            outputs = self._write_summaries(*pending_summary)
+                        pending_summary = None
+                        self.export_finished.emit(", ".join(outputs))
+            except Exception as e:
+                self.export_failed.emit(str(e))
+        # 結束前寫出尚未輸出的資料
+        try:
+            if pending_snapshot is not None:
+                write_snapshot(*pending_snapshot)
+            if pending_summary is not None:
+                self._write_summaries(*pending_summary)
+        except Exception as e:
+            print(f"結果輸出失敗: {e}")
+        if self.store is not None:
+            self.store.close()
+
+    def _span(self, name, **args):
+        return self.tracer.span(name, TRACK_EXPORTER, **args) if self.tracer is not None else nullcontext()
+
+    def _append_csv(self, result_file, rows):
+        if not os.path.exists(result_file):
+            # 創建檔案並寫入標題行
+            with open(result_file, "w", newline="", encoding="utf-8-sig") as file:
+                csv.writer(file, delimiter=",").writerow(CSV_HEADER)
+        with open(result_file, "a", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file, delimiter=",")
+            writer.writerows(rows)
+
+    def _write_summaries(self, result_file, summary):
+        stem = os.path.splitext(result_file)[0]
+        json_file = stem + ".json"
+        xlsx_file = stem + ".xlsx"
+        atomic_write_bytes(json_file, json.dumps(summary, ensure_ascii=False, indent=2).encode("utf-8"))
+        sheets = []
+        for reward_id, reward in summary.items():
+            rows = [["員工姓名", "部門", "同名序號"]]
+            rows.extend([winner['name'], winner['department'], winner['occurrence']] for winner in reward['winners'])
+            sheets.append((reward_id or reward['fullName'], [["獎項", reward['fullName']], ["獎項ID", reward_id]] + rows))
+        atomic_write_bytes(xlsx_file, build_xlsx(sheets or [("中獎名單", [CSV_HEADER])]))
+        return [result_file, json_file, xlsx_file]
@@ -0,0 +1,249 @@
+from PySide2.QtCore import QPointF, QRectF, QSizeF, Qt
+from PySide2.QtGui import QColor, QPen, QStaticText, QTransform
+
+from reward_files import parse_rainbow_format
+
+# 員工網格與中獎者看板的樣式、版面與批次繪製，QWidget、QOpenGLWidget 與離屏影片輸出共用
+
+# 網格儲存格樣式
+CELL_STYLE_NORMAL = "border: 1px solid black; padding: 5px;"
+CELL_STYLE_HIGHLIGHT = "background-color: red; border: 2px solid black; padding: 5px;"
+# 簡化的高亮：框線與一般格子相同，QLabel 的大小提示不變，換幀時不觸發整個網格重新排版
+CELL_STYLE_HIGHLIGHT_SIMPLE = "background-color: red; border: 1px solid black; padding: 5px;"
+CELL_STYLE_WINNER = "background-color: yellow; border: 2px solid black; padding: 5px;"
+CELL_STYLE_INELIGIBLE = "color: gray; border: 1px dashed gray; padding: 5px;"
+CELL_STYLE_ELIMINATED = "color: lightgray; border: 1px solid lightgray; padding: 5px;"
+
+# Define rainbow colors list
+RAINBOW_COLORS = [
+    "#FF0000",  # Red
+    "#FFA500",  # Orange
+    "#FFFF00",  # Yellow
+    "#008000",  # Green
+    "#2F67D7",  # Blue
+    "#8E3AC6",  # Indigo
+    "#EE82EE",  # Violet
+]
+
+def winner_colors(num_winners, rainbow_format):
+    """依 RainbowFormat 計算每位中獎者的底色；格式為空時每兩人換一色。"""
+    colors = []
+    if rainbow_format != "":
+        counts_list = parse_rainbow_format(rainbow_format)
+        color_index = 0
+        if counts_list:
+            count_remaining = counts_list.pop(0)
+        else:
+            count_remaining = 2  # Default to 2 if counts_list is empty
+        default_remaining = 2
+        for _ in range(num_winners):
+            colors.append(RAINBOW_COLORS[color_index % len(RAINBOW_COLORS)])
+            count_remaining -= 1
+            if count_remaining == 0:
+                color_index += 1
+                if counts_list:
+                    count_remaining = counts_list.pop(0)
+                else:
+                    # counts_list is exhausted, use default rule
+                    count_remaining = default_remaining
+    else:
+        # Use default rule, change color every two people
+        for index in range(num_winners):
+            colors.append(RAINBOW_COLORS[(index // 2) % len(RAINBOW_COLORS)])
+    return colors
+
+def grid_columns(num_employees):
+    """員工名單網格的欄數。"""
+    if num_employees < 16 :
+        oneCols = 5
+    elif num_employees < 22 :
+        oneCols = 7
+    else:
+        oneCols = 10
+    return min(oneCols, num_employees)  # Up to 10 columns
+
+
+def grid_cell_size(num_employees, width, height):
+    """員工網格在 width x height 區域內的 (欄數, 格寬, 格高)，與 QGridLayout 的版面相同。"""
+    cols = grid_columns(num_employees)
+    rows = (num_employees + cols - 1) // cols
+    cell_width = (width - 2 * GRID_MARGIN - (cols - 1) * GRID_SPACING) / cols
+    cell_height = (height - 2 * GRID_MARGIN - (rows - 1) * GRID_SPACING) / rows
+    return cols, cell_width, cell_height
+
+
+def cell_font_size(cell_width, cell_height, min_font_size, with_photos=False):
+    """依格子大小調整姓名字體；有照片時姓名只佔格子下方，最小字體也放寬，把空間留給照片。"""
+    if with_photos:
+        return max(int(min(cell_width, cell_height) * 0.12), min(min_font_size, PHOTO_MIN_FONT_SIZE))
+    return max(int(min(cell_width, cell_height) * 0.2), min_font_size)
+
+
+def grid_cell_rects(num_employees, width, height):
+    """員工網格在 width x height 區域內每一格的位置，回傳 (rects, 格寬, 格高)。"""
+    cols, cell_width, cell_height = grid_cell_size(num_employees, width, height)
+    return [QRectF(GRID_MARGIN + (index % cols) * (cell_width + GRID_SPACING),
+                   GRID_MARGIN + (index // cols) * (cell_height + GRID_SPACING),
+                   cell_width, cell_height)
+            for index in range(num_employees)], cell_width, cell_height
+
+
+def board_cell_rects(count, width, cell_width, cell_height, cols):
+    """中獎者看板的格子位置：固定大小，整塊水平置中。"""
+    block_cols = min(cols, count)
+    block_width = block_cols * cell_width + (block_cols - 1) * GRID_SPACING
+    left = max((width - block_width) / 2, GRID_MARGIN)
+    return [QRectF(left + (index % cols) * (cell_width + GRID_SPACING),
+                   GRID_MARGIN + (index // cols) * (cell_height + GRID_SPACING),
+                   cell_width, cell_height)
+            for index in range(count)]
+
+
+def board_columns_for(width, cell_width):
+    """width 寬度內可排下的看板欄數（至少一欄）。"""
+    return max(1, int(width - 2 * GRID_MARGIN + GRID_SPACING) // (cell_width + GRID_SPACING))
+
+
+def board_page_capacity(height, cell_height, cols):
+    """中獎者看板在 height 高度內一頁可顯示的格數（整列，至少一列）。"""
+    rows = max(1, int(height - 2 * GRID_MARGIN + GRID_SPACING) // (cell_height + GRID_SPACING))
+    return rows * cols
+
+
+class CellStateMixin:
+    """網格儲存格的中獎、資格與高亮狀態，實際的樣式由子類別的 set_cell_style 套用。"""
+
+    highlight_style = CELL_STYLE_HIGHLIGHT  # 歷遍中高亮的樣式，畫面效果降低時改用簡化樣式
+
+    def base_style(self, index):
+        """未高亮時的樣式：中獎者黃色、失去資格者灰色、淘汰模式中被淘汰者淡灰色。"""
+        if self.winner_flags[index]:
+            return CELL_STYLE_WINNER
+        if index in self.ineligible:
+            return CELL_STYLE_INELIGIBLE
+        if index in self.eliminated:
+            return CELL_STYLE_ELIMINATED
+        return CELL_STYLE_NORMAL
+
+    def set_highlight(self, indices):
+        """只更新與上一幀不同的儲存格。"""
+        new_highlighted = set(indices)
+        for index in self.highlighted - new_highlighted:
+            self.set_cell_style(index, self.base_style(index))
+        for index in new_highlighted - self.highlighted:
+            self.set_cell_style(index, self.highlight_style)
+        self.highlighted = new_highlighted
+
+    def set_ineligible(self, indices):
+        """更新失去資格的位置，只重設有變動且未高亮的格子。"""
+        new_ineligible = set(indices)
+        changed = self.ineligible ^ new_ineligible
+        self.ineligible = new_ineligible
+        for index in changed:
+            if index not in self.highlighted and 0 <= index < len(self.cell_styles):
+                self.set_cell_style(index, self.base_style(index))
+
+    def knock_out(self, indices):
+        """淘汰模式：只更新本幀被淘汰的格子。"""
+        for index in indices:
+            self.eliminated.add(index)
+            if index not in self.highlighted:
+                self.set_cell_style(index, self.base_style(index))
+
+    def clear_eliminated(self):
+        """還原上一次淘汰模式留下的淘汰樣式。"""
+        eliminated, self.eliminated = self.eliminated, set()
+        for index in eliminated:
+            if index not in self.highlighted:
+                self.set_cell_style(index, self.base_style(index))
+
+    def update_state(self, winner_positions, ineligible=()):
+        """名單不變時只修補中獎與資格有變動的格子，並清除殘留的高亮。"""
+        winner_set = set(winner_positions)
+        self.ineligible = set(ineligible)
+        self.highlighted = set()
+        self.eliminated = set()
+        for index in range(len(self.cell_styles)):
+            self.winner_flags[index] = index in winner_set
+            self.set_cell_style(index, self.base_style(index))
+
+    def mark_winners(self, indices, style=CELL_STYLE_HIGHLIGHT):
+        """將 indices 標記為中獎者，預設以紅色高亮顯示當次中獎。"""
+        for index in indices:
+            if 0 <= index < len(self.cell_styles):
+                self.winner_flags[index] = True
+                self.set_cell_style(index, style)
+
+
+# OpenGL 繪製時各樣式對應的 (底色, 框線顏色, 框線寬度, 文字顏色, 是否虛線)
+GL_CELL_STYLES = {
+    CELL_STYLE_NORMAL: (None, "black", 1, "black", False),
+    CELL_STYLE_HIGHLIGHT: ("red", "black", 2, "black", False),
+    CELL_STYLE_HIGHLIGHT_SIMPLE: ("red", "black", 1, "black", False),
+    CELL_STYLE_WINNER: ("yellow", "black", 2, "black", False),
+    CELL_STYLE_INELIGIBLE: (None, "gray", 1, "gray", True),
+    CELL_STYLE_ELIMINATED: (None, "lightgray", 1, "lightgray", False),
+}
+GRID_MARGIN = 9   # 與 QGridLayout 預設的邊界與間距相同，兩種繪製方式的版面一致
+GRID_SPACING = 6
+CELL_PHOTO_PADDING = 4
+PHOTO_MIN_FONT_SIZE = 10
+CELL_PHOTO_PLACEHOLDER = "#d8d8d8"  # 縮圖尚未完成時的預留方塊
+
+
+def paint_cell_batch(painter, rects, styles, texts, font, photos=None):
+    """依樣式分組批次繪製儲存格。
+
+    同一樣式的底色與框線以一次 drawRects 繪製，文字使用預先排版的
+    QStaticText（OpenGL 繪製引擎會將字形快取在材質中），整個網格只需
+    少數幾次繪製呼叫。styles 為 GL_CELL_STYLES 格式的 tuple。
+    photos 為 {位置: QImage}，有照片的格子照片在上、姓名在下；
+    縮圖尚未完成時傳入空的 QImage，以灰色方塊預留位置。
+    """
+    groups = {}
+    for index, style in enumerate(styles):
+        groups.setdefault(style, []).append(index)
+    for (background, border, width, _, dashed), indices in groups.items():
+        pen = QPen(QColor(border), width)
+        if dashed:
+            pen.setStyle(Qt.DashLine)
+        painter.setPen(pen)
+        painter.setBrush(QColor(background) if background else Qt.NoBrush)
+        painter.drawRects([rects[i] for i in indices])
+    painter.setFont(font)
+    for (_, _, _, text_color, _), indices in groups.items():
+        painter.setPen(QColor(text_color))
+        for i in indices:
+            rect = rects[i]
+            size = texts[i].size()
+            if photos and i in photos:
+                text_top = rect.bottom() - size.height() - CELL_PHOTO_PADDING
+            else:
+                text_top = rect.center().y() - size.height() / 2
+            painter.drawStaticText(QPointF(rect.center().x() - size.width() / 2, text_top), texts[i])
+    if photos:
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(CELL_PHOTO_PLACEHOLDER))
+        for i, image in photos.items():
+            if i < len(rects):
+                _paint_cell_photo(painter, rects[i], texts[i].size().height(), image)
+
+
+def _paint_cell_photo(painter, rect, text_height, image):
+    side = min(rect.width(), rect.height() - text_height - CELL_PHOTO_PADDING * 3) - CELL_PHOTO_PADDING * 2
+    if side <= 0:
+        return
+    target = QRectF(0, 0, side, side)
+    if not image.isNull():
+        size = image.size().scaled(int(side), int(side), Qt.KeepAspectRatio)
+        target.setSize(QSizeF(size))
+    target.moveCenter(QPointF(rect.center().x(), rect.top() + CELL_PHOTO_PADDING + side / 2))
+    if image.isNull():
+        painter.drawRect(target)
+    else:
+        painter.drawImage(target, image)
+
+
+def prepare_static_texts(texts, font):
+    for text in texts:
+        text.prepare(QTransform(), font)
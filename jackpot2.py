@@ -9,6 +9,7 @@ from PySide2.QtWidgets import (
 from PySide2.QtGui import QColor, QPainter, QPen, QBrush, QFont
 from PySide2.QtCore import Qt, QTimer, QTime, Signal
 import pygame
+from wheel_face import WheelFace
 
 class WheelWidget(QWidget):
     iteration_time_decided = Signal(float)  # Signal to emit the iteration time when animation finishes
@@ -34,6 +35,12 @@ class WheelWidget(QWidget):
         self.lower_limit = 5.0  # Default lower limit in seconds
         self.upper_limit = 50.0  # Default upper limit in seconds
 
+        # 圓盤、刻度與時間標籤只在尺寸或上下限改變時繪製一次，每幀只旋轉貼上並畫指針
+        self.wheel_face = WheelFace(QFont("Arial", 10), tick_length=20, label_inset=40, label_every=1,
+                                    decimals=1, pointer_width=4)
+        self.wheel_face.set_limits(self.lower_limit, self.upper_limit)
+        self.title_font = QFont("Arial", 14)
+
         # Set minimum size
         self.setMinimumSize(300, 300)
 
@@ -84,47 +91,22 @@ class WheelWidget(QWidget):
     def paintEvent(self, event):
         painter = QPainter(self)
         rect = self.rect()
-        painter.setRenderHint(QPainter.Antialiasing)
 
-        # Draw wheel background
         radius = min(rect.width(), rect.height()) / 2 - 10
         center = rect.center()
 
-        painter.setPen(QPen(Qt.black, 2))
-        painter.setBrush(QBrush(Qt.white))
-        painter.drawEllipse(center, radius, radius)
-
-        # Draw sectors with time labels
-        num_sectors = 12
-        for i in range(num_sectors):
-            angle = i * 360 / num_sectors
-            proportion = i / num_sectors
-            sector_time = self.lower_limit + (self.upper_limit - self.lower_limit) * proportion
-            painter.save()
-            painter.translate(center)
-            painter.rotate(angle + self.rotation_angle)
-            painter.setPen(QPen(Qt.black, 1))
-            painter.drawLine(0, -radius, 0, -radius + 20)
-
-            # Draw time text
-            painter.translate(0, -radius + 40)
-            painter.rotate(-angle - self.rotation_angle)
-            painter.setFont(QFont("Arial", 10))
-            painter.drawText(-20, 5, f"{sector_time:.1f}s")
-            painter.restore()
-
-        # Draw pointer
-        painter.setPen(QPen(Qt.red, 4))
-        painter.drawLine(center.x(), center.y(), center.x(), center.y() - radius)
+        self.wheel_face.paint(painter, center, radius, self.rotation_angle, self.devicePixelRatioF())
 
         # Add title text
-        painter.setFont(QFont("Arial", 14))
+        painter.setFont(self.title_font)
         painter.setPen(Qt.black)
         painter.drawText(rect, Qt.AlignBottom | Qt.AlignHCenter, "歷遍時間轉盤")
 
     def set_limits(self, lower, upper):
         self.lower_limit = lower
         self.upper_limit = upper
+        self.wheel_face.set_limits(lower, upper)
+        self.update()
 
 
 class LotteryApp(QMainWindow):
@@ -0,0 +1,76 @@
+import sys
+from array import array
+
+
+class ParticipantRegistry:
+    """全域參加者登錄表：為每位參加者配發穩定的整數 ID。
+
+    參加者以 (姓名, 部門, 同名序號) 識別；同名序號是同一檔案中第幾個
+    相同 (姓名, 部門) 的人，因此同一份名單裡的同名者會得到不同 ID，
+    而不同獎項檔案中的同一人則共用同一個 ID。姓名與部門字串皆經過
+    intern，各獎項名單只保存 ID 陣列，記憶體隨不重複人數成長。
+    """
+
+    def __init__(self):
+        self.names = []        # ID -> 姓名
+        self.departments = []  # ID -> 部門
+        self.occurrences = array('i')  # ID -> 同名序號 (從 0 開始)
+        self.ids = {}          # (姓名, 部門, 同名序號) -> ID
+        self.photos = {}       # ID -> 照片路徑（相對於 rewards 資料夾），只記錄有照片的人
+
+    def __len__(self):
+        return len(self.names)
+
+    def register(self, name, department="", occurrence=0):
+        """Return the ID for the participant, creating it if needed."""
+        key = (name, department, occurrence)
+        pid = self.ids.get(key)
+        if pid is None:
+            pid = len(self.names)
+            self.names.append(sys.intern(name))
+            self.departments.append(sys.intern(department))
+            self.occurrences.append(occurrence)
+            self.ids[key] = pid
+        return pid
+
+    def register_roster(self, names, departments=None, photos=None):
+        """登錄一份名單，回傳依名單順序排列的 ID 陣列；photos 為每人的照片路徑（無照片為空字串）。"""
+        if departments is None:
+            departments = [""] * len(names)
+        seen = {}
+        roster = array('i')
+        for name, department in zip(names, departments):
+            occurrence = seen.get((name, department), 0)
+            seen[(name, department)] = occurrence + 1
+            roster.append(self.register(name, department, occurrence))
+        if photos is not None:
+            for pid, photo in zip(roster, photos):
+                if photo:
+                    self.photos[pid] = photo
+        return roster
+
+    def lookup(self, name, department="", occurrence=0):
+        return self.ids.get((name, department, occurrence))
+
+    def name(self, pid):
+        return self.names[pid]
+
+    def names_of(self, pids):
+        names = self.names
+        return [names[pid] for pid in pids]
+
+    def photos_of(self, pids):
+        """依順序回傳照片路徑（無照片為 None）；沒有任何人登錄照片時回傳 None。"""
+        if not self.photos:
+            return None
+        photos = self.photos
+        return [photos.get(pid) for pid in pids]
+
+    def display_name(self, pid):
+        """同名者附上部門或序號，方便在狀態列與紀錄中區分。"""
+        name = self.names[pid]
+        department = self.departments[pid]
+        occurrence = self.occurrences[pid]
+        if occurrence:
+            return f"{name}({department}#{occurrence + 1})" if department else f"{name}(#{occurrence + 1})"
+        return name
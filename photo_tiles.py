@@ -0,0 +1,225 @@
+import hashlib
+import os
+import threading
+
+from PySide2.QtCore import QObject, QRunnable, QThreadPool, QTimer, Qt, Signal
+from PySide2.QtGui import QColor, QImage, QImageReader
+
+from grid_render import CELL_PHOTO_PADDING, CELL_PHOTO_PLACEHOLDER, grid_cell_size
+
+THUMBNAIL_FOLDER = "thumbnails"
+THUMBNAIL_STEP = 8        # 縮圖邊長取 8px 的倍數，視窗微調大小時沿用同一張縮圖
+PRIORITY_HIDDEN = 0       # 不在畫面上的網格（例如快取中的其他獎項）最後處理
+RESIZE_DELAY_MS = 200     # 版面調整時常連續觸發多次 resize，停止變動後才以最後的大小重新排入
+
+
+def thumbnail_side(cell_width, photo_height):
+    """格子中照片的最大邊長；photo_height 為格子扣除姓名後的高度。"""
+    side = min(cell_width, photo_height) - CELL_PHOTO_PADDING * 2
+    return max(int(side) // THUMBNAIL_STEP * THUMBNAIL_STEP, THUMBNAIL_STEP)
+
+
+class ThumbnailCache:
+    """磁碟上的縮圖快取，以原圖內容的雜湊與縮圖邊長命名。
+
+    原圖改名或搬移仍可沿用縮圖，內容改變則產生新的縮圖；
+    跨次啟動保留，第二次開啟同一份名單時不需重新解碼。
+    """
+
+    def __init__(self, folder=THUMBNAIL_FOLDER):
+        self.folder = os.path.abspath(folder)
+        os.makedirs(self.folder, exist_ok=True)
+        self.hashes = {}  # (路徑, 修改時間, 大小) -> 內容雜湊，避免同一張照片重複讀取
+
+    def file_hash(self, path):
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        digest = self.hashes.get(key)
+        if digest is None:
+            with open(path, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            self.hashes[key] = digest
+        return digest
+
+    def thumbnail(self, path, side):
+        """回傳縮圖檔的路徑，快取中沒有時解碼並縮小（在工作執行緒呼叫）。"""
+        target = os.path.join(self.folder, f"{self.file_hash(path)}_{side}.png")
+        if os.path.exists(target):
+            return target
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)  # 依 EXIF 方向旋轉手機拍攝的照片
+        size = reader.size()
+        if size.isValid():
+            # 由解碼器直接縮小（JPEG 可只解碼需要的解析度），不需先產生原尺寸影像
+            reader.setScaledSize(size.scaled(side, side, Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            raise OSError(reader.errorString())
+        if image.width() > side or image.height() > side:
+            image = image.scaled(side, side, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        temp = f"{target}.{threading.get_ident()}.tmp"
+        if not image.save(temp, "PNG"):
+            raise OSError(f"無法寫入 {temp}")
+        os.replace(temp, target)  # 其他執行緒或下次啟動不會讀到寫了一半的檔案
+        return target
+
+    def placeholder(self, side):
+        """縮圖完成前顯示的灰色方塊（QLabel 以檔案路徑引用圖片）。"""
+        target = os.path.join(self.folder, f"placeholder_{side}.png")
+        if not os.path.exists(target):
+            image = QImage(side, side, QImage.Format_RGB32)
+            image.fill(QColor(CELL_PHOTO_PLACEHOLDER))
+            image.save(target, "PNG")
+        return target
+
+
+class ThumbnailTask(QRunnable):
+    def __init__(self, loader, path, side):
+        super().__init__()
+        self.setAutoDelete(False)  # 由 PhotoLoader 保留參照，才能以 tryTake 調整優先順序
+        self.loader = loader
+        self.path = path
+        self.side = side
+
+    def run(self):
+        try:
+            thumbnail = self.loader.cache.thumbnail(self.path, self.side)
+        except Exception as e:
+            print(f"無法載入照片 {self.path}: {e}")
+            thumbnail = ""
+        # 跨執行緒的訊號以佇列方式送回 GUI 執行緒
+        self.loader.task_finished.emit(self.path, self.side, thumbnail)
+
+
+class PhotoLoader(QObject):
+    """以 QThreadPool 在背景解碼、縮小照片，完成後發出 thumbnail_ready。
+
+    同一張照片與邊長只排入一次；優先順序為遞增的批次編號，
+    最近顯示的網格先處理，已排入但尚未開始的工作會以 tryTake 取回後提高優先順序。
+    """
+
+    thumbnail_ready = Signal(str, int, str)  # 原圖路徑、邊長、縮圖路徑（失敗時為空字串）
+    task_finished = Signal(str, int, str)
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache or ThumbnailCache()
+        self.pool = QThreadPool(self)
+        self.ready = {}    # (路徑, 邊長) -> 縮圖路徑
+        self.pending = {}  # (路徑, 邊長) -> [工作, 優先順序]
+        self.generation = PRIORITY_HIDDEN
+        self.task_finished.connect(self._on_task_finished)
+
+    def next_priority(self):
+        """新一批可見格子的優先順序，比之前排入的工作都高。"""
+        self.generation += 1
+        return self.generation
+
+    def request(self, path, side, priority):
+        """回傳已完成的縮圖路徑；尚未完成時排入背景工作並回傳 None。"""
+        key = (path, side)
+        thumbnail = self.ready.get(key)
+        if thumbnail is not None:
+            return thumbnail
+        entry = self.pending.get(key)
+        if entry is None:
+            task = ThumbnailTask(self, path, side)
+            self.pending[key] = [task, priority]
+            self.pool.start(task, priority)
+        elif priority > entry[1] and self.pool.tryTake(entry[0]):
+            entry[1] = priority
+            self.pool.start(entry[0], priority)
+        return None
+
+    def placeholder(self, side):
+        return self.cache.placeholder(side)
+
+    def _on_task_finished(self, path, side, thumbnail):
+        self.pending.pop((path, side), None)
+        self.ready[(path, side)] = thumbnail  # 失敗也記錄，不重複嘗試
+        self.thumbnail_ready.emit(path, side, thumbnail)
+
+
+_photo_loader = None
+
+
+def photo_loader():
+    """全程式共用的 PhotoLoader，第一次使用照片時才建立執行緒池與快取資料夾。"""
+    global _photo_loader
+    if _photo_loader is None:
+        _photo_loader = PhotoLoader()
+    return _photo_loader
+
+
+class PhotoCellsMixin:
+    """員工網格的照片：populate 之後呼叫 set_photos，子類別實作 show_cell_photo 與 photo_text_height。
+
+    縮圖完成前格子顯示預留方塊；網格顯示在畫面上時才以高優先順序排入，
+    QStackedWidget 中隱藏的網格排在最後，切換顯示時再提高。
+    """
+
+    photos = ()
+    photo_cells = {}
+    photo_side = 0
+    photo_connected = False
+    photo_resize_timer = None
+
+    def set_photos(self, photos):
+        """photos 為每格照片的完整路徑（無照片為 None），None 表示名單沒有照片欄。"""
+        self.photos = list(photos) if photos and any(photos) else ()
+        self.photo_cells = {}  # 照片路徑 -> 使用該照片的格子位置
+        for index, path in enumerate(self.photos):
+            if path:
+                self.photo_cells.setdefault(path, []).append(index)
+        if not self.photos:
+            return
+        loader = photo_loader()
+        if not self.photo_connected:
+            loader.thumbnail_ready.connect(self.on_thumbnail_ready)
+            self.photo_connected = True
+        self.photo_side = self.cell_photo_side()
+        self.request_photos(loader, show_cached=True, placeholders=True)
+
+    def cell_photo_side(self):
+        # 照片填滿姓名以外的空間，格子的內容不會比分配到的大小更大，版面不會因照片而被撐大
+        _, cell_width, cell_height = grid_cell_size(len(self.photos), self.width(), self.height())
+        return thumbnail_side(cell_width, cell_height - self.photo_text_height(cell_width, cell_height))
+
+    def request_photos(self, loader, show_cached=False, placeholders=False):
+        """依格子順序（由左上開始）排入尚未完成的縮圖，已快取者可立即顯示。"""
+        priority = loader.next_priority() if self.isVisible() else PRIORITY_HIDDEN
+        side = self.photo_side
+        for index, path in enumerate(self.photos):
+            if not path:
+                continue
+            thumbnail = loader.request(path, side, priority)
+            if (show_cached and thumbnail is not None) or placeholders:
+                self.show_cell_photo(index, thumbnail, side)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.photos:
+            if self.photo_resize_timer is None:
+                self.photo_resize_timer = QTimer(self)
+                self.photo_resize_timer.setSingleShot(True)
+                self.photo_resize_timer.setInterval(RESIZE_DELAY_MS)
+                self.photo_resize_timer.timeout.connect(self.resize_photos)
+            self.photo_resize_timer.start()
+
+    def resize_photos(self):
+        """格子大小改變到需要不同邊長的縮圖時重新排入，完成前沿用原本的縮圖。"""
+        side = self.cell_photo_side()
+        if self.photos and side != self.photo_side:
+            self.photo_side = side
+            self.request_photos(photo_loader(), show_cached=True)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.photos:
+            self.request_photos(photo_loader())  # 尚未完成的縮圖提高優先順序
+
+    def on_thumbnail_ready(self, path, side, thumbnail):
+        if side != self.photo_side:
+            return
+        for index in self.photo_cells.get(path, ()):
+            self.show_cell_photo(index, thumbnail, side)
@@ -0,0 +1,332 @@
+import csv
+import glob
+import os
+import sys
+import time
+from collections import Counter
+from itertools import chain
+
+from reward_files import (
+    HEADER_KEYS, RewardFileError, invalid_rainbow_chars, parse_rainbow_format, parse_reward_lines,
+    parse_roster_line, split_reward_file_name
+)
+
+REWARDS_FOLDER = "rewards"
+RESULT_FILE_PATTERN = "得獎名單_*.csv"
+
+ERROR = "錯誤"
+WARNING = "警告"
+
+MAX_EXAMPLES = 5  # 同一類問題在訊息中最多列出的例子
+
+
+class ValidationReport:
+    """活動規劃檢查結果：issues 為 (等級, 檔案, 訊息)。"""
+
+    def __init__(self):
+        self.issues = []
+        self.file_count = 0
+        self.participant_count = 0
+        self.result_rows = 0
+        self.elapsed_ms = 0.0
+
+    def add(self, level, source, message):
+        self.issues.append((level, source, message))
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue[0] == ERROR]
+
+    def format(self):
+        lines = [f"檢查 {self.file_count} 個獎項檔案、{self.participant_count} 位參加者、"
+                 f"{self.result_rows} 筆中獎紀錄，耗時 {self.elapsed_ms:.0f} ms",
+                 f"錯誤 {len(self.errors)} 項、警告 {len(self.issues) - len(self.errors)} 項", ""]
+        # 錯誤排在警告之前，同等級依檔案排列
+        for level, source, message in sorted(self.issues, key=lambda issue: (issue[0] != ERROR, issue[1])):
+            lines.append(f"[{level}] {source}: {message}")
+        if not self.issues:
+            lines.append("沒有發現問題。")
+        return "\n".join(lines)
+
+
+def _examples(items):
+    items = list(items)
+    text = ", ".join(str(item) for item in items[:MAX_EXAMPLES])
+    return text + (f" 等 {len(items)} 項" if len(items) > MAX_EXAMPLES else "")
+
+
+def _check_reward(report, file, reward, lines):
+    """單一獎項檔案內的檢查。"""
+    employees = reward['employees']
+    pick_num = reward['pickNum']
+    roster_start = len(lines) - len(employees)  # 名單開始的行號（從 0 起算）
+
+    for line_no, key in enumerate(HEADER_KEYS):
+        actual = lines[line_no].split(",", 1)[0].strip()
+        if actual != key:
+            report.add(WARNING, file, f"第 {line_no + 1} 行應為 {key}，實際為 {actual or '(空白)'}")
+    if not reward['rewardID']:
+        report.add(WARNING, file, "RewardID 空白，匯入中獎名單與跨獎項排除都無法對應此獎項")
+    if not employees:
+        report.add(ERROR, file, "名單沒有任何人")
+    if pick_num <= 0:
+        report.add(ERROR, file, f"PickNum ({pick_num}) 須大於 0")
+    elif pick_num > len(employees):
+        report.add(ERROR, file, f"PickNum ({pick_num}) 超過名單人數 ({len(employees)})")
+    elif reward['weights'] is not None:
+        positive = sum(1 for weight in reward['weights'] if weight > 0)
+        if pick_num > positive:
+            report.add(ERROR, file, f"權重大於 0 的人數 ({positive}) 少於 PickNum ({pick_num})")
+
+    max_per_dept = reward['maxPerDept']
+    if max_per_dept < 0:
+        report.add(ERROR, file, f"MaxPerDept ({max_per_dept}) 不可為負數")
+    elif max_per_dept > 0 and employees:
+        sizes = {}
+        for department in reward['departments']:
+            sizes[department] = sizes.get(department, 0) + 1
+        capacity = sum(size if not department else min(size, max_per_dept)
+                       for department, size in sizes.items())
+        if capacity < pick_num:
+            report.add(ERROR, file, f"每部門最多 {max_per_dept} 人時最多只能抽出 {capacity} 人，少於 PickNum ({pick_num})")
+
+    rainbow_format = reward['RainbowFormat']
+    if rainbow_format:
+        invalid = invalid_rainbow_chars(rainbow_format)
+        if invalid:
+            report.add(WARNING, file, f"RainbowFormat 含無法辨識的字元 {''.join(invalid)}（只接受 1-9 與 A-Z），這些字元會被略過")
+        total = sum(parse_rainbow_format(rainbow_format))
+        if total < pick_num:
+            report.add(WARNING, file, f"RainbowFormat 合計 {total} 人，少於 PickNum ({pick_num})，其餘中獎者改為每兩人換一色")
+
+    blank = [roster_start + pos + 1 for pos, name in enumerate(employees) if not name.strip()]
+    if blank:
+        report.add(WARNING, file, f"姓名空白的行: {_examples(blank)}")
+
+    # 名單以逗號分欄，姓名本身含逗號時解析結果可能不如預期
+    whole_line = []
+    split_name = []
+    for line_no in range(roster_start, len(lines)):
+        line = lines[line_no]
+        if "," not in line:
+            continue
+        if parse_roster_line(line)[0] == line:
+            whole_line.append(line_no + 1)
+        elif line.count(",") == 1 and line.split(",", 1)[1][:1].isspace():
+            split_name.append(line_no + 1)
+    if whole_line:
+        report.add(WARNING, file, f"第三欄不是數字，整行視為含逗號的姓名的行: {_examples(whole_line)}")
+    if split_name:
+        report.add(WARNING, file, f"逗號後以空白開頭、可能是含逗號的姓名，目前解析為「姓名,部門」的行: {_examples(split_name)}")
+
+
+def _read_results(report, result_files, rewards, by_reward_id):
+    """讀取既有的得獎名單，回傳 {獎項 index: [參加者]}，參加者為 (姓名, 部門, 同名序號)。"""
+    winners = {}
+    name_index = {}  # 獎項 index -> {姓名: [參加者]}，只在 CSV 沒有部門欄位時建立
+    for result_file in result_files:
+        source = os.path.basename(result_file)
+        unknown_ids = {}
+        missing = []
+        duplicates = []
+        try:
+            with open(result_file, "r", encoding="utf-8-sig", newline="") as file:
+                reader = csv.reader(file)
+                next(reader, None)
+                rows = list(reader)
+        except OSError as e:
+            report.add(ERROR, source, f"無法讀取: {e}")
+            continue
+        for row in rows:
+            if len(row) < 3:
+                continue
+            report.result_rows += 1
+            name, _, reward_id = row[:3]
+            indices = by_reward_id.get(reward_id)
+            if not indices:
+                unknown_ids[reward_id] = unknown_ids.get(reward_id, 0) + 1
+                continue
+            index = indices[0]
+            reward = rewards[index]
+            if len(row) > 3:
+                occurrence = int(row[4]) - 1 if len(row) > 4 and row[4].isdigit() else 0
+                person = (name, row[3], occurrence)
+                if person not in reward['people']:
+                    person = None
+            else:
+                names = name_index.get(index)
+                if names is None:
+                    names = name_index[index] = {}
+                    for candidate in reward['people']:
+                        names.setdefault(candidate[0], []).append(candidate)
+                person = names.get(name, [None])[0]
+            if person is None:
+                missing.append(f"{name}({reward_id})")
+                continue
+            reward_winners = winners.setdefault(index, [])
+            if person in reward_winners:
+                duplicates.append(f"{name}({reward_id})")
+                continue
+            reward_winners.append(person)
+        for reward_id, count in unknown_ids.items():
+            report.add(WARNING, source, f"找不到 RewardID {reward_id or '(空白)'} 的獎項檔案，{count} 筆中獎紀錄無法對應")
+        if missing:
+            report.add(WARNING, source, f"中獎者不在該獎項名單中: {_examples(missing)}")
+        if duplicates:
+            report.add(WARNING, source, f"重複的中獎紀錄: {_examples(duplicates)}")
+    return winners
+
+
+def validate_event(rewards_folder=REWARDS_FOLDER, result_files=()):
+    """一次讀取獎項資料夾與得獎名單，回傳 ValidationReport。
+
+    每個檔案只讀取一次；參加者 -> 所在獎項的索引在讀檔時同時建立，
+    跨獎項排除與中獎紀錄的檢查都只查詢這個索引。
+    """
+    start = time.perf_counter()
+    report = ValidationReport()
+    rewards = {}       # 獎項 index -> 解析結果（另加 file 與 people）
+    by_reward_id = {}  # RewardID -> [獎項 index]
+    people = {}        # (姓名, 部門, 同名序號) -> [獎項 index]
+
+    try:
+        files = sorted(file for file in os.listdir(rewards_folder) if file.endswith(".txt"))
+    except OSError as e:
+        report.add(ERROR, rewards_folder, f"無法讀取資料夾: {e}")
+        return report
+
+    for file in files:
+        report.file_count += 1
+        parts = split_reward_file_name(file)
+        if parts is None:
+            report.add(ERROR, file, "檔名須為 Index_ShowName.txt，此檔案不會被載入")
+            continue
+        index = parts[0]
+        if index in rewards:
+            report.add(ERROR, file, f"Index {index} 與 {rewards[index]['file']} 重複，只會載入其中一個")
+            continue
+        try:
+            with open(os.path.join(rewards_folder, file), "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            reward = parse_reward_lines(lines)
+        except (OSError, UnicodeDecodeError) as e:
+            report.add(ERROR, file, f"無法讀取: {e}")
+            continue
+        except RewardFileError as e:
+            report.add(ERROR, file, str(e) or "前四行基本資料不完整")
+            continue
+        _check_reward(report, file, reward, lines)
+        if reward['photos'] is not None:
+            roster_start = len(lines) - len(reward['photos'])
+            missing = [roster_start + pos + 1 for pos, photo in enumerate(reward['photos'])
+                       if photo and not os.path.isfile(os.path.join(rewards_folder, photo))]
+            if missing:
+                report.add(WARNING, file, f"照片檔案不存在的行: {_examples(missing)}（這些人只顯示姓名）")
+
+        pairs = list(zip(reward['employees'], reward['departments']))
+        duplicates = []
+        if len(set(pairs)) == len(pairs):
+            # 沒有同名同部門者時同名序號皆為 0（大多數檔案）
+            reward_people = [(name, department, 0) for name, department in pairs]
+        else:
+            seen = {}
+            reward_people = []
+            for name, department in pairs:
+                occurrence = seen.get((name, department), 0)
+                seen[(name, department)] = occurrence + 1
+                if occurrence == 1:
+                    duplicates.append(name)
+                reward_people.append((name, department, occurrence))
+        for person in reward_people:
+            indices = people.get(person)
+            if indices is None:
+                people[person] = [index]
+            else:
+                indices.append(index)
+        if duplicates:
+            report.add(WARNING, file, f"名單中有同名同部門的人（會視為不同人）: {_examples(duplicates)}")
+        reward['file'] = file
+        reward['people'] = set(reward_people)
+        rewards[index] = reward
+        by_reward_id.setdefault(reward['rewardID'], []).append(index)
+
+    report.participant_count = len(people)
+    for reward_id, indices in by_reward_id.items():
+        if reward_id and len(indices) > 1:
+            for index in indices:
+                others = ", ".join(rewards[other]['file'] for other in indices if other != index)
+                report.add(ERROR, rewards[index]['file'], f"RewardID {reward_id} 與 {others} 重複")
+
+    # 每個有排除規則的獎項排除哪些獎項的中獎者
+    excluded_by = {}
+    for index, reward in rewards.items():
+        rules = reward['excludeWinnersOf']
+        if not rules:
+            continue
+        unknown = [rule for rule in rules if rule != "*" and rule not in by_reward_id]
+        if unknown:
+            report.add(WARNING, reward['file'], f"ExcludeWinnersOf 指定了不存在的 RewardID: {_examples(unknown)}")
+        excluded_by[index] = {other for other, other_reward in rewards.items()
+                              if other != index and ("*" in rules or other_reward['rewardID'] in rules)}
+
+    # 互相排除的獎項：以參加者索引找出名單重疊的人，估計最差情況下剩餘的人數
+    for index, excluded in excluded_by.items():
+        reward = rewards[index]
+        if reward['pickNum'] > len(reward['employees']):
+            continue
+        # 各獎項與本名單重疊的人數，以及至少出現在一個被排除獎項中的人數
+        overlaps = Counter(chain.from_iterable(people[person] for person in reward['people']))
+        exposed = sum(1 for person in reward['people'] if not excluded.isdisjoint(people[person]))
+        # 每個被排除的獎項最多抽走 PickNum 人，且同一人只會失去資格一次
+        loss = min(exposed, sum(min(count, max(rewards[other]['pickNum'], 0))
+                                for other, count in overlaps.items() if other in excluded))
+        remaining = len(reward['employees']) - loss
+        if remaining < reward['pickNum']:
+            report.add(WARNING, reward['file'],
+                       f"名單中有 {exposed} 人也在被排除的獎項名單中，若這些人先在那些獎項中獎，"
+                       f"最差情況只剩 {remaining} 人，少於 PickNum ({reward['pickNum']})")
+
+    # 既有的中獎紀錄
+    winners = _read_results(report, result_files, rewards, by_reward_id)
+    won = {}  # 參加者 -> 已中獎的獎項 index
+    for index, reward_winners in winners.items():
+        for person in reward_winners:
+            won.setdefault(person, []).append(index)
+    lost = {}  # 獎項 index -> 已中獎或因排除而失去資格的人數
+    for person, won_indices in won.items():
+        for index in won_indices:
+            excluded = excluded_by.get(index, ())
+            conflicts = [rewards[other]['rewardID'] for other in won_indices if other in excluded]
+            if conflicts:
+                report.add(ERROR, rewards[index]['file'],
+                           f"{person[0]} 已在 {_examples(conflicts)} 中獎，依 ExcludeWinnersOf 不應再中此獎項")
+        # 只需更新中獎者所在的獎項
+        for index in people[person]:
+            excluded = excluded_by.get(index, ())
+            if index in won_indices or any(other in excluded for other in won_indices):
+                lost[index] = lost.get(index, 0) + 1
+    for index, lost_count in lost.items():
+        reward = rewards[index]
+        won_count = len(winners.get(index, ()))
+        remaining_picks = reward['pickNum'] - won_count
+        if remaining_picks < 0:
+            report.add(WARNING, reward['file'], f"已中獎 {won_count} 人，超過 PickNum ({reward['pickNum']})")
+            continue
+        if reward['pickNum'] > len(reward['employees']):
+            continue
+        eligible = len(reward['employees']) - lost_count
+        if eligible < remaining_picks:
+            report.add(WARNING, reward['file'], f"尚需抽出 {remaining_picks} 人，但目前只有 {eligible} 人符合資格")
+
+    report.elapsed_ms = (time.perf_counter() - start) * 1000.0
+    return report
+
+
+if __name__ == "__main__":
+    # 檢查活動規劃：python plan_validator.py [rewards 資料夾] [得獎名單.csv ...]
+    # 未指定得獎名單時檢查目前資料夾下所有的 得獎名單_*.csv
+    folder = sys.argv[1] if len(sys.argv) > 1 else REWARDS_FOLDER
+    results = sys.argv[2:] or sorted(glob.glob(RESULT_FILE_PATTERN))
+    validation = validate_event(folder, results)
+    print(validation.format())
+    sys.exit(1 if validation.errors else 0)
@@ -0,0 +1,86 @@
+from grid_render import CELL_STYLE_HIGHLIGHT, CELL_STYLE_HIGHLIGHT_SIMPLE
+
+# 畫面效果等級：由高到低逐級降低效果，歷遍的時程、總時間與中獎結果都不變
+QUALITY_FULL = 0
+QUALITY_REDUCED = 1
+QUALITY_MINIMAL = 2
+QUALITY_NAMES = {QUALITY_FULL: "完整", QUALITY_REDUCED: "精簡", QUALITY_MINIMAL: "最低"}
+
+# wheel_interval_ms：轉盤重繪的最短間隔；repaint_interval_ms：歷遍中網格換幀的最短間隔
+# （期間到期的幀合併為最新一幀）；tick_sound：逐幀滾動音效；highlight_style：歷遍高亮的樣式
+QUALITY_SETTINGS = {
+    QUALITY_FULL: {'wheel_interval_ms': 0, 'repaint_interval_ms': 0, 'tick_sound': True,
+                   'highlight_style': CELL_STYLE_HIGHLIGHT},
+    QUALITY_REDUCED: {'wheel_interval_ms': 33, 'repaint_interval_ms': 33, 'tick_sound': False,
+                      'highlight_style': CELL_STYLE_HIGHLIGHT},
+    QUALITY_MINIMAL: {'wheel_interval_ms': 66, 'repaint_interval_ms': 66, 'tick_sound': False,
+                      'highlight_style': CELL_STYLE_HIGHLIGHT_SIMPLE},
+}
+
+FRAME_BUDGET_MS = 25          # 影格時鐘每 16 ms 推進一次，相鄰兩次超過此間隔視為掉幀
+OVER_BUDGET_RATIO = 0.25      # 量測區間內掉幀的比例達此值即降低一級
+MIN_SAMPLES = 10              # 量測的影格太少（例如轉盤很短）時不調整
+TRAVERSAL_SAMPLE_FRAMES = 30  # 歷遍開始後量測的影格數（約半秒）
+
+
+class QualityController:
+    """依轉盤轉動與歷遍開頭的影格間隔自動降低畫面效果。
+
+    量測期間影格時鐘每次推進都呼叫 record()，間隔包含上一幀的樣式、版面
+    與重繪耗時。量測區間結束時以 evaluate() 判斷，掉幀比例過高就降低一級。
+    只會降低不會自動恢復（降低後的量測無法反映完整效果的成本），
+    可在 Dev 選單重設為自動或固定等級。不依賴 Qt。
+    """
+
+    def __init__(self, level=QUALITY_FULL, adaptive=True):
+        self.level = level
+        self.adaptive = adaptive
+        self.measuring = False
+        self.limit = None
+        self.samples = []
+        self.last_tick = None
+        self.last_result = None  # 最近一次評估的 (影格數, 掉幀比例, 最長間隔 ms)
+
+    def settings(self):
+        return QUALITY_SETTINGS[self.level]
+
+    def name(self):
+        return QUALITY_NAMES[self.level]
+
+    def set_level(self, level, adaptive):
+        self.level = level
+        self.adaptive = adaptive
+
+    def begin(self, limit=None):
+        """開始新的量測區間；limit 為量測的影格數，None 表示直到 evaluate() 為止。"""
+        self.measuring = True
+        self.limit = limit
+        self.samples = []
+        self.last_tick = None
+
+    def stop(self):
+        self.measuring = False
+        self.samples = []
+        self.last_tick = None
+
+    def record(self, now):
+        """記錄影格時鐘的時間 (ms)，量測的影格數已達 limit 時回傳 True。"""
+        if not self.measuring:
+            return False
+        if self.last_tick is not None:
+            self.samples.append(now - self.last_tick)
+        self.last_tick = now
+        return self.limit is not None and len(self.samples) >= self.limit
+
+    def evaluate(self):
+        """結束目前的量測區間，超出預算時降低一級，回傳等級是否改變。"""
+        samples = self.samples
+        self.stop()
+        if not self.adaptive or len(samples) < MIN_SAMPLES:
+            return False
+        ratio = sum(1 for interval in samples if interval > FRAME_BUDGET_MS) / len(samples)
+        self.last_result = (len(samples), ratio, max(samples))
+        if ratio >= OVER_BUDGET_RATIO and self.level < QUALITY_MINIMAL:
+            self.level += 1
+            return True
+        return False
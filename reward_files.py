@@ -0,0 +1,153 @@
+import math
+import os
+
+# 獎項清單檔案前四行的必要欄位
+HEADER_KEYS = ["FullName", "PickNum", "RainbowFormat", "RewardID"]
+# 第四行之後可選的資格規則欄位
+RULE_KEYS = ["MaxPerDept", "ExcludeWinnersOf"]
+
+FORMAT_HELP = (
+    "`獎項.txt`檔名格式須符合 Index_ShowName.txt，"
+    + "檔案內容前四行格式如下：\n"
+    + "FullName,全名\nPickNum,數字\nRainbowFormat,參數\nRewardID,參數\n"
+    + "可選的資格規則行：\nMaxPerDept,每部門中獎上限\nExcludeWinnersOf,獎項ID;獎項ID (或 * 代表所有其他獎項)\n"
+    + "其餘行為員工名單，每行格式為 姓名、姓名,部門、姓名,部門,權重 或 姓名,部門,權重,照片"
+    + "（照片為相對於 rewards 資料夾的路徑，權重可留空；第三欄不是數字時整行視為含逗號的姓名）。"
+)
+
+
+class RewardFileError(Exception):
+    """獎項清單檔案格式錯誤，訊息為附加在檔名後的說明。"""
+
+
+def split_reward_file_name(file):
+    """Return (index, show_name) from 'Index_ShowName.txt', or None."""
+    components = os.path.splitext(file)[0].split('_')
+    if len(components) != 2:  # 檢查檔名是否符合格式
+        return None
+    return components[0], components[1]
+
+
+def header_value(line, default):
+    return line.split(",", 1)[1].strip() if ',' in line else default
+
+
+def parse_rainbow_format(rainbow_format):
+    """Parse RainbowFormat string ('1'-'9', 'A'-'Z') into per-color counts."""
+    counts = []
+    for c in rainbow_format:
+        if '1' <= c <= '9':
+            counts.append(int(c))
+        elif 'A' <= c <= 'Z':
+            counts.append(ord(c) - ord('A') + 10)
+    return counts
+
+
+def invalid_rainbow_chars(rainbow_format):
+    """RainbowFormat 中 parse_rainbow_format 會略過的字元。"""
+    return sorted({c for c in rainbow_format if not ('1' <= c <= '9' or 'A' <= c <= 'Z')})
+
+
+def is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_roster_line(line):
+    """Parse one roster line 'name[,department[,weight[,photo]]]'; weight is None and photo "" when omitted.
+
+    第三欄不是數字也不是空白時，逗號視為姓名的一部分，整行作為姓名（例如「Lee, Ann, Jr.」）。
+    """
+    fields = line.split(",")
+    if len(fields) > 2 and fields[2].strip() and not is_number(fields[2]):
+        return line, "", None, ""
+    name = fields[0]
+    department = fields[1].strip() if len(fields) > 1 else ""
+    weight = None
+    if len(fields) > 2 and fields[2].strip():
+        try:
+            weight = float(fields[2])
+        except ValueError:
+            raise RewardFileError(f"權重非有效數字: {line}")
+        if not math.isfinite(weight) or weight < 0:
+            raise RewardFileError(f"權重須為非負數: {line}")
+    photo = fields[3].strip() if len(fields) > 3 else ""
+    return name, department, weight, photo
+
+
+def parse_reward_file(file_path):
+    """Parse a reward list file into a reward_info dict (without index/show name)."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except Exception as e:
+        raise RewardFileError(f"無法讀取: {str(e)}")
+    return parse_reward_lines(lines)
+
+
+def parse_reward_lines(lines):
+    """解析已讀入的獎項清單檔案內容（供只讀取一次檔案的檢查工具使用）。"""
+    if len(lines) < 4:  # 檢查檔案內是否至少包含4行（基本資料+員工名單）
+        raise RewardFileError("")
+
+    # 解析獎項基本資料
+    full_name = header_value(lines[0], "")
+    pick_num_str = header_value(lines[1], "0")
+    rainbow_format = header_value(lines[2], "")
+    reward_id = header_value(lines[3], "")
+
+    # 檢查 PickNum 是否為有效整數
+    try:
+        pick_num = int(pick_num_str)
+    except ValueError:
+        raise RewardFileError("PickNum 非有效整數")
+
+    # 解析可選的資格規則
+    max_per_dept = 0
+    exclude_winners_of = []
+    line_no = 4
+    while line_no < len(lines) and lines[line_no].split(",", 1)[0] in RULE_KEYS:
+        key = lines[line_no].split(",", 1)[0]
+        value = header_value(lines[line_no], "")
+        if key == "MaxPerDept":
+            try:
+                max_per_dept = int(value)
+            except ValueError:
+                raise RewardFileError("MaxPerDept 非有效整數")
+        elif key == "ExcludeWinnersOf":
+            exclude_winners_of = [v.strip() for v in value.split(";") if v.strip()]
+        line_no += 1
+
+    # 解析員工名單
+    employees = []
+    departments = []
+    weights = []
+    photos = []
+    has_weights = False
+    for line in lines[line_no:]:
+        name, department, weight, photo = parse_roster_line(line)
+        employees.append(name)
+        departments.append(department)
+        photos.append(photo)
+        if weight is None:
+            weight = 1.0  # 未填權重者預設為一張籤
+        else:
+            has_weights = True
+        weights.append(weight)
+
+    return {
+        'fullrewardName': full_name,
+        'pickNum': pick_num,
+        'RainbowFormat': rainbow_format,
+        'rewardID': reward_id,
+        'maxPerDept': max_per_dept,
+        'excludeWinnersOf': exclude_winners_of,
+        'employees': employees,
+        'departments': departments,
+        'weights': weights if has_weights else None,
+        'photos': photos if any(photos) else None,
+        'winners': []
+    }
@@ -0,0 +1,97 @@
+import random
+
+
+class FenwickSampler:
+    """以 Fenwick tree (樹狀陣列) 維護權重前綴和的加權抽樣器。
+
+    建立為 O(n)，加權抽取一人與移除（權重歸零）皆為 O(log n)，
+    讓上萬人的加權抽獎每一幀只需少量運算。
+    """
+
+    def __init__(self, weights, rng=random):
+        self.rng = rng
+        self.n = len(weights)
+        self.weights = [float(w) for w in weights]
+        self.tree = [0.0] + self.weights
+        for i in range(1, self.n + 1):
+            j = i + (i & -i)
+            if j <= self.n:
+                self.tree[j] += self.tree[i]
+        self.top = 1
+        while self.top * 2 <= self.n:
+            self.top *= 2
+        self.total = sum(self.weights)
+        self.positive = sum(1 for w in self.weights if w > 0)  # 權重為正的位置數
+
+    def __len__(self):
+        return self.n
+
+    def update(self, index, delta):
+        """Add `delta` to the weight at 0-based `index`."""
+        was_positive = self.weights[index] > 0
+        self.weights[index] += delta
+        self.positive += (self.weights[index] > 0) - was_positive
+        self.total += delta
+        i = index + 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def set_weight(self, index, weight):
+        self.update(index, weight - self.weights[index])
+
+    def remove(self, index):
+        """移除（權重歸零），回傳原本的權重以便還原。"""
+        weight = self.weights[index]
+        if weight:
+            self.update(index, -weight)
+        return weight
+
+    def find(self, target):
+        """回傳前綴和第一個超過 target 的位置（0-based）。"""
+        pos = 0
+        step = self.top
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        # 浮點誤差可能落在權重為 0 的位置，往回找最近的有效位置
+        pos = min(pos, self.n - 1)
+        while pos > 0 and self.weights[pos] <= 0:
+            pos -= 1
+        return pos
+
+    def pick(self):
+        """依權重抽出一個位置，不移除。"""
+        if self.positive <= 0:
+            raise ValueError("no positive weight left to pick")
+        return self.find(self.rng.random() * self.total)
+
+    def sample(self, k, exclude=()):
+        """依權重不重複抽出 k 個位置，抽完後還原權重。
+
+        exclude 內的位置暫時移除（例如避免連續兩幀高亮同一人）；
+        若排除後可抽的人數不足 k，則忽略 exclude。
+        """
+        removed = []
+        for index in exclude:
+            weight = self.remove(index)
+            if weight:
+                removed.append((index, weight))
+        if self.positive < k:
+            for index, weight in removed:
+                self.update(index, weight)
+            removed = []
+
+        picked = []
+        for _ in range(k):
+            if self.positive <= 0:
+                break
+            index = self.pick()
+            picked.append(index)
+            removed.append((index, self.remove(index)))
+        for index, weight in removed:
+            self.update(index, weight)
+        return picked
@@ -0,0 +1,47 @@
+import json
+import os
+import tempfile
+
+SNAPSHOT_FILE = "session_snapshot.json"
+SNAPSHOT_VERSION = 1
+
+
+def write_snapshot(path, data):
+    """以「寫入暫存檔再改名」的方式原子寫入快照，當機時不會留下寫一半的檔案。"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".snapshot_", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, separators=(",", ":"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_snapshot(path):
+    """讀取快照，檔案不存在、損毀或版本不符時回傳 None。"""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        return None
+    return data
+
+
+def rng_state_to_json(state):
+    """random.getstate() 的結果轉為可寫入 JSON 的 list。"""
+    version, internal_state, gauss_next = state
+    return [version, list(internal_state), gauss_next]
+
+
+def rng_state_from_json(data):
+    version, internal_state, gauss_next = data
+    return (version, tuple(internal_state), gauss_next)
@@ -0,0 +1,297 @@
+import argparse
+import gc
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+# 必須在匯入 Qt 與 pygame 之前設定：不需要螢幕與音效裝置
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from PySide2.QtCore import QEventLoop, QObject, QTimer
+from PySide2.QtWidgets import QApplication, QMessageBox
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+MODES = ["隨機歷遍", "循序歷遍", "連抽模式", "淘汰模式", "大量揭曉"]
+DRAW_TIMEOUT_MS = 60000
+
+
+def rss_mb():
+    """目前的常駐記憶體 (MB)；非 Linux 平台退回行程的最大常駐記憶體。"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class SoakRun:
+    """連續抽獎並定期取樣記憶體、Python 物件、QObject 數量與每次抽獎的額外延遲。"""
+
+    def __init__(self, window, args):
+        self.window = window
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.samples = []     # 每次取樣的 dict
+        self.latencies = []   # 本次取樣區間內每次抽獎的額外延遲 (ms)
+        self.baseline = None  # 暖機後的取樣，之後的成長與其比較
+        self.baseline_types = None
+        self.baseline_snapshot = None
+        self.draws = 0
+        self.resets = 0
+        self.warnings = Counter()
+        self.started = time.perf_counter()
+
+    def wait_until(self, predicate, timeout_ms):
+        deadline = time.perf_counter() + timeout_ms / 1000
+        loop = QEventLoop()
+        timer = QTimer()
+        timer.timeout.connect(lambda: (predicate() or time.perf_counter() > deadline) and loop.quit())
+        timer.start(5)
+        if not predicate():
+            loop.exec_()
+        timer.stop()
+        return predicate()
+
+    def idle(self):
+        window = self.window
+        return (window.pull_button.isEnabled() and window.recursion == 0
+                and not window.wheel_widget.is_animating and not window.engine.running)
+
+    def choose_draw(self):
+        """隨機選擇獎項與人數；所有獎項都沒有可抽的人時開始新的活動。"""
+        window = self.window
+        for _ in range(2):
+            choices = []
+            for combo_index in range(window.reward_combo.count()):
+                reward_info = window.reward_info[window.reward_ids[combo_index]]
+                remaining = reward_info['pickNum'] - len(reward_info['winners'])
+                candidates = len(window.eligibility.candidate_indices(reward_info['index']))
+                if min(remaining, candidates) > 0:
+                    choices.append((combo_index, min(remaining, candidates)))
+            if choices:
+                combo_index, available = self.rng.choice(choices)
+                return combo_index, self.rng.randint(1, min(available, self.args.max_pick))
+            window.start_new_session()
+            self.resets += 1
+        raise RuntimeError("開始新的活動後仍沒有可抽獎的獎項")
+
+    def configure(self, mode):
+        """切換模式會套用模式預設值，之後再設定成短的歷遍時間。"""
+        window = self.window
+        window.mode_combo.setCurrentText(mode)
+        window.duration_lower_spinner.setValue(1)
+        window.duration_upper_spinner.setValue(1)
+        window.start_interval_spinner.setValue(self.args.start_interval)
+        window.final_interval_spinner.setValue(self.args.final_interval)
+        window.wheel_widget.animation_duration = self.args.wheel_ms
+
+    def run_draw(self):
+        window = self.window
+        # 抽獎前先切換幾次獎項，讓獎項畫面快取與格子物件池持續換頁與淘汰
+        for _ in range(self.args.switches):
+            window.reward_combo.setCurrentIndex(self.rng.randrange(window.reward_combo.count()))
+        combo_index, pick = self.choose_draw()
+        window.reward_combo.setCurrentIndex(combo_index)
+        mode = self.rng.choice(MODES)
+        self.configure(mode)
+        window.pick_spinner.setValue(pick)
+
+        started = time.perf_counter()
+        window.start_lottery()
+        if not self.wait_until(lambda: window.wheel_widget.is_animating or self.idle(), DRAW_TIMEOUT_MS):
+            raise RuntimeError("轉盤沒有開始轉動")
+        if not self.wait_until(self.idle, DRAW_TIMEOUT_MS):
+            raise RuntimeError(f"第 {self.draws + 1} 次抽獎逾時（{mode}）")
+        # 連抽模式每一人各轉一次轉盤，額外延遲為扣除轉盤與歷遍時間後剩下的時間
+        units = pick if mode == "連抽模式" else 1
+        expected_ms = units * (self.args.wheel_ms + 1000)
+        self.latencies.append((time.perf_counter() - started) * 1000 - expected_ms)
+        self.draws += 1
+
+    def sample(self):
+        window = self.window
+        app = QApplication.instance()
+        # 事件迴圈處理延遲刪除的元件後再計數
+        QApplication.sendPostedEvents(None, 0)
+        app.processEvents()
+        gc.collect()
+        # 階段追蹤本來就會累積事件（上限 MAX_TRACE_EVENTS），取樣間清空，其餘的成長才視為洩漏
+        trace_events = len(window.tracer)
+        window.tracer.clear()
+        traced, _ = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        objects = gc.get_objects()
+        sample = {
+            'draws': self.draws,
+            'elapsed_s': time.perf_counter() - self.started,
+            'rss_mb': rss_mb(),
+            'traced_mb': traced / 2 ** 20,
+            'objects': len(objects),
+            'widgets': len(QApplication.allWidgets()),
+            'qobjects': len(window.findChildren(QObject)),
+            'timers': len(window.findChildren(QTimer)),
+            'trace_events': trace_events,
+            'latency_p50': percentile(self.latencies, 0.5),
+            'latency_p95': percentile(self.latencies, 0.95),
+        }
+        self.samples.append(sample)
+        self.latencies = []
+        print(f"[{sample['elapsed_s']:7.0f}s] draws {sample['draws']:5d}  RSS {sample['rss_mb']:7.1f} MB  "
+              f"traced {sample['traced_mb']:6.2f} MB  objects {sample['objects']:7d}  "
+              f"widgets {sample['widgets']:5d}  QObjects {sample['qobjects']:5d}  timers {sample['timers']:3d}  "
+              f"latency p50 {sample['latency_p50']:6.1f} ms  p95 {sample['latency_p95']:6.1f} ms", flush=True)
+        if self.baseline is None and self.draws >= self.args.warmup:
+            self.baseline = sample
+            self.baseline_types = Counter(type(obj).__name__ for obj in objects)
+            if tracemalloc.is_tracing():
+                self.baseline_snapshot = tracemalloc.take_snapshot()
+        del objects
+
+    def run(self):
+        self.sample()
+        while self.draws < self.args.draws:
+            self.run_draw()
+            if self.draws % self.args.sample_every == 0:
+                self.sample()
+        if self.samples[-1]['draws'] != self.draws:
+            self.sample()
+
+    def report(self):
+        """列出暖機後的成長，回傳超出預算的項目。"""
+        args = self.args
+        first, last = self.baseline or self.samples[0], self.samples[-1]
+        print(f"\n{self.draws} 次抽獎、{self.resets} 次開始新的活動，耗時 {last['elapsed_s']:.0f} 秒")
+        failures = []
+        checks = [
+            ('RSS (MB)', 'rss_mb', args.rss_budget_mb),
+            ('tracemalloc (MB)', 'traced_mb', args.traced_budget_mb),
+            ('Python 物件', 'objects', args.object_budget),
+            ('QWidget', 'widgets', args.widget_budget),
+            ('主視窗 QObject', 'qobjects', args.qobject_budget),
+            ('QTimer', 'timers', 0),
+            ('延遲 p95 (ms)', 'latency_p95', args.latency_budget_ms),
+        ]
+        for label, key, budget in checks:
+            growth = last[key] - first[key]
+            status = "OK" if growth <= budget else "超出預算"
+            print(f"  {label:16s} {first[key]:10.1f} -> {last[key]:10.1f}  成長 {growth:+10.1f}  預算 {budget:g}  {status}")
+            if growth > budget:
+                failures.append(label)
+
+        if self.baseline_types is not None:
+            types = Counter(type(obj).__name__ for obj in gc.get_objects())
+            types.subtract(self.baseline_types)
+            print("\n  成長最多的物件類型：")
+            for name, count in types.most_common(10):
+                if count > 0:
+                    print(f"    {name:30s} {count:+d}")
+        if self.baseline_snapshot is not None:
+            print("\n  成長最多的配置位置 (tracemalloc)：")
+            for stat in tracemalloc.take_snapshot().compare_to(self.baseline_snapshot, "lineno")[:10]:
+                print(f"    {stat}")
+        stalls = self.window.watchdog.stalls
+        if stalls:
+            print(f"\n  事件迴圈停頓 {len(stalls)} 次（最長 {max(ms for ms, _ in stalls):.0f} ms，堆疊見 stalls.log）：")
+            for phase, count in Counter(phase for _, phase in stalls).most_common():
+                print(f"    {count:5d} x {phase}")
+        if self.warnings:
+            print("\n  過程中出現的對話框：")
+            for message, count in self.warnings.most_common():
+                print(f"    {count:5d} x {message}")
+        return failures
+
+
+def prepare_workdir(path=None):
+    """在暫存資料夾中複製獎項與資源，抽獎結果、快照與追蹤檔不會寫入實際的活動資料夾。"""
+    workdir = path or tempfile.mkdtemp(prefix="roulette_soak_")
+    for folder in ("rewards", "resources"):
+        target = os.path.join(workdir, folder)
+        if not os.path.exists(target):
+            shutil.copytree(os.path.join(REPO_DIR, folder), target)
+    return workdir
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Rontgen Roulette 長時間壓力測試（offscreen Qt）")
+    parser.add_argument("--draws", type=int, default=2000, help="抽獎次數")
+    parser.add_argument("--warmup", type=int, default=100, help="暖機抽獎次數，之後的成長才計入預算")
+    parser.add_argument("--sample-every", type=int, default=50, help="每幾次抽獎取樣一次")
+    parser.add_argument("--switches", type=int, default=3, help="每次抽獎前隨機切換獎項的次數")
+    parser.add_argument("--max-pick", type=int, default=5, help="每次最多抽出的人數")
+    parser.add_argument("--wheel-ms", type=int, default=100, help="轉盤動畫長度 (ms)")
+    parser.add_argument("--start-interval", type=int, default=16, help="歷遍開始的間隔 (ms)")
+    parser.add_argument("--final-interval", type=int, default=60, help="歷遍結束的間隔 (ms)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workdir", default=None, help="執行用的資料夾（預設為新的暫存資料夾）")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="不啟用 tracemalloc（執行較快）")
+    parser.add_argument("--rss-budget-mb", type=float, default=40.0)
+    parser.add_argument("--traced-budget-mb", type=float, default=8.0)
+    parser.add_argument("--object-budget", type=int, default=20000)
+    parser.add_argument("--widget-budget", type=int, default=40)
+    parser.add_argument("--qobject-budget", type=int, default=40)
+    parser.add_argument("--latency-budget-ms", type=float, default=30.0,
+                        help="暖機後每次抽獎額外延遲 p95 的容許成長")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    workdir = prepare_workdir(args.workdir)
+    print(f"工作資料夾: {workdir}")
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+
+    app = QApplication(sys.argv[:1])
+    import RontgenRoulette
+
+    run = None
+
+    def answer_dialog(kind, answer):
+        def dialog(parent, title, text, *rest, **kwargs):
+            if run is not None:
+                run.warnings[f"{kind}: {text.splitlines()[0]}"] += 1
+            return answer
+        return staticmethod(dialog)
+
+    # 無人值守：確認對話框一律回答「是」，其他對話框只記錄訊息
+    QMessageBox.question = answer_dialog("question", QMessageBox.Yes)
+    QMessageBox.information = answer_dialog("information", QMessageBox.Ok)
+    QMessageBox.warning = answer_dialog("warning", QMessageBox.Ok)
+    QMessageBox.critical = answer_dialog("critical", QMessageBox.Ok)
+
+    RontgenRoulette.set_global_font(app)
+    window = RontgenRoulette.RouletteApp()
+    window.resize(1600, 900)
+    window.show()
+    run = SoakRun(window, args)
+    try:
+        run.run()
+    finally:
+        window.close()
+    failures = run.report()
+    if failures:
+        print(f"\n失敗：{', '.join(failures)} 超出預算")
+        return 1
+    print("\n通過")
+    return 0
+
+
+if __name__ == "__main__":
+    # python soak_test.py [--draws 2000] [--no-tracemalloc] ...；超出預算時結束代碼為 1
+    sys.exit(main())
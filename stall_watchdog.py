@@ -0,0 +1,122 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+
+from PySide2.QtCore import QObject, Signal
+
+from draw_trace import TRACK_WATCHDOG
+
+STALL_LOG_FILE = "stalls.log"
+PING_INTERVAL_MS = 50      # 看門狗執行緒送出 ping 與擷取堆疊的間隔
+STALL_THRESHOLD_MS = 250   # ping 超過此時間沒有回應即視為事件迴圈停頓
+HANG_REPORT_MS = 5000      # 停頓超過此時間先寫出一份報告，程式若就此當住仍留有紀錄
+MAX_STACK_DEPTH = 40
+MAX_REPORTED_STACKS = 3
+
+# 停頓發生時主畫面所在的抽獎階段
+PHASE_IDLE = "idle"
+PHASE_WHEEL = "wheel"
+PHASE_TRAVERSAL = "traversal"
+PHASE_COMMIT = "commit"
+PHASE_REVEAL = "reveal"
+
+
+def format_stack(frame):
+    """將堆疊轉為由外而內的「檔名:行號 函式」串列，作為取樣的統計鍵。"""
+    summary = traceback.extract_stack(frame)[-MAX_STACK_DEPTH:]
+    return tuple(f"{os.path.basename(entry.filename)}:{entry.lineno} {entry.name}" for entry in summary)
+
+
+class StallWatchdog(QObject):
+    """偵測 Qt 事件迴圈停頓並取樣 GUI 執行緒的 Python 堆疊。
+
+    背景執行緒每 PING_INTERVAL_MS 送出一次 ping（跨執行緒的 Signal 會排入
+    GUI 事件迴圈），GUI 執行緒處理到時回應。ping 超過 STALL_THRESHOLD_MS
+    未回應時，以 sys._current_frames() 持續擷取 GUI 執行緒目前的堆疊，
+    恢復後將停頓時間、當時的抽獎階段與最常出現的堆疊寫入 stalls.log、
+    主控台與階段追蹤。GUI 執行緒只需設定 phase 與回應 ping。
+    """
+
+    ping = Signal(int)
+
+    def __init__(self, tracer=None, log_file=STALL_LOG_FILE, threshold_ms=STALL_THRESHOLD_MS, parent=None):
+        super().__init__(parent)
+        self.tracer = tracer
+        self.log_file = log_file
+        self.threshold_ns = int(threshold_ms * 1e6)
+        self.gui_thread_id = threading.get_ident()  # 必須在 GUI 執行緒建立
+        self.phase = PHASE_IDLE
+        self.sent = 0
+        self.sent_ns = 0
+        self.answered = 0
+        self.answered_ns = 0
+        self.stall = None   # 進行中的停頓：{'start_ns', 'phase', 'samples', 'reported'}
+        self.stalls = []    # (停頓 ms, 階段)，供壓力測試統計
+        self.stopped = threading.Event()
+        self.ping.connect(self._pong)
+        self.thread = threading.Thread(target=self._run, name="StallWatchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        self.stopped.set()
+        self.thread.join(timeout)
+
+    def _pong(self, ping_id):
+        self.answered_ns = time.perf_counter_ns()
+        self.answered = ping_id
+
+    def _run(self):
+        while not self.stopped.wait(PING_INTERVAL_MS / 1000.0):
+            now = time.perf_counter_ns()
+            if self.answered == self.sent:
+                if self.stall is not None:
+                    self._report(self.answered_ns)
+                    self.stall = None
+                self.sent += 1
+                self.sent_ns = now
+                self.ping.emit(self.sent)
+            elif now - self.sent_ns >= self.threshold_ns:
+                if self.stall is None:
+                    self.stall = {'start_ns': self.sent_ns, 'phase': self.phase, 'samples': Counter(),
+                                  'reported': False}
+                self._sample()
+                if not self.stall['reported'] and now - self.sent_ns >= HANG_REPORT_MS * 1_000_000:
+                    self._report(now, ongoing=True)
+                    self.stall['reported'] = True
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.gui_thread_id)
+        if frame is not None:
+            self.stall['samples'][format_stack(frame)] += 1
+
+    def _report(self, end_ns, ongoing=False):
+        stall = self.stall
+        duration_ms = (end_ns - stall['start_ns']) / 1e6
+        samples = stall['samples']
+        total = sum(samples.values())
+        state = "仍未回應" if ongoing else "已恢復"
+        lines = [f"[{datetime.now().isoformat(timespec='seconds')}] 事件迴圈停頓 {duration_ms:.0f} ms"
+                 f"（{state}，階段: {stall['phase']}，堆疊取樣 {total} 次）"]
+        for stack, count in samples.most_common(MAX_REPORTED_STACKS):
+            lines.append(f"  {count}/{total} 次取樣:")
+            lines.extend(f"    {entry}" for entry in stack)
+        report = "\n".join(lines)
+        print(report)
+        try:
+            with open(self.log_file, "a", encoding="utf-8") as file:
+                file.write(report + "\n")
+        except OSError as e:
+            print(f"停頓紀錄寫入失敗: {e}")
+        if ongoing:
+            return
+        self.stalls.append((duration_ms, stall['phase']))
+        if self.tracer is not None:
+            top = samples.most_common(1)
+            args = {'phase': stall['phase'], 'samples': total}
+            if top:
+                args['stack'] = list(top[0][0])
+            self.tracer.complete("event loop stall", stall['start_ns'], end_ns, TRACK_WATCHDOG, args)
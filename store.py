@@ -0,0 +1,220 @@
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+STORE_FILE = "roulette.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS participants (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    department TEXT NOT NULL DEFAULT '',
+    occurrence INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (name, department, occurrence)
+);
+CREATE TABLE IF NOT EXISTS rewards (
+    reward_index TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    pick_num INTEGER NOT NULL,
+    rainbow_format TEXT NOT NULL,
+    reward_id TEXT NOT NULL,
+    max_per_dept INTEGER NOT NULL DEFAULT 0,
+    exclude_winners_of TEXT NOT NULL DEFAULT '',
+    has_weights INTEGER NOT NULL DEFAULT 0,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS rewards_file_name ON rewards (file_name);
+CREATE INDEX IF NOT EXISTS rewards_reward_id ON rewards (reward_id);
+CREATE TABLE IF NOT EXISTS roster (
+    reward_index TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    participant_id INTEGER NOT NULL,
+    weight REAL NOT NULL DEFAULT 1,
+    photo TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (reward_index, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS roster_participant ON roster (participant_id);
+CREATE TABLE IF NOT EXISTS winners (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reward_index TEXT NOT NULL,
+    participant_id INTEGER NOT NULL,
+    won_at TEXT NOT NULL,
+    UNIQUE (reward_index, participant_id)
+);
+CREATE INDEX IF NOT EXISTS winners_participant ON winners (participant_id);
+"""
+
+
+class RouletteStore:
+    """SQLite 儲存後端：參加者、獎項名單與中獎紀錄。
+
+    以 WAL 模式開啟，背景輸出執行緒寫入的同時 GUI 執行緒仍可讀取。
+    名單檔未變動時直接從資料庫載入，中獎紀錄跨多日活動保留；
+    `.txt` 名單與 CSV 得獎名單仍是主要的輸入與輸出格式。
+    """
+
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """為舊版資料庫補上新增的欄位。"""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(roster)")]
+        if "photo" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE roster ADD COLUMN photo TEXT NOT NULL DEFAULT ''")
+                # 舊資料沒有照片欄，清除檔案簽章讓名單檔下次載入時重新解析
+                self.conn.execute("UPDATE rewards SET mtime_ns = NULL, size = NULL")
+
+    def close(self):
+        self.conn.close()
+
+    def file_signature(self, reward_index, file_name):
+        """回傳資料庫中名單檔的 (修改時間, 大小)，未存過時回傳 None。"""
+        row = self.conn.execute(
+            "SELECT mtime_ns, size FROM rewards WHERE reward_index = ? AND file_name = ?",
+            (reward_index, file_name)).fetchone()
+        return tuple(row) if row is not None else None
+
+    def load_reward(self, reward_index):
+        """以 parse_reward_file 的格式回傳獎項資料。"""
+        row = self.conn.execute(
+            "SELECT full_name, pick_num, rainbow_format, reward_id, max_per_dept, exclude_winners_of, has_weights"
+            " FROM rewards WHERE reward_index = ?", (reward_index,)).fetchone()
+        if row is None:
+            return None
+        full_name, pick_num, rainbow_format, reward_id, max_per_dept, exclude_winners_of, has_weights = row
+        employees = []
+        departments = []
+        weights = []
+        photos = []
+        for name, department, weight, photo in self.conn.execute(
+                "SELECT p.name, p.department, r.weight, r.photo FROM roster r"
+                " JOIN participants p ON p.id = r.participant_id"
+                " WHERE r.reward_index = ? ORDER BY r.position", (reward_index,)):
+            employees.append(name)
+            departments.append(department)
+            weights.append(weight)
+            photos.append(photo)
+        return {
+            'fullrewardName': full_name,
+            'pickNum': pick_num,
+            'RainbowFormat': rainbow_format,
+            'rewardID': reward_id,
+            'maxPerDept': max_per_dept,
+            'excludeWinnersOf': [v for v in exclude_winners_of.split(";") if v],
+            'employees': employees,
+            'departments': departments,
+            'weights': weights if has_weights else None,
+            'photos': photos if any(photos) else None,
+            'winners': []
+        }
+
+    def load_winners(self):
+        """回傳 {獎項 index: [(姓名, 部門, 同名序號)]}，依中獎順序排列。"""
+        winners = {}
+        for reward_index, name, department, occurrence in self.conn.execute(
+                "SELECT w.reward_index, p.name, p.department, p.occurrence FROM winners w"
+                " JOIN participants p ON p.id = w.participant_id ORDER BY w.id"):
+            winners.setdefault(reward_index, []).append((name, department, occurrence))
+        return winners
+
+    def _participant_ids(self, participants):
+        """登錄 (姓名, 部門, 同名序號) 並回傳對應的資料庫 ID。"""
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO participants (name, department, occurrence) VALUES (?, ?, ?)", participants)
+        cursor = self.conn.cursor()
+        ids = []
+        for participant in participants:
+            cursor.execute("SELECT id FROM participants WHERE name = ? AND department = ? AND occurrence = ?",
+                           participant)
+            ids.append(cursor.fetchone()[0])
+        return ids
+
+    def save_reward(self, reward_index, file_name, reward, signature):
+        """寫入（或取代）一個獎項的基本資料與名單；reward 為 parse_reward_file 的結果。"""
+        seen = {}
+        participants = []
+        for name, department in zip(reward['employees'], reward['departments']):
+            occurrence = seen.get((name, department), 0)
+            seen[(name, department)] = occurrence + 1
+            participants.append((name, department, occurrence))
+        weights = reward['weights'] or [1.0] * len(participants)
+        photos = reward.get('photos') or [""] * len(participants)
+        mtime_ns, size = signature if signature else (None, None)
+        with self.conn:
+            ids = self._participant_ids(participants)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO rewards (reward_index, file_name, full_name, pick_num, rainbow_format,"
+                " reward_id, max_per_dept, exclude_winners_of, has_weights, mtime_ns, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (reward_index, file_name, reward['fullrewardName'], reward['pickNum'], reward['RainbowFormat'],
+                 reward['rewardID'], reward['maxPerDept'], ";".join(reward['excludeWinnersOf']),
+                 reward['weights'] is not None, mtime_ns, size))
+            self.conn.execute("DELETE FROM roster WHERE reward_index = ?", (reward_index,))
+            self.conn.executemany(
+                "INSERT INTO roster (reward_index, position, participant_id, weight, photo) VALUES (?, ?, ?, ?, ?)",
+                [(reward_index, pos, pid, weight, photo)
+                 for pos, (pid, weight, photo) in enumerate(zip(ids, weights, photos))])
+
+    def add_winners(self, reward_index, winners):
+        """追加中獎者 [(姓名, 部門, 同名序號)]。"""
+        won_at = datetime.now().isoformat(timespec="seconds")
+        with self.conn:
+            ids = self._participant_ids(winners)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO winners (reward_index, participant_id, won_at) VALUES (?, ?, ?)",
+                [(reward_index, pid, won_at) for pid in ids])
+
+    def replace_winners(self, winners_by_reward):
+        """以 {獎項 index: [(姓名, 部門, 同名序號)]} 取代所有中獎紀錄（匯入或開始新活動時使用）。"""
+        won_at = datetime.now().isoformat(timespec="seconds")
+        with self.conn:
+            keep = set()
+            for reward_index, winners in winners_by_reward.items():
+                ids = self._participant_ids(winners)
+                keep.update((reward_index, pid) for pid in ids)
+                # 已存在的紀錄保留原本的中獎時間與順序
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO winners (reward_index, participant_id, won_at) VALUES (?, ?, ?)",
+                    [(reward_index, pid, won_at) for pid in ids])
+            stale = [row for row in self.conn.execute("SELECT reward_index, participant_id FROM winners")
+                     if tuple(row) not in keep]
+            self.conn.executemany("DELETE FROM winners WHERE reward_index = ? AND participant_id = ?", stale)
+
+    def won_rewards_of(self, name, department="", occurrence=0):
+        """查詢某位參加者在所有獎項的中獎紀錄 [(完整獎項名稱, 獎項ID, 中獎時間)]。"""
+        return self.conn.execute(
+            "SELECT r.full_name, r.reward_id, w.won_at FROM participants p"
+            " JOIN winners w ON w.participant_id = p.id"
+            " JOIN rewards r ON r.reward_index = w.reward_index"
+            " WHERE p.name = ? AND p.department = ? AND p.occurrence = ? ORDER BY w.id",
+            (name, department, occurrence)).fetchall()
+
+    def winners_summary(self):
+        """所有中獎者與其中獎次數 [(姓名, 部門, 同名序號, 次數)]。"""
+        return self.conn.execute(
+            "SELECT p.name, p.department, p.occurrence, COUNT(*) FROM winners w"
+            " JOIN participants p ON p.id = w.participant_id"
+            " GROUP BY w.participant_id ORDER BY MIN(w.id)").fetchall()
+
+
+if __name__ == "__main__":
+    # 列出已中獎的人：python store.py [roulette.db]
+    path = sys.argv[1] if len(sys.argv) > 1 else STORE_FILE
+    if not os.path.exists(path):
+        sys.exit(f"找不到資料庫 {path}")
+    store = RouletteStore(path)
+    for name, department, occurrence, count in store.winners_summary():
+        label = f"{name}({department}#{occurrence + 1})" if department or occurrence else name
+        rewards = ", ".join(full_name for full_name, _, _ in store.won_rewards_of(name, department, occurrence))
+        print(f"{label}\t{count}\t{rewards}")
+    store.close()
@@ -0,0 +1,40 @@
+import os
+import random
+import sys
+import time
+
+import pytest
+
+# 測試直接匯入專案根目錄的模組（draw_engine、sampler 等皆不依賴 Qt）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def run_to_end():
+    """以固定間隔推進抽獎引擎直到結束；背景規劃尚未完成時稍候再推進。"""
+    def run(engine, step_ms=16):
+        elapsed = 0.0
+        deadline = time.monotonic() + 10
+        while True:
+            _, finished = engine.advance(elapsed)
+            if finished:
+                return
+            assert time.monotonic() < deadline, "draw did not finish"
+            if engine.stalled_ticks:
+                time.sleep(0.001)
+            elapsed += step_ms
+    return run
+
+
+@pytest.fixture
+def make_worker():
+    """建立不啟動執行緒的 DrawWorker，直接呼叫其選取方法。"""
+    from draw_engine import MODE_RANDOM, DrawWorker, FramePlan
+    from sampler import FenwickSampler
+
+    def make(pick_count, groups, group_quota, weights=None, seed=0):
+        rng = random.Random(seed)
+        available = list(range(len(groups)))
+        sampler = FenwickSampler(weights, rng) if weights is not None else None
+        return DrawWorker(FramePlan(1), MODE_RANDOM, pick_count, available, groups, group_quota, sampler, rng)
+    return make
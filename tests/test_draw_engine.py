@@ -0,0 +1,46 @@
+import pytest
+
+from draw_engine import MODE_RANDOM, DrawEngine, DrawWorker, FramePlan
+
+
+def test_frame_plan_never_waits_for_unplanned_frames():
+    plan = FramePlan(3)
+    plan.add_frame([1, 2])
+    assert plan.frame(0) == [1, 2]
+    with pytest.raises(IndexError):
+        plan.frame(1)
+
+
+def test_draw_finishes_only_after_commit_event(monkeypatch):
+    # 不啟動工作執行緒，由測試代替它放入每一幀與提交事件
+    monkeypatch.setattr(DrawWorker, "start", lambda self: None)
+    engine = DrawEngine()
+    engine.start(MODE_RANDOM, 1, range(5), 0.2, 20, 50)
+    plan = engine.plan
+    assert plan.frame_total > 1
+    for _ in range(plan.frame_total):
+        plan.add_frame([3])
+    # 所有幀都已產生，但提交事件尚未放入：停在倒數第二幀
+    assert engine.advance(10000) == (True, False)
+    assert engine.frame_count == plan.frame_total - 1
+    assert engine.stalled_ticks == 1
+    plan.commit([3])
+    assert engine.advance(10016) == (False, True)
+    assert engine.current_indices == [3]
+    assert engine.winner_indices() == [3]
+
+
+def test_failing_worker_stops_the_draw_and_reports_the_error(monkeypatch):
+    def fail(self, final=False):
+        raise ValueError("planner broke")
+    monkeypatch.setattr(DrawWorker, "_select_next", fail)
+    engine = DrawEngine()
+    engine.start(MODE_RANDOM, 1, range(5), 0.2, 20, 50)
+    engine.worker.thread.join(5)
+    with pytest.raises(RuntimeError, match="planner broke"):
+        engine.advance(10000)
+    assert isinstance(engine.plan.error, ValueError)
+    assert not engine.plan.committed()
+    # 抽獎已停止，之後的推進不再丟出錯誤
+    assert not engine.running
+    assert engine.advance(10016) == (False, True)
@@ -0,0 +1,71 @@
+from collections import Counter
+
+from draw_engine import MODE_RANDOM, DrawEngine
+from eligibility import EligibilityEngine, indices_to_mask, mask_to_indices
+from participants import ParticipantRegistry
+
+
+def make_rewards(registry):
+    names = [f"p{i}" for i in range(6)]
+    departments = ["X", "X", "X", "Y", "Y", ""]
+    first = registry.register_roster(names, departments)
+    second = registry.register_roster(names[2:], departments[2:])
+    return {
+        '1': {'index': '1', 'rewardID': "R1", 'roster': first, 'winners': [], 'maxPerDept': 2,
+              'excludeWinnersOf': []},
+        '2': {'index': '2', 'rewardID': "R2", 'roster': second, 'winners': [], 'maxPerDept': 0,
+              'excludeWinnersOf': ["R1"]},
+    }
+
+
+def test_mask_round_trip():
+    indices = [0, 3, 64, 65, 200]
+    assert mask_to_indices(indices_to_mask(indices)) == indices
+    assert mask_to_indices(0) == []
+
+
+def test_eligibility_commit_updates_winners_quota_and_exclusions():
+    registry = ParticipantRegistry()
+    rewards = make_rewards(registry)
+    engine = EligibilityEngine(rewards, registry)
+    assert engine.candidate_indices('1') == [0, 1, 2, 3, 4, 5]
+
+    rewards['1']['winners'].extend([rewards['1']['roster'][0], rewards['1']['roster'][2]])
+    engine.commit('1', [0, 2])
+    # 部門 X 已達兩人上限，p1 失去資格
+    assert engine.winner_positions('1') == [0, 2]
+    assert engine.ineligible_indices('1') == [1]
+    assert engine.candidate_indices('1') == [3, 4, 5]
+    assert engine.state_masks('1') == (indices_to_mask([0, 2]), indices_to_mask([1]))
+    groups, remaining = engine.department_quota('1')
+    assert groups == ["X", "X", "X", "Y", "Y", ""]
+    assert remaining == {"X": 0, "Y": 2}
+    # 獎項 2 排除獎項 1 的中獎者：p2 在獎項 2 的名單位置 0
+    assert engine.ineligible_indices('2') == [0]
+    assert engine.candidate_indices('2') == [1, 2, 3]
+
+    # 以中獎紀錄重建的結果與逐次提交相同
+    rebuilt = EligibilityEngine(rewards, registry)
+    for index in rewards:
+        assert rebuilt.state_masks(index) == engine.state_masks(index)
+
+
+def test_quota_caps_each_frame(make_worker):
+    groups = ["A", "A", "A", "A", "B", "B", ""]
+    worker = make_worker(4, groups, {"A": 1, "B": 2})
+    for final in (False, True) * 200:
+        worker._select_next(final)
+        selected = Counter(groups[idx] for idx in worker.selection)
+        assert len(worker.selection) == 4
+        assert selected["A"] <= 1 and selected["B"] <= 2
+
+
+def test_engine_caps_pick_count_by_quota(run_to_end):
+    engine = DrawEngine()
+    groups = ["A"] * 5 + ["B"] * 5
+    engine.start(MODE_RANDOM, 6, range(10), 0.5, 50, 100, groups, {"A": 1, "B": 2})
+    assert engine.pick_count == 3
+    run_to_end(engine)
+    winners = engine.winner_indices()
+    assert len(winners) == 3
+    assert Counter(groups[idx] for idx in winners) == {"A": 1, "B": 2}
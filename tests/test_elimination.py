@@ -0,0 +1,19 @@
+from draw_engine import MODE_ELIMINATION, DrawEngine
+
+
+def test_elimination_frames_remove_everyone_but_the_winners(run_to_end):
+    engine = DrawEngine()
+    engine.start(MODE_ELIMINATION, 3, range(100), 1.0, 20, 80)
+    frame_total = len(engine.deadlines)
+    run_to_end(engine)
+    plan = engine.plan
+    assert plan.ready() == frame_total
+    sizes = [len(plan.frame(i)) for i in range(frame_total)]
+    assert sum(sizes) == 97
+    assert sizes[0] >= sizes[-1]
+    assert sizes == sorted(sizes, reverse=True)
+    winners = engine.winner_indices()
+    eliminated = {idx for i in range(frame_total) for idx in plan.frame(i)}
+    assert len(eliminated) == 97
+    assert set(winners) == set(range(100)) - eliminated
+    assert sorted(engine.current_indices) == sorted(winners)
@@ -0,0 +1,26 @@
+from plan_validator import ERROR, WARNING, validate_event
+
+
+def write_reward(folder, file, reward_id, pick_num, names):
+    lines = ["FullName,測試", f"PickNum,{pick_num}", "RainbowFormat,", f"RewardID,{reward_id}"] + names
+    (folder / file).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_plan_validator_reports_duplicate_ids_and_pick_overflow(tmp_path):
+    write_reward(tmp_path, "1_甲.txt", "R1", 1, ["a", "b"])
+    write_reward(tmp_path, "2_乙.txt", "R1", 5, ["c", "d"])
+    report = validate_event(str(tmp_path))
+    messages = [(source, message) for level, source, message in report.issues if level == ERROR]
+    assert any(source == "1_甲.txt" and "RewardID R1" in message for source, message in messages)
+    assert any(source == "2_乙.txt" and "PickNum (5)" in message for source, message in messages)
+    assert report.file_count == 2
+    assert report.participant_count == 4
+
+
+def test_plan_validator_warns_about_names_with_commas(tmp_path):
+    write_reward(tmp_path, "1_甲.txt", "R1", 1, ["Lee, Ann, Jr.", "Park, Min", "王小明,業務部"])
+    report = validate_event(str(tmp_path))
+    warnings = [message for level, source, message in report.issues if level == WARNING]
+    # 名單從第 5 行開始：第 5 行整行為姓名，第 6 行疑似含逗號的姓名，第 7 行為一般的 姓名,部門
+    assert any("整行視為含逗號的姓名" in message and message.endswith(": 5") for message in warnings)
+    assert any("姓名,部門" in message and message.endswith(": 6") for message in warnings)
@@ -0,0 +1,21 @@
+import pytest
+
+from reward_files import RewardFileError, parse_roster_line
+
+
+def test_roster_columns():
+    assert parse_roster_line("王小明") == ("王小明", "", None, "")
+    assert parse_roster_line("王小明,業務部") == ("王小明", "業務部", None, "")
+    assert parse_roster_line("王小明,業務部,2") == ("王小明", "業務部", 2.0, "")
+    assert parse_roster_line("王小明,業務部,,photos/wang.jpg") == ("王小明", "業務部", None, "photos/wang.jpg")
+
+
+def test_roster_name_with_commas_is_kept_whole():
+    assert parse_roster_line("Lee, Ann, Jr.") == ("Lee, Ann, Jr.", "", None, "")
+    # 第三欄是數字時仍依欄位解析
+    assert parse_roster_line("Lee,Sales,3") == ("Lee", "Sales", 3.0, "")
+
+
+def test_roster_rejects_negative_weight():
+    with pytest.raises(RewardFileError):
+        parse_roster_line("王小明,業務部,-1")
@@ -0,0 +1,44 @@
+import random
+from collections import Counter
+
+import pytest
+
+from sampler import FenwickSampler
+
+
+def test_sampler_pick_follows_weights():
+    sampler = FenwickSampler([1, 2, 0, 7], random.Random(1))
+    counts = Counter(sampler.pick() for _ in range(20000))
+    assert counts[2] == 0
+    for index, share in ((0, 0.1), (1, 0.2), (3, 0.7)):
+        assert counts[index] / 20000 == pytest.approx(share, abs=0.02)
+
+
+def test_sampler_sample_is_distinct_and_restores_weights():
+    sampler = FenwickSampler([1, 1, 1, 1, 1], random.Random(2))
+    for _ in range(200):
+        picked = sampler.sample(3, exclude=[0, 1])
+        assert len(set(picked)) == 3
+        assert not {0, 1} & set(picked)
+    assert sampler.total == pytest.approx(5)
+    assert sampler.positive == 5
+
+
+def test_sampler_ignores_exclude_when_too_few_left():
+    sampler = FenwickSampler([1, 1, 1], random.Random(3))
+    assert sorted(sampler.sample(3, exclude=[0])) == [0, 1, 2]
+
+
+def test_weighted_quota_refill_follows_weights(make_worker):
+    # A 部門已滿一人後，其餘名額依籤數從 B (1 籤) 與 C (9 籤) 補上
+    groups = ["A", "A", "A", "B", "C"]
+    weights = [100, 100, 100, 1, 9]
+    counts = Counter()
+    for seed in range(3000):
+        worker = make_worker(2, groups, {"A": 1, "B": 1, "C": 1}, weights, seed)
+        worker._select_next(final=True)
+        assert sum(1 for idx in worker.selection if groups[idx] == "A") == 1
+        counts.update(groups[idx] for idx in worker.selection)
+    assert counts["C"] / (counts["B"] + counts["C"]) == pytest.approx(0.9, abs=0.03)
+    # 補位後抽樣器的權重全部還原
+    assert worker.sampler.total == pytest.approx(sum(weights))
@@ -0,0 +1,15 @@
+from participants import ParticipantRegistry
+from search_index import ParticipantIndex
+
+
+def test_search_prefix_before_substring_and_full_width():
+    registry = ParticipantRegistry()
+    registry.register_roster(["王小明", "陳明", "明日香", "ＡＢＣ"])
+    index = ParticipantIndex(registry)
+    assert index.update() == 4
+    assert index.search("明") == [2, 0, 1]
+    assert index.search("abc") == [3]
+    assert index.search("  ") == []
+    registry.register("李明")
+    assert index.update() == 1
+    assert 4 in index.search("明")
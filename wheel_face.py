@@ -0,0 +1,100 @@
+import math
+
+from PySide2.QtCore import QPointF, Qt
+from PySide2.QtGui import QImage, QPainter, QPen, QStaticText, QTransform
+
+
+def wheel_sector_labels(lower_limit, upper_limit, font, num_sectors=12, label_every=3, decimals=0):
+    """轉盤刻度每 label_every 個標示一次時間（避免小尺寸下文字重疊），預先排版為 QStaticText。"""
+    labels = []
+    for i in range(num_sectors):
+        text = None
+        if i % label_every == 0:
+            sector_time = lower_limit + (upper_limit - lower_limit) * i / num_sectors
+            text = QStaticText(f"{sector_time:.{decimals}f}s")
+            text.prepare(QTransform(), font)
+        labels.append(text)
+    return labels
+
+
+class WheelFace:
+    """轉盤盤面的快取：圓盤與刻度畫在一張 QImage 上，時間標籤預先排版。
+
+    圓盤只在半徑、像素比或上下限改變時重繪；每幀以目前角度旋轉貼上這張圖，
+    時間標籤則依旋轉後的位置逐一畫出、文字保持正立（與原本的轉盤相同），
+    最後畫出固定的指針。使用 QImage 而非 QPixmap，離屏輸出影片時也可使用。
+    """
+
+    def __init__(self, font, tick_length=6, label_inset=16, label_every=3, decimals=0, pointer_width=3):
+        self.font = font
+        self.tick_length = tick_length
+        self.label_inset = label_inset
+        self.label_every = label_every
+        self.decimals = decimals
+        self.disc_pen = QPen(Qt.black, 2)
+        self.tick_pen = QPen(Qt.black, 1)
+        self.label_pen = QPen(Qt.black)
+        self.pointer_pen = QPen(Qt.red, pointer_width)
+        self.labels = []
+        self.image = None
+        self.key = None
+
+    def set_limits(self, lower_limit, upper_limit):
+        self.labels = wheel_sector_labels(lower_limit, upper_limit, self.font, label_every=self.label_every,
+                                          decimals=self.decimals)
+        self.image = None
+
+    def face(self, radius, ratio=1.0):
+        """圓盤與刻度（不含標籤）的快取圖。"""
+        key = (radius, ratio)
+        if self.image is not None and self.key == key:
+            return self.image
+        size = int(math.ceil(radius * 2 + 4))
+        image = QImage(int(size * ratio), int(size * ratio), QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(ratio)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        center = QPointF(size / 2, size / 2)
+        painter.setPen(self.disc_pen)
+        painter.setBrush(Qt.white)
+        painter.drawEllipse(center, radius, radius)
+        painter.setPen(self.tick_pen)
+        num_sectors = len(self.labels)
+        for i in range(num_sectors):
+            angle = math.radians(i * 360 / num_sectors)
+            dx, dy = math.sin(angle), -math.cos(angle)
+            painter.drawLine(QPointF(center.x() + dx * radius, center.y() + dy * radius),
+                             QPointF(center.x() + dx * (radius - self.tick_length),
+                                     center.y() + dy * (radius - self.tick_length)))
+        painter.end()
+        self.image = image
+        self.key = key
+        return image
+
+    def paint(self, painter, center, radius, rotation_angle, ratio=1.0):
+        """以 rotation_angle 旋轉貼上盤面，畫出正立的時間標籤，再畫出固定的指針。"""
+        center = QPointF(center)
+        image = self.face(radius, ratio)
+        half = image.width() / image.devicePixelRatio() / 2
+        painter.save()
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.translate(center)
+        painter.rotate(rotation_angle)
+        painter.drawImage(QPointF(-half, -half), image)
+        painter.restore()
+        painter.setPen(self.label_pen)
+        painter.setFont(self.font)
+        num_sectors = len(self.labels)
+        for i, label in enumerate(self.labels):
+            if label is None:
+                continue
+            angle = math.radians(i * 360 / num_sectors + rotation_angle)
+            distance = radius - self.label_inset
+            label_size = label.size()
+            painter.drawStaticText(QPointF(center.x() + math.sin(angle) * distance - label_size.width() / 2,
+                                           center.y() - math.cos(angle) * distance - label_size.height() / 2),
+                                   label)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(self.pointer_pen)
+        painter.drawLine(center, QPointF(center.x(), center.y() - radius))